@@ -1,7 +1,7 @@
 from crewai import Agent, Task, Crew, Process
-from langchain_community.tools.sql_database.tool import QuerySQLDataBaseTool
-from telecom_assistant.utils.database import get_database
+from telecom_assistant.utils.database import get_database, CachedQuerySQLDataBaseTool
 from telecom_assistant.config.config import Config
+from telecom_assistant.utils.customer_context import format_customer_context
 from crewai.tools import BaseTool
 import os
 
@@ -15,10 +15,9 @@ class DatabaseSearchTool(BaseTool):
     
     def _run(self, query: str) -> str:
         db = get_database()
-        sql_tool = QuerySQLDataBaseTool(db=db)
+        sql_tool = CachedQuerySQLDataBaseTool(db=db)
         return sql_tool.run(query)
 
-from telecom_assistant.utils.document_loader import load_documents
 
 class VectorSearchTool(BaseTool):
     name: str = "Search Billing FAQ"
@@ -26,18 +25,32 @@ class VectorSearchTool(BaseTool):
     
     def _run(self, query: str) -> str:
         try:
-            index = load_documents()
+            # Imported on first doc search so this route doesn't load LlamaIndex up front
+            from telecom_assistant.utils.document_loader import get_index, create_query_engine
+            index = get_index()
             if not index:
                 return "Error: Document index not available."
-            query_engine = index.as_query_engine()
+            query_engine = create_query_engine(index)
             response = query_engine.query(query)
             return str(response)
         except Exception as e:
             return f"Error searching docs: {str(e)}"
 
-def create_billing_crew(customer_id: str, query: str):
+def _known_facts_block(customer_context: dict) -> str:
+    """Prompt section with the customer facts already loaded for this conversation."""
+    facts = format_customer_context(customer_context)
+    if not facts:
+        return ""
+    return f"""
+        Known customer facts (already loaded; do not query these again, use SQL only for anything else):
+        {facts}
+        """
+
+def create_billing_crew(customer_id: str, query: str, customer_context: dict = None):
     """Create and return a CrewAI crew for handling billing inquiries"""
     
+    known_facts = _known_facts_block(customer_context)
+    
     # Create tools
     db_tool = DatabaseSearchTool()
     vector_tool = VectorSearchTool()
@@ -107,7 +120,7 @@ def create_billing_crew(customer_id: str, query: str):
         description=f"""
         Analyze the billing situation for customer ID: {customer_id}.
         The customer is asking: "{query}"
-        
+        {known_facts}
         1. Query the database to find the customer's current plan, recent usage (data, voice, sms), and billing records.
         2. Identify any anomalies or reasons for the charges mentioned in the query.
         3. If the query is a general question (e.g., payment methods, disputes), use the FAQ tool to find the answer.
@@ -121,7 +134,7 @@ def create_billing_crew(customer_id: str, query: str):
     usage_review_task = Task(
         description=f"""
         Review the usage patterns for customer ID: {customer_id} to see if their current plan is a good fit.
-        
+        {known_facts}
         1. Analyze data, voice, and SMS usage over the last few months.
         2. Compare against their current plan limits.
         3. Determine if they are overpaying or under-provisioned.
@@ -161,11 +174,11 @@ def create_billing_crew(customer_id: str, query: str):
     
     return billing_crew
 
-def process_billing_query(customer_id, query):
+def process_billing_query(customer_id, query, customer_context: dict = None):
     """Process a billing query using the CrewAI crew"""
     
     # Create the billing crew
-    crew = create_billing_crew(customer_id, query)
+    crew = create_billing_crew(customer_id, query, customer_context)
     
     # Process the query
     result = crew.kickoff()
@@ -3,6 +3,8 @@ from langchain_openai import ChatOpenAI
 from langgraph.prebuilt import create_react_agent
 from telecom_assistant.config.config import Config
 from telecom_assistant.utils.database import get_database
+from telecom_assistant.utils.cache import invalidate_customer, invalidate_tables
+from telecom_assistant.utils.customer_context import format_customer_context, get_customer_context
 from sqlalchemy import text
 import os
 
@@ -13,14 +15,12 @@ os.environ["OPENAI_API_KEY"] = Config.OPENAI_API_KEY
 
 @tool
 def get_customer_details(customer_id: str):
-    """Get details of a customer by their ID."""
-    db = get_database()
-    with db._engine.connect() as conn:
-        result = conn.execute(text(f"SELECT * FROM customers WHERE customer_id = '{customer_id}'")).fetchone()
-        if result:
-            # Convert row to dict using _mapping
-            return dict(result._mapping)
+    """Get details of a customer (profile and current plan) by their ID."""
+    # Served from the shared customer context, which is reloaded after updates
+    context = get_customer_context(customer_id)
+    if context is None:
         return "Customer not found."
+    return {**context["profile"], "plan": context["plan"]}
 
 @tool
 def update_customer_address(customer_id: str, new_address: str):
@@ -34,6 +34,8 @@ def update_customer_address(customer_id: str, new_address: str):
             
         conn.execute(text(f"UPDATE customers SET address = '{new_address}' WHERE customer_id = '{customer_id}'"))
         conn.commit()
+        invalidate_customer(customer_id)
+        invalidate_tables("customers")
         return f"Address updated successfully for {customer_id}."
 
 @tool
@@ -47,6 +49,8 @@ def update_customer_email(customer_id: str, new_email: str):
             
         conn.execute(text(f"UPDATE customers SET email = '{new_email}' WHERE customer_id = '{customer_id}'"))
         conn.commit()
+        invalidate_customer(customer_id)
+        invalidate_tables("customers")
         return f"Email updated successfully for {customer_id}."
 
 @tool
@@ -60,6 +64,8 @@ def update_customer_phone(customer_id: str, new_phone: str):
             
         conn.execute(text(f"UPDATE customers SET phone_number = '{new_phone}' WHERE customer_id = '{customer_id}'"))
         conn.commit()
+        invalidate_customer(customer_id)
+        invalidate_tables("customers")
         return f"Phone number updated successfully for {customer_id}."
 
 @tool
@@ -78,6 +84,7 @@ def register_new_customer(name: str, email: str, phone: str, address: str, plan_
             VALUES ('{new_id}', '{name}', '{email}', '{phone}', '{address}', '{plan_id}', 'Active', DATE('now'))
         """))
         conn.commit()
+        invalidate_tables("customers")
         return f"Customer registered successfully with ID: {new_id}"
 
 @tool
@@ -86,7 +93,7 @@ def update_usage_charges(usage_id: str, additional_charges: float):
     db = get_database()
     with db._engine.connect() as conn:
         # 1. Fetch current details
-        row = conn.execute(text(f"SELECT total_bill_amount, additional_charges FROM customer_usage WHERE usage_id = '{usage_id}'")).fetchone()
+        row = conn.execute(text(f"SELECT total_bill_amount, additional_charges, customer_id FROM customer_usage WHERE usage_id = '{usage_id}'")).fetchone()
         
         if not row:
             return f"Usage record {usage_id} not found."
@@ -106,6 +113,8 @@ def update_usage_charges(usage_id: str, additional_charges: float):
             WHERE usage_id = '{usage_id}'
         """))
         conn.commit()
+        invalidate_customer(row[2])
+        invalidate_tables("customer_usage")
         
         return f"Updated charges for {usage_id}. New Additional Charges: {additional_charges}, New Total Bill: {new_total}"
 
@@ -148,9 +157,8 @@ def create_customer_management_agent():
     
     If you need the customer ID and it's not provided in the query, ask for it (or check the context if available).
     
-    If a user asks about their "current plan", use `get_customer_details` to find their `service_plan_id`, 
-    and then you can explain they are on that plan (or you might need to infer details if you can't query plans directly, 
-    but for now just providing the plan ID/Name from customer details is a good start).
+    If a user asks about their "current plan", use the known customer facts if they are provided,
+    otherwise `get_customer_details`, which also returns the details of their plan.
     """
     
     agent_executor = create_react_agent(
@@ -161,7 +169,7 @@ def create_customer_management_agent():
     
     return agent_executor
 
-def process_customer_management_query(query: str, customer_id: str = None):
+def process_customer_management_query(query: str, customer_id: str = None, customer_context: dict = None):
     """Process a customer management query"""
     
     agent_executor = create_customer_management_agent()
@@ -174,6 +182,11 @@ def process_customer_management_query(query: str, customer_id: str = None):
     if customer_id and customer_id not in query:
         final_query = f"{query} (Customer ID: {customer_id})"
     
+    # Profile, plan and usage are already loaded; the agent only needs tools for changes
+    facts = format_customer_context(customer_context)
+    if facts:
+        final_query = f"Known customer facts:\n{facts}\n\n{final_query}"
+    
     try:
         response = agent_executor.invoke({"messages": [("user", final_query)]})
         return response["messages"][-1].content
@@ -1,63 +1,92 @@
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader, Settings, SQLDatabase
+from llama_index.core import Settings, SQLDatabase
 from llama_index.core.query_engine import RouterQueryEngine, NLSQLTableQueryEngine
 from llama_index.core.selectors import LLMSingleSelector
 from llama_index.llms.openai import OpenAI
 from llama_index.core.tools import QueryEngineTool
-from sqlalchemy import create_engine
 from telecom_assistant.config.config import Config
+from telecom_assistant.utils.database import get_database
+from telecom_assistant.utils.document_loader import get_index, create_query_engine
+from telecom_assistant.utils.tool_selector import SimilaritySelector
+from telecom_assistant.utils.sql_templates import TemplateCachedNLSQLTableQueryEngine
 import os
+import threading
 
 # Set API Key
 os.environ["OPENAI_API_KEY"] = Config.OPENAI_API_KEY
 
-def create_knowledge_engine():
+# Example queries per tool; together with the tool descriptions they form the
+# profiles the similarity selector routes on
+TOOL_EXAMPLES = {
+    "document_search": [
+        "How do I set up VoLTE on my phone?",
+        "What's the process for international roaming?",
+        "How do I configure APN settings?",
+        "What are the phases of the 5G deployment?",
+        "When will 5G coverage expand to Delhi and Mumbai?",
+        "How do I reset my voicemail password?",
+        "Troubleshooting steps for dropped calls",
+        "How do I enable Wi-Fi calling?",
+    ],
+    "database_lookup": [
+        "What is the coverage strength in Seattle?",
+        "Is 5G available in New York?",
+        "What is the 4G coverage in Dallas, Texas?",
+        "Signal strength of 5G coverage in Chicago",
+        "Which known issues does the iPhone 14 have?",
+        "What are the recommended settings for the Samsung Galaxy S23?",
+        "What is the maximum speed of 5G?",
+        "What frequency band does 4G use?",
+        "What is the latency of LTE?",
+        "Is the Pixel 7 compatible with our network?",
+    ],
+}
+
+def create_knowledge_engine(vector_index=None):
     """Create and return a LlamaIndex query engine for knowledge retrieval"""
     
     # Initialize LLM and Settings
     llm = OpenAI(model=Config.OPENAI_MODEL_NAME, temperature=0)
     Settings.llm = llm
-    Settings.chunk_size = 1024
-    
-    # Load and index documents (Vector Store)
-    # Use SimpleDirectoryReader to load documents from data/documents
-    documents = SimpleDirectoryReader(
-        input_dir=os.path.join(Config.DATA_DIR, "documents")
-    ).load_data()
-    
-    vector_index = VectorStoreIndex.from_documents(documents)
     
-    # Set up vector search query engine
-    vector_query_engine = vector_index.as_query_engine(
-        similarity_top_k=3
-    )
+    # Use the shared, persisted document index (Vector Store) instead of
+    # re-reading and re-embedding data/documents for every engine
+    if vector_index is None:
+        vector_index = get_index()
     
     # Connect to the database for factual queries (SQL Store)
-    db_path = Config.DATABASE_PATH
-    db_uri = f"sqlite:///{db_path}"
-    engine = create_engine(db_uri)
-    sql_database = SQLDatabase(engine)
+    # Reuse the application's SQLAlchemy engine and connection pool
+    engine = get_database()._engine
+    sql_database = SQLDatabase(engine, include_tables=["coverage_areas", "device_compatibility", "technical_specs"])
     
     # Create SQL query engine
     # Write prompt that helps translate natural language to SQL
     # Note: NLSQLTableQueryEngine handles the prompt internally but we can customize if needed
     # For now we rely on its default capabilities which are strong with OpenAI
-    sql_query_engine = NLSQLTableQueryEngine(
+    # Repeat question shapes reuse validated, parameterized SQL from the template cache
+    sql_engine_cls = TemplateCachedNLSQLTableQueryEngine if Config.SQL_TEMPLATE_CACHE_ENABLED else NLSQLTableQueryEngine
+    sql_query_engine = sql_engine_cls(
         sql_database=sql_database,
         tables=["coverage_areas", "device_compatibility", "technical_specs"]
     )
     
     # Create QueryEngineTools
-    vector_tool = QueryEngineTool.from_defaults(
-        query_engine=vector_query_engine,
-        description=(
-            "Useful for conceptual, procedural questions like 'How do I set up VoLTE?' "
-            "or 'What's the process for international roaming?'. "
-            "CRITICAL: Use this for 5G deployment phases, coverage in India (Delhi, Mumbai, etc.), and future expansion plans."
-        ),
-    )
+    tools = []
+    if vector_index is not None:
+        # Set up document search query engine (hybrid BM25 + vector)
+        vector_query_engine = create_query_engine(vector_index, similarity_top_k=3)
+        tools.append(QueryEngineTool.from_defaults(
+            query_engine=vector_query_engine,
+            name="document_search",
+            description=(
+                "Useful for conceptual, procedural questions like 'How do I set up VoLTE?' "
+                "or 'What's the process for international roaming?'. "
+                "CRITICAL: Use this for 5G deployment phases, coverage in India (Delhi, Mumbai, etc.), and future expansion plans."
+            ),
+        ))
     
-    sql_tool = QueryEngineTool.from_defaults(
+    tools.append(QueryEngineTool.from_defaults(
         query_engine=sql_query_engine,
+        name="database_lookup",
         description=(
             "Useful for checking specific signal strength or technical specs in the database. "
             "Database Tables available for SQL queries:\n"
@@ -66,27 +95,57 @@ def create_knowledge_engine():
             "- technical_specs: technology, frequency_band, max_speed, latency\n"
             "Use this for looking up specific device compatibility or technical parameters."
         ),
-    )
+    ))
     
     # Create Router Query Engine
+    # Routes by similarity to the tool profiles and only asks the LLM when
+    # the top two routes are too close to call
+    selector = SimilaritySelector(examples=TOOL_EXAMPLES, fallback=LLMSingleSelector.from_defaults())
     router_query_engine = RouterQueryEngine(
-        selector=LLMSingleSelector.from_defaults(),
-        query_engine_tools=[
-            vector_tool,
-            sql_tool,
-        ],
+        selector=selector,
+        query_engine_tools=tools,
     )
     
     return router_query_engine
 
-def process_knowledge_query(query: str):
+_engine = None
+_engine_index = None
+_engine_lock = threading.Lock()
+
+def get_knowledge_engine():
+    """
+    Return the shared knowledge engine, building it on first use.
+    
+    The engine is rebuilt if the shared document index has been swapped
+    (e.g. after an admin re-index).
+    """
+    global _engine, _engine_index
+    index = get_index()
+    if _engine is None or _engine_index is not index:
+        with _engine_lock:
+            if _engine is None or _engine_index is not index:
+                _engine = create_knowledge_engine(index)
+                _engine_index = index
+    return _engine
+
+def process_knowledge_query(query: str, customer_context: dict = None):
     """Process a knowledge retrieval query using the LlamaIndex query engine"""
     
-    # Create or get the knowledge engine
-    # In a real app, we would cache this
-    engine = create_knowledge_engine()
+    # Only the facts that change the answer ("is my phone compatible",
+    # "coverage where I live") are added, so retrieval stays focused
+    if customer_context:
+        facts = []
+        if customer_context.get("device"):
+            facts.append(f"device: {customer_context['device']['make']} {customer_context['device']['model']}")
+        if customer_context.get("location"):
+            facts.append(f"location: {customer_context['location']['city']}")
+        if facts:
+            query = f"{query} (Customer {'; '.join(facts)})"
     
     try:
+        # Built once per process (or by the warm-up stage) and reused
+        engine = get_knowledge_engine()
+        
         # Process the query
         response = engine.query(query)
         return str(response)
@@ -1,14 +1,13 @@
 import autogen
 from telecom_assistant.config.config import Config
-from telecom_assistant.utils.database import get_database
-from telecom_assistant.utils.document_loader import load_documents
-from langchain_community.tools.sql_database.tool import QuerySQLDataBaseTool
+from telecom_assistant.utils.database import cached_query
+from telecom_assistant.utils.customer_context import format_customer_context, get_customer_context
 import os
 
 # Set API Key
 os.environ["OPENAI_API_KEY"] = Config.OPENAI_API_KEY
 
-def create_network_agents(customer_id: str = "CUST001"):
+def create_network_agents(customer_id: str = "CUST001", customer_context: dict = None):
     """Create and return an AutoGen group chat for network troubleshooting"""
     
     # Configuration for agents
@@ -20,106 +19,86 @@ def create_network_agents(customer_id: str = "CUST001"):
     llm_config = {
         "config_list": config_list,
         "temperature": 0.2,
-        "timeout": 120,
+        "timeout": Config.AUTOGEN_LLM_TIMEOUT_SECONDS,
     }
 
-    # Fetch customer details
-    db = get_database()
-    customer_name = "Unknown"
-    from sqlalchemy import text
-    with db._engine.connect() as conn:
-        result = conn.execute(text(f"SELECT name FROM customers WHERE customer_id = '{customer_id}'")).fetchone()
-        if result:
-            customer_name = result[0]
+    # Customer details come from the conversation's customer context
+    # (customer_id is None for shared, customer-independent runs)
+    if customer_id and customer_context is None:
+        customer_context = get_customer_context(customer_id)
+    customer_name = customer_context["profile"]["name"] if customer_context else "Unknown"
+    customer_facts = format_customer_context(customer_context)
+    known_facts = f"\n        Known customer facts:\n{customer_facts}" if customer_facts else ""
 
     # --- Tools Setup ---
     
     # 1. Network Status Tool
     def check_network_status(city: str, district: str = None) -> str:
         """Check for network outages or incidents in a specific location."""
-        db = get_database()
-        from sqlalchemy import text
-        with db._engine.connect() as conn:
-            # Search by city primarily. If district is provided, we could refine, 
-            # but usually status is reported at city or region level.
-            # We'll check for matches on the city name.
-            query = text(f"SELECT * FROM network_status WHERE location LIKE '%{city}%'")
-            result = conn.execute(query).fetchall()
-            
-            if not result:
-                return f"No reported network incidents found in {city}."
-            return str(result)
+        # Search by city primarily. If district is provided, we could refine, 
+        # but usually status is reported at city or region level.
+        # We'll check for matches on the city name.
+        # Results are cached until network_status is written.
+        result = cached_query("SELECT * FROM network_status WHERE location LIKE :pattern", {"pattern": f"%{city}%"})
+        
+        if not result:
+            return f"No reported network incidents found in {city}."
+        return str(result)
 
     # 2. Coverage Quality Tools
     
     def check_location_coverage(city: str, district: str = None, technology: str = "5G") -> str:
         """Check for coverage quality in a specific location (city and optional district)."""
-        db = get_database()
-        from sqlalchemy import text
-        with db._engine.connect() as conn:
-            # Construct query based on whether district is provided
-            if district:
-                area_query = text(f"SELECT area_id FROM service_areas WHERE city LIKE '%{city}%' AND district LIKE '%{district}%'")
-                location_str = f"{city} ({district})"
-            else:
-                area_query = text(f"SELECT area_id FROM service_areas WHERE city LIKE '%{city}%'")
-                location_str = city
-                
-            area_result = conn.execute(area_query).fetchone()
-            
-            if not area_result:
-                return f"No service area found for {location_str}."
-            
-            area_id = area_result[0]
-            
-            # Now check coverage quality
-            coverage_query = text(f"SELECT * FROM coverage_quality WHERE area_id = '{area_id}' AND technology = '{technology}'")
-            coverage_result = conn.execute(coverage_query).fetchall()
-            
-            if not coverage_result:
-                return f"No coverage data found for {technology} in {location_str}."
-            
-            return str(coverage_result)
+        # Construct query based on whether district is provided
+        if district:
+            area_rows = cached_query(
+                "SELECT area_id FROM service_areas WHERE city LIKE :city AND district LIKE :district",
+                {"city": f"%{city}%", "district": f"%{district}%"},
+            )
+            location_str = f"{city} ({district})"
+        else:
+            area_rows = cached_query("SELECT area_id FROM service_areas WHERE city LIKE :city", {"city": f"%{city}%"})
+            location_str = city
+        
+        if not area_rows:
+            return f"No service area found for {location_str}."
+        
+        area_id = area_rows[0][0]
+        
+        # Now check coverage quality
+        coverage_result = cached_query(
+            "SELECT * FROM coverage_quality WHERE area_id = :area_id AND technology = :technology",
+            {"area_id": area_id, "technology": technology},
+        )
+        
+        if not coverage_result:
+            return f"No coverage data found for {technology} in {location_str}."
+        
+        return str(coverage_result)
 
     def check_my_coverage(technology: str = "5G") -> str:
         """Check for coverage quality in the customer's inferred location."""
-        # Use customer_id from the closure
-        target_customer_id = customer_id
-        db = get_database()
-        from sqlalchemy import text
-        with db._engine.connect() as conn:
-            # Infer location from customer data
-            print(f"DEBUG: Inferring location for customer_id: {target_customer_id}")
-            cust_query = text(f"SELECT address FROM customers WHERE customer_id = '{target_customer_id}'")
-            cust_result = conn.execute(cust_query).fetchone()
-            
-            location = None
-            if cust_result and cust_result[0]:
-                address = cust_result[0]
-                # Simple heuristic: assume city is one of the known cities or part of the address string
-                known_cities = ['Bangalore', 'Mumbai', 'Delhi', 'New York', 'Los Angeles', 'Chicago', 'Hyderabad']
-                for city in known_cities:
-                    if city.lower() in address.lower():
-                        location = city
-                        break
-            
-            if not location:
-                print("DEBUG: check_my_coverage could not infer location.")
-                return "Could not infer your location from your profile. Please provide a specific city."
-
-            print(f"DEBUG: check_my_coverage inferred location: {location}")
-            return check_location_coverage(location, technology)
-
+        # Location was inferred from the customer's address when the context was loaded
+        if not customer_id or not customer_context:
+            return "No customer profile is available. Please provide a specific city."
+        location = customer_context.get("location")
+        if not location:
+            print("DEBUG: check_my_coverage could not infer location.")
+            return "Could not infer your location from your profile. Please provide a specific city."
 
+        print(f"DEBUG: check_my_coverage inferred location: {location}")
+        return check_location_coverage(location["city"], location.get("district"), technology=technology)
 
     # 2. Troubleshooting Docs Tool
     def search_troubleshooting_docs(query: str) -> str:
         """Search technical documentation for troubleshooting steps."""
         try:
-            index = load_documents()
+            # Imported on first doc search so this route doesn't load LlamaIndex up front
+            from telecom_assistant.utils.document_loader import get_index, create_query_engine
+            index = get_index()
             if not index:
                 return "Error: Document index not available."
-            query_engine = index.as_query_engine()
+            query_engine = create_query_engine(index)
             response = query_engine.query(query)
             return str(response)
         except Exception as e:
@@ -130,11 +109,11 @@ def create_network_agents(customer_id: str = "CUST001"):
     # 1. User Proxy Agent
     user_proxy = autogen.UserProxyAgent(
         name="User_Proxy",
-        system_message=f"""You represent a customer with a network issue. You are Customer {customer_id} ({customer_name}). Your job is to:
+        system_message=f"""You represent a customer with a network issue. You are Customer {customer_id or "(anonymous)"} ({customer_name}). Your job is to:
         1. Present the customer's problem clearly.
         2. Ask clarifying questions if agents need more information.
         3. Summarize the final solution in simple terms once the agents have provided a resolution.
-        4. Terminate the chat when a solution is found and summarized.""",
+        4. Terminate the chat when a solution is found and summarized.{known_facts}""",
         human_input_mode="NEVER",
         max_consecutive_auto_reply=10,
         is_termination_msg=lambda x: "TERMINATE" in x.get("content", ""),
@@ -250,7 +229,7 @@ def create_network_agents(customer_id: str = "CUST001"):
     groupchat = autogen.GroupChat(
         agents=[user_proxy, network_agent, device_agent, integrator_agent],
         messages=[],
-        max_round=12
+        max_round=Config.AUTOGEN_MAX_ROUND
     )
     
     manager = autogen.GroupChatManager(
@@ -260,10 +239,10 @@ def create_network_agents(customer_id: str = "CUST001"):
     
     return user_proxy, manager
 
-def process_network_query(query: str, customer_id: str = "CUST001"):
+def process_network_query(query: str, customer_id: str = "CUST001", customer_context: dict = None):
     """Process a network troubleshooting query using AutoGen agents"""
     
-    user_proxy, manager = create_network_agents(customer_id)
+    user_proxy, manager = create_network_agents(customer_id, customer_context)
     
     # Initiate the chat
     user_proxy.initiate_chat(
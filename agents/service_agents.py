@@ -1,11 +1,10 @@
 from langgraph.prebuilt import create_react_agent
-from langchain_community.tools.sql_database.tool import QuerySQLDataBaseTool
 from langchain_core.tools import Tool
 from langchain_openai import ChatOpenAI
 from langchain_experimental.tools import PythonREPLTool
-from telecom_assistant.utils.database import get_database
-from telecom_assistant.utils.document_loader import load_documents
+from telecom_assistant.utils.database import get_database, CachedQuerySQLDataBaseTool
 from telecom_assistant.config.config import Config
+from telecom_assistant.utils.customer_context import format_customer_context
 import os
 
 # Set API Key
@@ -67,10 +66,12 @@ def estimate_data_usage(activities: str) -> str:
 def search_service_docs(query: str) -> str:
     """Search service plan documentation for qualitative details (benefits, terms)."""
     try:
-        index = load_documents()
+        # Imported on first doc search so this route doesn't load LlamaIndex up front
+        from telecom_assistant.utils.document_loader import get_index, create_query_engine
+        index = get_index()
         if not index:
             return "Error: Document index not available."
-        query_engine = index.as_query_engine()
+        query_engine = create_query_engine(index)
         response = query_engine.query(query)
         return str(response)
     except Exception as e:
@@ -84,7 +85,7 @@ def create_service_agent():
     
     # Create Tools
     db = get_database()
-    sql_tool = QuerySQLDataBaseTool(db=db)
+    sql_tool = CachedQuerySQLDataBaseTool(db=db)
     python_tool = PythonREPLTool()
     
     usage_tool = Tool(
@@ -111,11 +112,16 @@ def create_service_agent():
     
     return agent_executor
 
-def process_recommendation_query(query: str):
+def process_recommendation_query(query: str, customer_context: dict = None):
     """Process a service recommendation query using the LangGraph agent"""
     
     agent_executor = create_service_agent()
     
+    # The customer's current plan and usage are already known; no SQL needed for them
+    facts = format_customer_context(customer_context)
+    if facts:
+        query = f"Known customer facts:\n{facts}\n\n{query}"
+    
     try:
         # LangGraph invoke takes {"messages": [...]}
         response = agent_executor.invoke({"messages": [("user", query)]})
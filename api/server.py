@@ -0,0 +1,132 @@
+import asyncio
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from telecom_assistant.config.config import Config
+from telecom_assistant.orchestration.graph import run_orchestrator, stream_orchestrator
+from telecom_assistant.orchestration.warmup import start_warmup, get_warmup_status
+from telecom_assistant.orchestration.checkpointer import stop_checkpoint_janitor
+from telecom_assistant.orchestration.scheduler import get_scheduler
+from telecom_assistant.orchestration.coalescing import get_single_flight
+from telecom_assistant.orchestration.resilience import breaker_stats
+
+# Headless ASGI service around the orchestrator.
+#
+# The agent nodes (CrewAI, AutoGen, LangChain, LlamaIndex) are blocking, so
+# every run is executed on a bounded worker pool; the event loop only handles
+# I/O. The graph, checkpointer, caches and DB pool are process-wide singletons
+# shared by all requests.
+
+executor = ThreadPoolExecutor(max_workers=Config.API_WORKERS, thread_name_prefix="orchestrator")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if Config.WARMUP_ON_START:
+        start_warmup()
+    yield
+    # Graceful shutdown: uvicorn has stopped accepting requests; let in-flight runs finish
+    print("Shutting down: waiting for in-flight orchestrator runs...")
+    await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+    stop_checkpoint_janitor()
+
+app = FastAPI(title="Telecom Assistant API", lifespan=lifespan)
+
+class ChatRequest(BaseModel):
+    query: str
+    # Required: agents act on (and can update) this customer's account
+    customer_id: str = Field(..., min_length=1)
+    thread_id: Optional[str] = None
+
+class ChatResponse(BaseModel):
+    response: str
+    thread_id: str
+
+@app.get("/health")
+async def health():
+    """Liveness plus warm-up readiness per component."""
+    return {"status": "ok", "warmup": get_warmup_status()}
+
+@app.get("/metrics")
+async def metrics():
+    """Scheduler state (running/waiting, admitted/rejected), request-coalescing counts and circuit breaker states."""
+    return {
+        "scheduler": get_scheduler().stats(),
+        "coalescing": get_single_flight().stats(),
+        "circuit_breakers": breaker_stats(),
+    }
+
+@app.post("/v1/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    """Run one turn and return the complete response."""
+    thread_id = request.thread_id or str(uuid.uuid4())
+    loop = asyncio.get_running_loop()
+    response = await loop.run_in_executor(
+        executor, run_orchestrator, request.query, request.customer_id, thread_id
+    )
+    return ChatResponse(response=response, thread_id=thread_id)
+
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+@app.post("/v1/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Run one turn and stream its events as Server-Sent Events.
+
+    Event types match stream_orchestrator(): `stage`, `token` and `final`
+    (plus `error` if the run fails). The first event is `thread`, carrying the
+    thread_id to use for follow-up turns.
+    """
+    thread_id = request.thread_id or str(uuid.uuid4())
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    done = object()
+    cancelled = False
+
+    def produce():
+        # Runs on the worker pool; hands events to the event loop as they happen
+        try:
+            for event in stream_orchestrator(request.query, request.customer_id, thread_id=thread_id):
+                if cancelled:
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, {"type": "error", "message": str(e)})
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, done)
+
+    async def event_stream():
+        nonlocal cancelled
+        loop.run_in_executor(executor, produce)
+        try:
+            yield _sse({"type": "thread", "thread_id": thread_id})
+            while True:
+                event = await queue.get()
+                if event is done:
+                    break
+                yield _sse(event)
+        finally:
+            # If the client went away, produce() stops at its next event and
+            # closes the graph stream: steps that already finished stay
+            # checkpointed, and the turn's remaining nodes are not run.
+            cancelled = True
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(
+        app,
+        host=Config.API_HOST,
+        port=Config.API_PORT,
+        timeout_graceful_shutdown=Config.API_SHUTDOWN_TIMEOUT_SECONDS,
+    )
@@ -9,6 +9,8 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 from telecom_assistant.ui.streamlit_app import render_login, render_admin_dashboard, render_customer_dashboard
+from telecom_assistant.orchestration.warmup import start_warmup
+from telecom_assistant.config.config import Config
 
 # Page Config
 st.set_page_config(
@@ -18,6 +20,10 @@ st.set_page_config(
 )
 
 def main():
+    # Preload indexes, engines and the DB in the background (once per process)
+    if Config.WARMUP_ON_START:
+        start_warmup()
+    
     # Initialize Session State
     if "logged_in" not in st.session_state:
         st.session_state["logged_in"] = False
@@ -13,6 +13,8 @@ class Config:
     # OpenAI Settings
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL_NAME = os.getenv("OPENAI_MODEL_NAME", "gpt-4o")
+    # Read by the OpenAI SDK itself; listed here so the cassette can intercept a custom endpoint
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
     
     # Paths
     PROJECT_ROOT = project_root
@@ -24,6 +26,171 @@ class Config:
     if not os.path.isabs(DATABASE_PATH):
         DATABASE_PATH = str(PROJECT_ROOT / DATABASE_PATH)
 
+    # Write each classified query to query_logs (the batch runner turns this off for replays)
+    QUERY_LOGGING_ENABLED = os.getenv("QUERY_LOGGING_ENABLED", "true").lower() == "true"
+    
+    # Conversation Checkpoints
+    # Stored in a sibling SQLite file so chat threads survive restarts and are
+    # shared between app processes.
+    CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", str(DATA_DIR / "checkpoints.db"))
+    CHECKPOINT_TTL_HOURS = float(os.getenv("CHECKPOINT_TTL_HOURS", "72"))
+    CHECKPOINT_MAX_PER_THREAD = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "20"))
+    CHECKPOINT_SWEEP_INTERVAL_MINUTES = float(os.getenv("CHECKPOINT_SWEEP_INTERVAL_MINUTES", "10"))
+    CHECKPOINT_VACUUM_INTERVAL_MINUTES = float(os.getenv("CHECKPOINT_VACUUM_INTERVAL_MINUTES", "360"))
+    
+    if not os.path.isabs(CHECKPOINT_DB_PATH):
+        CHECKPOINT_DB_PATH = str(PROJECT_ROOT / CHECKPOINT_DB_PATH)
+    
+    # Conversation History Compaction
+    # Older turns are folded into a running summary; prompts get the summary
+    # plus the most recent messages within HISTORY_TOKEN_BUDGET.
+    HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1200"))
+    HISTORY_MAX_MESSAGES = int(os.getenv("HISTORY_MAX_MESSAGES", "8"))
+    HISTORY_KEEP_MESSAGES = int(os.getenv("HISTORY_KEEP_MESSAGES", "4"))
+    HISTORY_MESSAGE_MAX_TOKENS = int(os.getenv("HISTORY_MESSAGE_MAX_TOKENS", "250"))
+    HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "300"))
+    
+    # Warm-up
+    # Components preloaded in background threads when the app starts
+    WARMUP_ON_START = os.getenv("WARMUP_ON_START", "true").lower() == "true"
+    WARMUP_COMPONENTS = [
+        c.strip() for c in os.getenv("WARMUP_COMPONENTS", "database,graph,vector_index,knowledge_engine").split(",") if c.strip()
+    ]
+    
+    # Agent Admission Control (orchestration/scheduler.py)
+    # Limits are "CATEGORY:n" lists; categories without a limit share AGENT_MAX_CONCURRENCY.
+    AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "8"))
+    AGENT_CATEGORY_LIMITS = os.getenv("AGENT_CATEGORY_LIMITS", "NETWORK:2,BILLING:2,SERVICE:3")
+    AGENT_QUEUE_LIMITS = os.getenv("AGENT_QUEUE_LIMITS", "NETWORK:10,BILLING:10,SERVICE:20,KNOWLEDGE:50,CUSTOMER_MANAGEMENT:20")
+    AGENT_QUEUE_TIMEOUT_SECONDS = float(os.getenv("AGENT_QUEUE_TIMEOUT_SECONDS", "60"))
+    # Approximate LLM provider request limit shared by all runs (0 disables the token bucket)
+    LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+    LLM_BURST_REQUESTS = float(os.getenv("LLM_BURST_REQUESTS", "60"))
+    
+    # Request Coalescing (orchestration/coalescing.py)
+    # Categories whose customer-independent questions share one in-flight run
+    COALESCE_CATEGORIES = [
+        c.strip().upper() for c in os.getenv("COALESCE_CATEGORIES", "KNOWLEDGE,NETWORK").split(",") if c.strip()
+    ]
+    
+    # Document Index
+    INDEX_STORAGE_DIR = os.getenv("INDEX_STORAGE_DIR", str(DATA_DIR / "storage"))
+    # "openai" or "local" (offline hashing embeddings computed with NumPy)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai").lower()
+    OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002")
+    LOCAL_EMBEDDING_DIM = int(os.getenv("LOCAL_EMBEDDING_DIM", "512"))
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))
+    
+    if not os.path.isabs(INDEX_STORAGE_DIR):
+        INDEX_STORAGE_DIR = str(PROJECT_ROOT / INDEX_STORAGE_DIR)
+    
+    # Chunking (utils/chunking.py)
+    # Heading-aware chunks of at most CHUNK_MAX_TOKENS; smaller sections under
+    # the same heading are packed together. Chunks within
+    # NEAR_DUPLICATE_MAX_DISTANCE SimHash bits (max 3) of a kept chunk are dropped.
+    CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "350"))
+    CHUNK_MIN_TOKENS = int(os.getenv("CHUNK_MIN_TOKENS", "80"))
+    NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv("NEAR_DUPLICATE_MAX_DISTANCE", "3"))
+    
+    # Ingestion (utils/ingestion.py)
+    # Files are parsed in INGEST_WORKERS processes; chunks are embedded and
+    # inserted INGEST_BATCH_SIZE at a time.
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+    
+    # Index Jobs (utils/index_jobs.py)
+    # Re-indexing runs as a background job; each build is published as a new
+    # version under INDEX_STORAGE_DIR and the newest INDEX_KEEP_VERSIONS are kept.
+    INDEX_KEEP_VERSIONS = int(os.getenv("INDEX_KEEP_VERSIONS", "2"))
+    # Serve published indexes from memory-mapped files shared by all workers
+    # on a host (utils/mmap_index.py) instead of a private copy per process
+    INDEX_MMAP_ENABLED = os.getenv("INDEX_MMAP_ENABLED", "true").lower() == "true"
+    # Running jobs refresh a heartbeat this often; a job whose heartbeat is
+    # older than INDEX_JOB_STALE_SECONDS (its worker died) is marked failed
+    INDEX_JOB_HEARTBEAT_SECONDS = float(os.getenv("INDEX_JOB_HEARTBEAT_SECONDS", "15"))
+    INDEX_JOB_STALE_SECONDS = int(os.getenv("INDEX_JOB_STALE_SECONDS", "120"))
+    INDEX_JOB_POLL_SECONDS = float(os.getenv("INDEX_JOB_POLL_SECONDS", "2"))
+    
+    # Document Retrieval
+    # Hybrid BM25 + vector search; queries whose BM25 confidence reaches
+    # LEXICAL_ONLY_MIN_CONFIDENCE (0-1) skip the embedding call entirely.
+    HYBRID_RETRIEVAL_ENABLED = os.getenv("HYBRID_RETRIEVAL_ENABLED", "true").lower() == "true"
+    LEXICAL_ONLY_MIN_CONFIDENCE = float(os.getenv("LEXICAL_ONLY_MIN_CONFIDENCE", "0.5"))
+    
+    # Rerank RERANK_CANDIDATES retrieved chunks locally and keep only
+    # query-relevant sentences within CONTEXT_TOKEN_BUDGET before synthesis
+    CONTEXT_COMPRESSION_ENABLED = os.getenv("CONTEXT_COMPRESSION_ENABLED", "true").lower() == "true"
+    RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "6"))
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "400"))
+    
+    # Knowledge tool routing falls back to the LLM selector below this similarity margin
+    SELECTOR_MIN_MARGIN = float(os.getenv("SELECTOR_MIN_MARGIN", "0.05"))
+    
+    # Reuse generated SQL for repeated knowledge question templates (utils/sql_templates.py)
+    SQL_TEMPLATE_CACHE_ENABLED = os.getenv("SQL_TEMPLATE_CACHE_ENABLED", "true").lower() == "true"
+    
+    # SQL Result Cache (utils/cache.py)
+    # Entries are invalidated by table writes; the TTL only bounds staleness
+    # for changes made outside this process.
+    SQL_RESULT_CACHE_ENABLED = os.getenv("SQL_RESULT_CACHE_ENABLED", "true").lower() == "true"
+    SQL_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("SQL_RESULT_CACHE_MAX_ENTRIES", "1024"))
+    SQL_RESULT_CACHE_TTL_SECONDS = float(os.getenv("SQL_RESULT_CACHE_TTL_SECONDS", "600"))
+    
+    # LLM Cassette (utils/llm_cassette.py)
+    # "record" stores every OpenAI request/response pair, "replay" serves them
+    # back offline; "off" leaves the network path untouched.
+    LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", "off").lower()
+    LLM_CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", str(DATA_DIR / "llm_cassette.db"))
+    LLM_CASSETTE_HOSTS = [
+        h.strip() for h in os.getenv("LLM_CASSETTE_HOSTS", "api.openai.com").split(",") if h.strip()
+    ]
+    # Replay delay = fixed ms + scale * originally recorded latency
+    LLM_CASSETTE_LATENCY_MS = float(os.getenv("LLM_CASSETTE_LATENCY_MS", "0"))
+    LLM_CASSETTE_LATENCY_SCALE = float(os.getenv("LLM_CASSETTE_LATENCY_SCALE", "0"))
+    # "error" raises CassetteMiss for unrecorded requests, "passthrough" sends and records them
+    LLM_CASSETTE_ON_MISS = os.getenv("LLM_CASSETTE_ON_MISS", "error").lower()
+    
+    if not os.path.isabs(LLM_CASSETTE_PATH):
+        LLM_CASSETTE_PATH = str(PROJECT_ROOT / LLM_CASSETTE_PATH)
+    
+    # HTTP API (api/server.py)
+    API_HOST = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT = int(os.getenv("API_PORT", "8000"))
+    API_WORKERS = int(os.getenv("API_WORKERS", "8"))
+    API_SHUTDOWN_TIMEOUT_SECONDS = int(os.getenv("API_SHUTDOWN_TIMEOUT_SECONDS", "300"))
+    
+    # If set, the Streamlit UI calls the API at this URL instead of running the graph in-process
+    ASSISTANT_API_URL = os.getenv("ASSISTANT_API_URL")
+    ASSISTANT_API_TIMEOUT_SECONDS = int(os.getenv("ASSISTANT_API_TIMEOUT_SECONDS", "600"))
+    
+    # Multi-intent Routing
+    # The classifier may split a message into up to MAX_INTENTS sub-queries,
+    # which are answered by their agents in parallel and merged into one reply.
+    MULTI_INTENT_ENABLED = os.getenv("MULTI_INTENT_ENABLED", "true").lower() == "true"
+    MAX_INTENTS = int(os.getenv("MAX_INTENTS", "3"))
+
+    # Deadlines and Circuit Breakers (orchestration/resilience.py)
+    # Each turn must answer within REQUEST_DEADLINE_SECONDS; each agent node
+    # also has its own "CATEGORY:seconds" limit. Timed-out nodes, and
+    # categories whose breaker opened after CIRCUIT_FAILURE_THRESHOLD
+    # consecutive failures or slow runs, answer with a quick degraded reply.
+    REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "90"))
+    NODE_DEADLINES = os.getenv("NODE_DEADLINES", "NETWORK:75,BILLING:75,SERVICE:45,KNOWLEDGE:30,CUSTOMER_MANAGEMENT:45")
+    # Time kept back from the request deadline for merging and history compaction
+    DEADLINE_RESERVE_SECONDS = float(os.getenv("DEADLINE_RESERVE_SECONDS", "5"))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+    CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "60"))
+    CIRCUIT_COOLDOWN_SECONDS = float(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "60"))
+    # AutoGen network troubleshooting: per-LLM-request timeout and group chat length
+    AUTOGEN_LLM_TIMEOUT_SECONDS = int(os.getenv("AUTOGEN_LLM_TIMEOUT_SECONDS", "30"))
+    AUTOGEN_MAX_ROUND = int(os.getenv("AUTOGEN_MAX_ROUND", "12"))
+
+    # UI Caching
+    # Customer profiles (and the customer context carried through the graph)
+    # are also invalidated explicitly on writes; the TTL only bounds staleness
+    # for changes made outside this process.
+    PROFILE_CACHE_TTL_SECONDS = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", "300"))
+
     @classmethod
     def validate(cls):
         """Validate critical configuration."""
@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from telecom_assistant.config.config import Config
+
+# Batch runner for load tests and nightly regression replays.
+#
+# Reads (customer_id, thread_id, query) records from a JSONL file or replays
+# rows from query_logs, runs them through run_orchestrator() in parallel and
+# appends one JSON line per record (with timings) to the output file once its
+# conversation finishes. Records that share a thread_id form a conversation and
+# run sequentially, in input order; different threads run in parallel.
+#
+# Every run gets its own run_id, and conversations are checkpointed under
+# "<run_id>:<thread_id>", so a rerun never continues a conversation the durable
+# checkpointer still holds from an earlier run. With --resume, conversations
+# whose records are all in the output file are skipped; the others run again
+# from their first record on a fresh thread (a record can then appear more than
+# once in the output; the last line wins).
+#
+#   python -m telecom_assistant.orchestration.batch --input queries.jsonl --output results.jsonl --workers 8
+
+def read_jsonl_records(path: str) -> list:
+    """Load records from a JSONL file. Missing record_id/thread_id are derived from the line number."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            record_id = str(record.get("record_id", f"line-{line_no}"))
+            records.append({
+                "record_id": record_id,
+                "customer_id": record.get("customer_id", "CUST001"),
+                "thread_id": record.get("thread_id") or f"batch-{record_id}",
+                "query": record["query"],
+            })
+    return records
+
+def read_query_log_records(limit: int = None, since_id: int = None) -> list:
+    """Replay rows from query_logs (oldest first), one thread per row."""
+    from sqlalchemy import text
+    from telecom_assistant.utils.database import get_database
+
+    sql = "SELECT id, customer_id, query_text FROM query_logs WHERE id > :since ORDER BY id"
+    params = {"since": since_id or 0}
+    if limit:
+        sql += " LIMIT :limit"
+        params["limit"] = limit
+    with get_database()._engine.connect() as conn:
+        rows = conn.execute(text(sql), params).fetchall()
+    return [
+        {
+            "record_id": f"log-{row[0]}",
+            "customer_id": row[1] or "CUST001",
+            "thread_id": f"replay-log-{row[0]}",
+            "query": row[2] or "",
+        }
+        for row in rows
+    ]
+
+def completed_record_ids(output_path: str, retry_errors: bool = False) -> set:
+    """Record IDs already written to the output file (optionally ignoring failed ones)."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # A partially written last line from an interrupted run
+                continue
+            if retry_errors and result.get("error"):
+                continue
+            done.add(result["record_id"])
+    return done
+
+def group_by_thread(records: list) -> list:
+    """Group records into conversations, preserving input order within each."""
+    groups = OrderedDict()
+    for record in records:
+        groups.setdefault(record["thread_id"], []).append(record)
+    return list(groups.values())
+
+def _init_worker(log_queries: bool):
+    Config.QUERY_LOGGING_ENABLED = log_queries
+
+def new_run_id() -> str:
+    """Unique, sortable ID for one batch run (e.g. '20260101120000-3fa2c1')."""
+    return time.strftime("%Y%m%d%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+def run_conversation(records: list, run_id: str) -> list:
+    """Run one thread's records sequentially (on this run's own thread) and return a result per record."""
+    from telecom_assistant.orchestration.graph import run_orchestrator
+
+    run_thread_id = f"{run_id}:{records[0]['thread_id']}"
+    results = []
+    for record in records:
+        started_at = time.time()
+        start = time.perf_counter()
+        response, error = None, None
+        try:
+            response = run_orchestrator(record["query"], record["customer_id"], thread_id=run_thread_id)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results.append({
+            **record,
+            "run_id": run_id,
+            "response": response,
+            "error": error,
+            "started_at": started_at,
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+            "worker": f"{os.getpid()}/{threading.current_thread().name}",
+        })
+    return results
+
+def run_batch(records: list, output_path: str, workers: int = 4, mode: str = "thread",
+              log_queries: bool = False, run_id: str = None) -> dict:
+    """
+    Run records in parallel, appending results to output_path as each conversation completes.
+
+    Returns:
+        dict: Summary with counts, error count, latency percentiles and throughput.
+    """
+    groups = group_by_thread(records)
+    run_id = run_id or new_run_id()
+    print(f"Batch run {run_id}: {len(records)} records in {len(groups)} conversations.")
+    if mode == "process":
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(log_queries,))
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch")
+
+    # Threads share this process's Config, so the setting is restored afterwards
+    previous_logging = Config.QUERY_LOGGING_ENABLED
+    if mode != "process":
+        _init_worker(log_queries)
+
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    try:
+        with pool, open(output_path, "a", encoding="utf-8") as out:
+            futures = [pool.submit(run_conversation, group, run_id) for group in groups]
+            for future in as_completed(futures):
+                for result in future.result():
+                    out.write(json.dumps(result) + "\n")
+                    latencies.append(result["elapsed_seconds"])
+                    errors += 1 if result["error"] else 0
+                    print(f"[{len(latencies)}/{len(records)}] {result['record_id']} "
+                          f"{'ERROR' if result['error'] else 'ok'} in {result['elapsed_seconds']:.2f}s")
+                # Flush per conversation: --resume skips finished conversations and reruns the rest
+                out.flush()
+    finally:
+        Config.QUERY_LOGGING_ENABLED = previous_logging
+
+    wall = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else None
+
+    return {
+        "run_id": run_id,
+        "records": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 2),
+        "throughput_per_second": round(len(latencies) / wall, 3) if wall > 0 else None,
+        "p50_seconds": percentile(0.50),
+        "p95_seconds": percentile(0.95),
+        "max_seconds": latencies[-1] if latencies else None,
+    }
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Run a JSONL query workload (or a query_logs replay) through the graph.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL file with customer_id, thread_id, query (and optional record_id) per line.")
+    source.add_argument("--from-query-logs", action="store_true", help="Replay rows from the query_logs table.")
+    parser.add_argument("--limit", type=int, help="Maximum number of query_logs rows to replay.")
+    parser.add_argument("--since-id", type=int, help="Only replay query_logs rows with a larger id.")
+    parser.add_argument("--output", required=True, help="JSONL file results are appended to.")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel workers (default: 4).")
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread", help="Worker type (default: thread).")
+    parser.add_argument("--resume", action="store_true", help="Skip conversations already completed in the output file.")
+    parser.add_argument("--retry-errors", action="store_true", help="With --resume, re-run records that previously failed.")
+    parser.add_argument("--log-queries", action="store_true", help="Also write the batch queries to query_logs (off by default).")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        records = read_jsonl_records(args.input)
+    else:
+        records = read_query_log_records(limit=args.limit, since_id=args.since_id)
+
+    if args.resume:
+        done = completed_record_ids(args.output, retry_errors=args.retry_errors)
+        # A conversation is only skipped as a whole: an unfinished one restarts
+        # from its first record, since its earlier turns' state isn't carried over
+        remaining = [group for group in group_by_thread(records)
+                     if not all(record["record_id"] in done for record in group)]
+        skipped = len(records) - sum(len(group) for group in remaining)
+        records = [record for group in remaining for record in group]
+        print(f"Resuming: {skipped} records already completed, {len(records)} remaining.")
+
+    if not records:
+        print("Nothing to run.")
+        return 0
+
+    summary = run_batch(records, args.output, workers=args.workers, mode=args.mode, log_queries=args.log_queries)
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
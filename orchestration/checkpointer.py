@@ -0,0 +1,178 @@
+import sqlite3
+import threading
+import time
+from langgraph.checkpoint.sqlite import SqliteSaver
+from telecom_assistant.config.config import Config
+
+class PruningSqliteSaver(SqliteSaver):
+    """
+    SQLite checkpointer that keeps conversation state bounded.
+
+    - Only the newest `max_checkpoints` checkpoints of each thread are kept,
+      counted across all of its namespaces (pruned as new ones are written).
+      The graph only ever resumes from the latest checkpoint, so older ones
+      are just history; the latest root checkpoint is always kept.
+    - Nested subgraphs (the ReAct agents) checkpoint under a new
+      "node:<task_id>" namespace on every turn. Those namespaces are deleted
+      when the thread's next turn starts, since the turn that ran them has
+      finished by then.
+    - Threads idle for longer than `ttl_seconds` are removed by evict_expired().
+
+    Checkpoints live on disk, so conversations survive restarts and are shared
+    between app processes pointing at the same file.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, ttl_seconds: float, max_checkpoints: int, **kwargs):
+        super().__init__(conn, **kwargs)
+        self.ttl_seconds = ttl_seconds
+        self.max_checkpoints = max(1, max_checkpoints)
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        # Last activity per thread, used for TTL eviction
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS thread_activity (
+                thread_id TEXT PRIMARY KEY,
+                last_seen REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_thread_activity_last_seen ON thread_activity (last_seen)"
+        )
+        self.conn.commit()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+
+        with self.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO thread_activity (thread_id, last_seen) VALUES (?, ?)
+                ON CONFLICT (thread_id) DO UPDATE SET last_seen = excluded.last_seen
+                """,
+                (thread_id, time.time()),
+            )
+            if checkpoint_ns == "" and metadata.get("source") == "input":
+                self._drop_subgraphs(cur, thread_id)
+            self._prune(cur, thread_id)
+        return next_config
+
+    def _drop_subgraphs(self, cur: sqlite3.Cursor, thread_id: str):
+        """Delete the subgraph namespaces of a thread's earlier turns."""
+        cur.execute("DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns != ''", (thread_id,))
+        cur.execute("DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns != ''", (thread_id,))
+
+    def _prune(self, cur: sqlite3.Cursor, thread_id: str):
+        """Drop all but the newest checkpoints (and their writes) of one thread, across namespaces."""
+        # Checkpoint IDs are time-ordered (uuid6), so ordering by ID is ordering by age
+        cur.execute(
+            """
+            DELETE FROM checkpoints
+            WHERE thread_id = ? AND checkpoint_id NOT IN (
+                SELECT checkpoint_id FROM checkpoints
+                WHERE thread_id = ?
+                ORDER BY checkpoint_id DESC LIMIT ?
+            ) AND NOT (checkpoint_ns = '' AND checkpoint_id = (
+                SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ''
+            ))
+            """,
+            (thread_id, thread_id, self.max_checkpoints, thread_id),
+        )
+        if cur.rowcount:
+            cur.execute(
+                """
+                DELETE FROM writes
+                WHERE thread_id = ? AND NOT EXISTS (
+                    SELECT 1 FROM checkpoints c
+                    WHERE c.thread_id = writes.thread_id AND c.checkpoint_ns = writes.checkpoint_ns
+                    AND c.checkpoint_id = writes.checkpoint_id
+                )
+                """,
+                (thread_id,),
+            )
+
+    def evict_expired(self) -> int:
+        """Delete every thread that has been idle for longer than the TTL. Returns the count."""
+        cutoff = time.time() - self.ttl_seconds
+        with self.cursor() as cur:
+            cur.execute("SELECT thread_id FROM thread_activity WHERE last_seen < ?", (cutoff,))
+            expired = [row[0] for row in cur.fetchall()]
+            for thread_id in expired:
+                cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                cur.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+                cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+        return len(expired)
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+
+    def vacuum(self):
+        """Return pages freed by pruning/eviction to the filesystem."""
+        with self.lock:
+            self.conn.commit()
+            self.conn.execute("VACUUM")
+
+class CheckpointJanitor(threading.Thread):
+    """Background thread that periodically evicts expired threads and vacuums the store."""
+
+    def __init__(self, saver: PruningSqliteSaver, sweep_interval: float, vacuum_interval: float):
+        super().__init__(name="checkpoint-janitor", daemon=True)
+        self.saver = saver
+        self.sweep_interval = sweep_interval
+        self.vacuum_interval = vacuum_interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        last_vacuum = time.monotonic()
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                evicted = self.saver.evict_expired()
+                if evicted:
+                    print(f"Evicted {evicted} expired conversation threads.")
+                if time.monotonic() - last_vacuum >= self.vacuum_interval:
+                    self.saver.vacuum()
+                    last_vacuum = time.monotonic()
+            except Exception as e:
+                print(f"Checkpoint janitor error: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+_checkpointer = None
+_janitor = None
+_lock = threading.Lock()
+
+def get_checkpointer() -> PruningSqliteSaver:
+    """Return the process-wide checkpointer, starting its janitor thread on first use."""
+    global _checkpointer, _janitor
+    if _checkpointer is None:
+        with _lock:
+            if _checkpointer is None:
+                # One connection shared across threads; SqliteSaver serializes access with its lock
+                conn = sqlite3.connect(Config.CHECKPOINT_DB_PATH, check_same_thread=False, timeout=30)
+                saver = PruningSqliteSaver(
+                    conn,
+                    ttl_seconds=Config.CHECKPOINT_TTL_HOURS * 3600,
+                    max_checkpoints=Config.CHECKPOINT_MAX_PER_THREAD,
+                )
+                _janitor = CheckpointJanitor(
+                    saver,
+                    sweep_interval=Config.CHECKPOINT_SWEEP_INTERVAL_MINUTES * 60,
+                    vacuum_interval=Config.CHECKPOINT_VACUUM_INTERVAL_MINUTES * 60,
+                )
+                _janitor.start()
+                _checkpointer = saver
+    return _checkpointer
+
+def stop_checkpoint_janitor():
+    """Stop the background janitor (used on graceful shutdown)."""
+    if _janitor is not None:
+        _janitor.stop()
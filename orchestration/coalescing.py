@@ -0,0 +1,97 @@
+import re
+import threading
+from concurrent.futures import Future
+from telecom_assistant.config.config import Config
+
+# Single-flight coalescing for customer-independent questions.
+#
+# During an outage many customers ask the same thing ("is there an outage in
+# Mumbai?") within minutes. The first request for a given key runs the agent;
+# identical requests (ignoring case, punctuation and spacing) that arrive while
+# it is running wait for its result instead of starting their own multi-agent run.
+
+# References that make an answer depend on who is asking
+_PERSONAL = re.compile(r"\b(i|i'm|im|me|my|mine|myself|we|our|us)\b", re.IGNORECASE)
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a question for its key: lowercase words in their original order.
+
+    Only case, punctuation and spacing are ignored. Word order, negations and
+    direction words ("prepaid to postpaid" vs "postpaid to prepaid") change the
+    answer, so they are kept.
+    """
+    return " ".join(re.findall(r"[a-z0-9]+", query.lower()))
+
+def coalescing_key(category: str, query: str, has_context: bool):
+    """
+    Return the coalescing key for a request, or None if it must run on its own.
+
+    Only categories in COALESCE_CATEGORIES are shared, and only for questions
+    without personal references or prior conversation context, whose answer is
+    therefore the same for every customer.
+    """
+    if category not in Config.COALESCE_CATEGORIES or has_context:
+        return None
+    if _PERSONAL.search(query):
+        return None
+    normalized = normalize_query(query)
+    if not normalized:
+        return None
+    return f"{category}:{normalized}"
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._leaders = {}
+        self._coalesced = {}
+
+    def do(self, key: str, category: str, fn, timeout: float = None):
+        """
+        Run fn() unless a call with the same key is already running, in which
+        case wait (up to `timeout` seconds, then raise TimeoutError) for and
+        return that call's result (or re-raise its error).
+
+        Returns:
+            tuple: (result, shared) where shared is True for coalesced callers.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self._leaders[category] = self._leaders.get(category, 0) + 1
+            else:
+                self._coalesced[category] = self._coalesced.get(category, 0) + 1
+
+        if not leader:
+            print(f"--- Coalesced with in-flight request: {key} ---")
+            return future.result(timeout=timeout), True
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "leaders": dict(self._leaders),
+                "coalesced": dict(self._coalesced),
+            }
+
+_single_flight = SingleFlight()
+
+def get_single_flight() -> SingleFlight:
+    return _single_flight
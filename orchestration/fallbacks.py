@@ -0,0 +1,124 @@
+import re
+import sys
+from telecom_assistant.utils.database import cached_query
+
+# Degraded answers for agent runs that fail, time out or whose circuit is open.
+#
+# They are built from data already at hand (the customer context, the BM25
+# index, cached SQL) without any LLM call, so they return in milliseconds.
+# Each says that it is a quick answer, so the customer knows to ask again
+# for the full analysis.
+
+# What the customer is shown for each kind of fallback
+_DEGRADED_NOTES = {
+    "KNOWLEDGE": "Our assistant can't give a full answer right now, so here is the most relevant part of our documentation.",
+    "NETWORK": "Our assistant can't run a full network check right now, so here is the latest status we have on record.",
+    "ACCOUNT": "Our assistant can't give a full answer right now, so here is a summary of your account.",
+}
+_ASK_AGAIN = "Ask again in a few minutes for a full analysis."
+
+# Shown when a category's fallback has nothing to offer (e.g. the index isn't loaded yet)
+_STATIC_NOTES = {
+    "KNOWLEDGE": "Our assistant can't search our documentation right now. Please ask again in a few minutes.",
+}
+
+_SNIPPET_MAX_CHARS = 600
+
+def _clip(text: str, limit: int = _SNIPPET_MAX_CHARS) -> str:
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + " ..."
+
+def knowledge_fallback(query: str, customer_context: dict = None) -> str:
+    """Best BM25 snippet from the in-memory knowledge base (no index load, embedding or LLM call)."""
+    # Importing the loader (LlamaIndex) or loading the index takes far too long
+    # for a fallback, so only an index this process already holds is used
+    document_loader = sys.modules.get("telecom_assistant.utils.document_loader")
+    index = document_loader.get_loaded_index() if document_loader else None
+    lexical = document_loader.get_lexical_index(index) if index is not None else None
+    hits, _ = lexical.search(query, top_k=1) if lexical else ([], 0.0)
+    if not hits:
+        return None
+    node = index.docstore.get_node(hits[0][0])
+    source = node.metadata.get("file_name") or node.metadata.get("section")
+    return f"From our documentation{f' ({source})' if source else ''}:\n\n{_clip(node.get_content())}"
+
+def _mentioned_location(query: str, customer_context: dict = None) -> str:
+    rows = cached_query(
+        "SELECT DISTINCT location FROM network_status UNION SELECT DISTINCT city FROM service_areas"
+    )
+    for location in sorted((row[0] for row in rows if row[0]), key=len, reverse=True):
+        if re.search(rf"\b{re.escape(location)}\b", query, re.IGNORECASE):
+            return location
+    location = (customer_context or {}).get("location")
+    return location["city"] if location else None
+
+def network_fallback(query: str, customer_context: dict = None) -> str:
+    """Known network status for the city in the question (or the customer's city)."""
+    location = _mentioned_location(query, customer_context)
+    if not location:
+        return None
+    rows = cached_query(
+        "SELECT location, status, incident_type, description, estimated_resolution "
+        "FROM network_status WHERE location LIKE :pattern",
+        {"pattern": f"%{location}%"},
+    )
+    if not rows:
+        return f"We have no reported network incidents in {location} at the moment."
+    lines = [f"Current network status for {location}:"]
+    for place, status, incident, description, resolution in rows:
+        line = f"- {place}: {status}"
+        if incident and incident != "None":
+            line += f" ({incident})"
+        if description:
+            line += f". {description}"
+        if resolution:
+            line += f" Estimated resolution: {resolution}."
+        lines.append(line)
+    return "\n".join(lines)
+
+def account_fallback(query: str, customer_context: dict = None) -> str:
+    """Plan and latest bill from the customer context."""
+    if not customer_context:
+        return None
+    profile, plan, usage = customer_context["profile"], customer_context.get("plan"), customer_context.get("usage")
+    lines = [f"Account {customer_context['customer_id']} ({profile.get('name')}) is {profile.get('account_status')}."]
+    if plan:
+        lines.append(f"Your plan is {plan.get('name')} at {plan.get('monthly_cost')} per month.")
+    if usage:
+        lines.append(
+            f"For {usage.get('billing_period_start')} to {usage.get('billing_period_end')} you used "
+            f"{usage.get('data_used_gb')} GB of data, {usage.get('voice_minutes_used')} minutes and "
+            f"{usage.get('sms_count_used')} SMS; the bill was {usage.get('total_bill_amount')} "
+            f"including {usage.get('additional_charges')} in additional charges."
+        )
+    return " ".join(lines)
+
+# category -> (fallback, note)
+_FALLBACKS = {
+    "KNOWLEDGE": (knowledge_fallback, _DEGRADED_NOTES["KNOWLEDGE"]),
+    "NETWORK": (network_fallback, _DEGRADED_NOTES["NETWORK"]),
+    "BILLING": (account_fallback, _DEGRADED_NOTES["ACCOUNT"]),
+    "SERVICE": (account_fallback, _DEGRADED_NOTES["ACCOUNT"]),
+    "CUSTOMER_MANAGEMENT": (account_fallback, _DEGRADED_NOTES["ACCOUNT"]),
+}
+
+def degraded_response(category: str, query: str, customer_context: dict = None) -> str:
+    """
+    Fast answer for a category whose agent is unavailable: a quick answer,
+    a static message, or None if nothing useful can be said.
+
+    Never raises: a failing fallback just means there is no quick answer.
+    """
+    if category not in _FALLBACKS:
+        return None
+    fallback, note = _FALLBACKS[category]
+    try:
+        answer = fallback(query, customer_context)
+    except Exception as e:
+        print(f"--- Degraded answer for {category} failed: {e} ---")
+        answer = None
+    if not answer:
+        return _STATIC_NOTES.get(category)
+    return f"{note} {_ASK_AGAIN}\n\n{answer}"
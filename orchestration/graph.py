@@ -1,55 +1,128 @@
 from typing import Dict, Any, TypedDict, Literal
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Send
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from telecom_assistant.config.config import Config
-from telecom_assistant.agents.billing_agents import process_billing_query
-from telecom_assistant.agents.network_agents import process_network_query
-from telecom_assistant.agents.service_agents import process_recommendation_query
-from telecom_assistant.agents.knowledge_agents import process_knowledge_query
-from telecom_assistant.agents.customer_management_agent import process_customer_management_query
-from telecom_assistant.utils.database import get_database
-from telecom_assistant.orchestration.state import AgentState
-from textblob import TextBlob
+from telecom_assistant.utils.analytics import record_query_log
+from telecom_assistant.orchestration.state import AgentState, reset_branches
+from telecom_assistant.orchestration.checkpointer import get_checkpointer
+from telecom_assistant.orchestration.history import compact_history, format_history_context
+from telecom_assistant.orchestration.scheduler import get_scheduler, AdmissionRejected, QueueTimeout
+from telecom_assistant.orchestration.coalescing import coalescing_key, get_single_flight
+from telecom_assistant.orchestration.resilience import (
+    CircuitOpen, DeadlineExceeded, call_with_deadline, node_time_budget, request_deadline,
+)
+from telecom_assistant.orchestration.fallbacks import degraded_response
+from telecom_assistant.utils.import_profiler import timed_import
+from telecom_assistant.utils.llm_cassette import install_from_config
+from telecom_assistant.utils.customer_context import refresh_customer_context
 import os
+import re
+import threading
 import uuid
-from sqlalchemy import text
+from concurrent.futures import TimeoutError as FutureTimeout
 
 # Set API Key
 os.environ["OPENAI_API_KEY"] = Config.OPENAI_API_KEY
 
+# Record or replay LLM traffic when LLM_CASSETTE_MODE is set
+install_from_config()
+
 # --- Helper Functions ---
 
+# Agent modules pull in CrewAI, AutoGen, LangChain agents and LlamaIndex, so
+# each is imported the first time its route is taken rather than at startup.
+AGENT_MODULES = {
+    "crew_ai_node": "telecom_assistant.agents.billing_agents",
+    "autogen_node": "telecom_assistant.agents.network_agents",
+    "langchain_node": "telecom_assistant.agents.service_agents",
+    "llamaindex_node": "telecom_assistant.agents.knowledge_agents",
+    "customer_management_node": "telecom_assistant.agents.customer_management_agent",
+}
+
+def _load_agent(node: str):
+    """Import (once) and return the agent module behind a graph node."""
+    return timed_import(AGENT_MODULES[node])
+
 def log_query_to_db(customer_id: str, query: str, category: str):
     """Logs the query to the database with sentiment analysis."""
+    if not Config.QUERY_LOGGING_ENABLED:
+        return
     try:
-        blob = TextBlob(query)
+        blob = timed_import("textblob").TextBlob(query)
         sentiment = blob.sentiment.polarity
         
-        db = get_database()
-        with db._engine.connect() as conn:
-            stmt = text("INSERT INTO query_logs (customer_id, query_text, category, sentiment_score) VALUES (:cid, :q, :cat, :sent)")
-            conn.execute(stmt, {"cid": customer_id, "q": query, "cat": category, "sent": sentiment})
-            conn.commit()
+        # Also updates the analytics rollups in the same transaction
+        record_query_log(customer_id, query, category, sentiment)
             
         print(f"Logged query: {category} (Sentiment: {sentiment:.2f})")
     except Exception as e:
         print(f"Failed to log query: {e}")
 
-def _format_query_with_history(query: str, history: list) -> str:
-    """Helper to append history to query."""
-    if not history:
+def _format_query_with_history(query: str, history: list, summary: str = "") -> str:
+    """Helper to prepend the conversation summary and recent messages to the query."""
+    context = format_history_context(history, summary, current_query=query)
+    if not context:
         return query
-        
-    recent = history[-10:] # Take last 10 messages for context
-    history_str = "\n".join([f"{msg['role']}: {msg['content']}" for msg in recent])
-    return f"Context from previous chat:\n{history_str}\n\nCurrent Query: {query}"
+    return f"Context from previous chat:\n{context}\n\nCurrent Query: {query}"
 
 # --- Nodes ---
 
+def load_customer_context(state: AgentState) -> AgentState:
+    """Load the customer's context at the start of a thread and refresh it after writes."""
+    current = state.get("customer_context")
+    try:
+        context = refresh_customer_context(current, state.get("customer_id"), state.get("query"))
+    except Exception as e:
+        print(f"Failed to load customer context: {e}")
+        return {}
+    # Only write the channel when something changed
+    return {} if context is current else {"customer_context": context}
+
+def _normalize_category(label: str) -> str:
+    label = label.strip().upper()
+    if "BILLING" in label: return "BILLING"
+    elif "NETWORK" in label: return "NETWORK"
+    elif "SERVICE" in label: return "SERVICE"
+    elif "KNOWLEDGE" in label: return "KNOWLEDGE"
+    elif "CUSTOMER" in label or "MANAGEMENT" in label: return "CUSTOMER_MANAGEMENT"
+    else: return "OTHER"
+
+CATEGORIES = ("BILLING", "NETWORK", "SERVICE", "KNOWLEDGE", "CUSTOMER_MANAGEMENT", "OTHER")
+
+_INTENT_LINE = re.compile(r"^\s*(?:[-*]|\d+[.)])?\s*([A-Za-z_ ]+?)\s*[:|]\s*(.+?)\s*$")
+
+def parse_intents(output: str, query: str) -> list:
+    """
+    Parse classifier output ("CATEGORY: sub-query" per line) into intents.
+    
+    Only lines labelled with a category name count, so preambles such as
+    "Note: ..." or "Category: BILLING" don't become branches; if there are
+    none, the whole output is normalized as a single category. A single
+    intent keeps the original query verbatim; at most MAX_INTENTS are returned.
+    """
+    intents = []
+    if Config.MULTI_INTENT_ENABLED:
+        for line in output.strip().splitlines():
+            match = _INTENT_LINE.match(line)
+            if not match:
+                continue
+            label = re.sub(r"\s+", "_", match.group(1).strip().upper())
+            if label not in CATEGORIES:
+                continue
+            intent = {"category": label, "query": match.group(2)}
+            if intent not in intents:
+                intents.append(intent)
+    if not intents:
+        intents = [{"category": _normalize_category(output), "query": query}]
+    intents = intents[:max(1, Config.MAX_INTENTS)]
+    if len(intents) == 1:
+        intents[0]["query"] = query
+    return intents
+
 def classify_query(state: AgentState) -> AgentState:
-    """Classifies the query into one of the defined categories."""
+    """Classifies the query into one or more (category, sub-query) intents."""
     query = state["query"]
     history = state.get("history", [])
     customer_id = state.get("customer_id", "UNKNOWN")
@@ -57,20 +130,31 @@ def classify_query(state: AgentState) -> AgentState:
     # Check for empty query
     if not query or not query.strip():
         print("--- Empty Query Detected: Routing to Fallback ---")
-        return {"category": "OTHER"}
+        return {"category": "OTHER", "intents": [{"category": "OTHER", "query": query}], "branch_responses": reset_branches()}
     
-    # Format history for prompt
+    # Format history for prompt (summary + recent messages, token-bounded)
     history_str = ""
-    if history:
-        # Take last 5 exchanges (10 messages)
-        recent = history[-10:]
-        history_str = "\nChat History:\n" + "\n".join([f"{msg['role']}: {msg['content']}" for msg in recent])
+    context = format_history_context(history, state.get("summary", ""), current_query=query)
+    if context:
+        history_str = "\nChat History:\n" + context
     
     llm = ChatOpenAI(model=Config.OPENAI_MODEL_NAME, temperature=0)
     
+    if Config.MULTI_INTENT_ENABLED:
+        instructions = (
+            "If the query contains several independent requests that belong to different categories, split it into "
+            "self-contained sub-queries (at most {max_intents}), one per line, in the form CATEGORY: sub-query.\n"
+            "        Otherwise output exactly one line in the form CATEGORY: query.\n"
+            "        Do not split a single request just because it mentions several details."
+        )
+        answer_label = "Intents:"
+    else:
+        instructions = "Answer with the category name only."
+        answer_label = "Category:"
+    
     prompt = PromptTemplate.from_template(
         """You are a query classifier for a telecom assistant.
-        Classify the following query into exactly one of these categories:
+        Classify the following query into these categories:
         - BILLING: Questions about bills, charges, payments, or account balance.
         - NETWORK: Questions about signal strength, network quality, internet speed, outages, or troubleshooting connectivity in specific locations.
         - SERVICE: Questions about plan recommendations, upgrading plans, or purchasing new services.
@@ -78,31 +162,85 @@ def classify_query(state: AgentState) -> AgentState:
         - CUSTOMER_MANAGEMENT: Requests to view or update personal info (e.g., "what is my name", "update address", "check my email").
         - OTHER: Anything else.
         
+        """ + instructions + """
+        
         {history}
         
         Query: {query}
         
-        Category:"""
+        """ + answer_label
     )
     
     chain = prompt | llm
-    result = chain.invoke({"query": query, "history": history_str})
-    category = result.content.strip().upper()
-    
-    # Normalize category
-    if "BILLING" in category: category = "BILLING"
-    elif "NETWORK" in category: category = "NETWORK"
-    elif "SERVICE" in category: category = "SERVICE"
-    elif "KNOWLEDGE" in category: category = "KNOWLEDGE"
-    elif "CUSTOMER" in category or "MANAGEMENT" in category: category = "CUSTOMER_MANAGEMENT"
-    else: category = "OTHER"
+    result = chain.invoke({"query": query, "history": history_str, "max_intents": Config.MAX_INTENTS})
+    intents = parse_intents(result.content, query)
     
-    print(f"--- Classified Query as: {category} ---")
+    for intent in intents:
+        print(f"--- Classified Query as: {intent['category']} ---")
+        # Log the query (each part of a multi-intent query under its own category)
+        log_query_to_db(customer_id, intent["query"], intent["category"])
     
-    # Log the query
-    log_query_to_db(customer_id, query, category)
-    
-    return {"category": category}
+    category = "+".join(dict.fromkeys(intent["category"] for intent in intents))
+    return {"category": category, "intents": intents, "branch_responses": reset_branches()}
+
+BUSY_MESSAGE = (
+    "We're handling an unusually high number of requests right now. "
+    "Please try again in a minute."
+)
+
+def _coalescing_key(state: AgentState, category: str):
+    """Key for sharing this run with identical in-flight requests, or None."""
+    has_context = bool(state.get("summary")) or len(state.get("history", [])) > 1
+    return coalescing_key(category, state["query"], has_context)
+
+def _branch_result(state: AgentState, category: str, response: str) -> AgentState:
+    """Package a branch's response; merge_responses turns the results into the turn's reply."""
+    return {"branch_responses": [{
+        "index": state.get("intent_index", 0), "category": category, "query": state["query"], "response": response,
+    }]}
+
+def _degrade(state: AgentState, category: str, reason: str, error_response: str) -> str:
+    """Quick answer for a branch whose agent timed out or is tripped; error_response if there is none."""
+    print(f"--- {category} degraded: {reason} ---")
+    return degraded_response(category, state["query"], state.get("customer_context")) or error_response
+
+def _run_agent(state: AgentState, category: str, label: str, run, coalesce_key: str = None) -> AgentState:
+    """
+    Run an agent call under admission control, its deadline and circuit breaker, and package its response.
+
+    Args:
+        state (AgentState): The branch's state (sub-query, history, customer, deadline).
+        category (str): Query category, used for scheduling.
+        label (str): Agent name used in error messages.
+        run (callable): Zero-argument function returning the response text.
+        coalesce_key (str): If set, concurrent runs with the same key share
+            one execution (see orchestration/coalescing.py).
+    """
+    budget = node_time_budget(category, state.get("deadline"))
+
+    def guarded():
+        # Only the run that actually executes counts towards the breaker;
+        # coalesced followers just share its outcome
+        return call_with_deadline(
+            category, lambda: str(run()), budget, scheduler=get_scheduler(), neutral=(AdmissionRejected,),
+        )
+
+    try:
+        if coalesce_key:
+            response, _ = get_single_flight().do(coalesce_key, category, guarded, timeout=budget)
+        else:
+            response = guarded()
+    except QueueTimeout as e:
+        # Couldn't start within the node's deadline
+        response = _degrade(state, category, str(e), BUSY_MESSAGE)
+    except AdmissionRejected as e:
+        print(f"--- Admission rejected for {category}: {e} ---")
+        response = BUSY_MESSAGE
+    except (CircuitOpen, DeadlineExceeded, FutureTimeout) as e:
+        response = _degrade(state, category, str(e) or f"{category} timed out", BUSY_MESSAGE)
+    except Exception as e:
+        response = _degrade(state, category, f"{type(e).__name__}: {e}", f"Error in {label}: {str(e)}")
+    return _branch_result(state, category, response)
 
 def crew_ai_node(state: AgentState) -> AgentState:
     """Handles billing queries using CrewAI."""
@@ -112,15 +250,14 @@ def crew_ai_node(state: AgentState) -> AgentState:
     customer_id = state.get("customer_id", "CUST001")
     
     # Inject history
-    final_query = _format_query_with_history(query, history)
+    final_query = _format_query_with_history(query, history, state.get("summary", ""))
     
-    try:
-        result = process_billing_query(customer_id, final_query)
-        response = str(result)
-        return {"response": response, "history": [{"role": "assistant", "content": response}]}
-    except Exception as e:
-        error_msg = f"Error in Billing Agent: {str(e)}"
-        return {"response": error_msg, "history": [{"role": "assistant", "content": error_msg}]}
+    customer_context = state.get("customer_context")
+    
+    return _run_agent(
+        state, "BILLING", "Billing Agent",
+        lambda: _load_agent("crew_ai_node").process_billing_query(customer_id, final_query, customer_context),
+    )
 
 def autogen_node(state: AgentState) -> AgentState:
     """Handles network queries using AutoGen."""
@@ -128,15 +265,21 @@ def autogen_node(state: AgentState) -> AgentState:
     query = state["query"]
     history = state.get("history", [])
     
-    final_query = _format_query_with_history(query, history)
+    customer_id = state.get("customer_id", "CUST001")
     
-    try:
-        result = process_network_query(final_query)
-        response = f"Network Troubleshooting Session Completed. Status: {result}"
-        return {"response": response, "history": [{"role": "assistant", "content": response}]}
-    except Exception as e:
-        error_msg = f"Error in Network Agent: {str(e)}"
-        return {"response": error_msg, "history": [{"role": "assistant", "content": error_msg}]}
+    final_query = _format_query_with_history(query, history, state.get("summary", ""))
+    
+    # Customer-independent questions (e.g. outages in a named city) are shared
+    # between concurrent requests, so they run without customer details.
+    coalesce_key = _coalescing_key(state, "NETWORK")
+    run_as = None if coalesce_key else customer_id
+    customer_context = None if coalesce_key else state.get("customer_context")
+    
+    def run():
+        result = _load_agent("autogen_node").process_network_query(final_query, run_as, customer_context)
+        return f"Network Troubleshooting Session Completed. Status: {result}"
+    
+    return _run_agent(state, "NETWORK", "Network Agent", run, coalesce_key)
 
 def langchain_node(state: AgentState) -> AgentState:
     """Handles service recommendations using LangChain."""
@@ -144,15 +287,14 @@ def langchain_node(state: AgentState) -> AgentState:
     query = state["query"]
     history = state.get("history", [])
     
-    final_query = _format_query_with_history(query, history)
+    final_query = _format_query_with_history(query, history, state.get("summary", ""))
     
-    try:
-        result = process_recommendation_query(final_query)
-        response = str(result)
-        return {"response": response, "history": [{"role": "assistant", "content": response}]}
-    except Exception as e:
-        error_msg = f"Error in Service Agent: {str(e)}"
-        return {"response": error_msg, "history": [{"role": "assistant", "content": error_msg}]}
+    customer_context = state.get("customer_context")
+    
+    return _run_agent(
+        state, "SERVICE", "Service Agent",
+        lambda: _load_agent("langchain_node").process_recommendation_query(final_query, customer_context),
+    )
 
 def llamaindex_node(state: AgentState) -> AgentState:
     """Handles knowledge queries using LlamaIndex."""
@@ -160,15 +302,17 @@ def llamaindex_node(state: AgentState) -> AgentState:
     query = state["query"]
     history = state.get("history", [])
     
-    final_query = _format_query_with_history(query, history)
+    final_query = _format_query_with_history(query, history, state.get("summary", ""))
     
-    try:
-        result = process_knowledge_query(final_query)
-        response = str(result)
-        return {"response": response, "history": [{"role": "assistant", "content": response}]}
-    except Exception as e:
-        error_msg = f"Error in Knowledge Agent: {str(e)}"
-        return {"response": error_msg, "history": [{"role": "assistant", "content": error_msg}]}
+    # Shared (coalesced) answers must not depend on who asked
+    coalesce_key = _coalescing_key(state, "KNOWLEDGE")
+    customer_context = None if coalesce_key else state.get("customer_context")
+    
+    return _run_agent(
+        state, "KNOWLEDGE", "Knowledge Agent",
+        lambda: _load_agent("llamaindex_node").process_knowledge_query(final_query, customer_context),
+        coalesce_key,
+    )
 
 def customer_management_node(state: AgentState) -> AgentState:
     """Handles customer management queries."""
@@ -177,24 +321,67 @@ def customer_management_node(state: AgentState) -> AgentState:
     history = state.get("history", [])
     customer_id = state.get("customer_id")
     
-    final_query = _format_query_with_history(query, history)
+    final_query = _format_query_with_history(query, history, state.get("summary", ""))
     
-    try:
-        result = process_customer_management_query(final_query, customer_id)
-        response = str(result)
-        return {"response": response, "history": [{"role": "assistant", "content": response}]}
-    except Exception as e:
-        error_msg = f"Error in Customer Management Agent: {str(e)}"
-        return {"response": error_msg, "history": [{"role": "assistant", "content": error_msg}]}
+    customer_context = state.get("customer_context")
+    
+    return _run_agent(
+        state, "CUSTOMER_MANAGEMENT", "Customer Management Agent",
+        lambda: _load_agent("customer_management_node").process_customer_management_query(
+            final_query, customer_id, customer_context
+        ),
+    )
 
 def fallback_handler(state: AgentState) -> AgentState:
     """Handles unclassified or other queries."""
     print("--- Routing to Fallback Handler ---")
     response = "I'm sorry, I couldn't understand your request. Please ask about billing, network issues, service plans, or technical support."
+    return _branch_result(state, "OTHER", response)
+
+INTENT_LABELS = {
+    "BILLING": "Billing",
+    "NETWORK": "Network",
+    "SERVICE": "Plans and services",
+    "KNOWLEDGE": "Technical information",
+    "CUSTOMER_MANAGEMENT": "Your account",
+    "OTHER": "Other",
+}
+
+def merge_responses(state: AgentState) -> AgentState:
+    """Join node: combine the branch responses of this turn into one reply."""
+    branches = sorted(state.get("branch_responses") or [], key=lambda branch: branch["index"])
+    if len(branches) == 1:
+        response = branches[0]["response"]
+    else:
+        response = "\n\n".join(
+            f"**{INTENT_LABELS.get(branch['category'], branch['category'])}** ({branch['query']})\n\n{branch['response']}"
+            for branch in branches
+        )
     return {"response": response, "history": [{"role": "assistant", "content": response}]}
 
 # --- Routing Logic ---
 
+def dispatch_intents(state: AgentState) -> list:
+    """Fan out one branch per intent; branches run concurrently and meet in merge_responses."""
+    intents = state.get("intents") or [{"category": state.get("category", "OTHER"), "query": state["query"]}]
+    history = state.get("history", [])
+    if len(intents) > 1 and history and history[-1].get("role") == "user" and history[-1].get("content") == state["query"]:
+        # Each branch sees only its own sub-query, not the combined message
+        history = history[:-1]
+    return [
+        Send(route_query({"category": intent["category"]}), {
+            "query": intent["query"],
+            "category": intent["category"],
+            "intent_index": index,
+            "history": history,
+            "summary": state.get("summary", ""),
+            "customer_id": state.get("customer_id"),
+            "customer_context": state.get("customer_context"),
+            "deadline": state.get("deadline"),
+        })
+        for index, intent in enumerate(intents)
+    ]
+
 def route_query(state: AgentState) -> Literal["crew_ai_node", "autogen_node", "langchain_node", "llamaindex_node", "customer_management_node", "fallback_handler"]:
     category = state["category"]
     
@@ -213,64 +400,156 @@ def route_query(state: AgentState) -> Literal["crew_ai_node", "autogen_node", "l
 
 # --- Graph Construction ---
 
-workflow = StateGraph(AgentState)
-
-# Add Nodes
-workflow.add_node("classify_query", classify_query)
-workflow.add_node("crew_ai_node", crew_ai_node)
-workflow.add_node("autogen_node", autogen_node)
-workflow.add_node("langchain_node", langchain_node)
-workflow.add_node("llamaindex_node", llamaindex_node)
-workflow.add_node("customer_management_node", customer_management_node)
-workflow.add_node("fallback_handler", fallback_handler)
-
-# Set Entry Point
-workflow.set_entry_point("classify_query")
-
-# Add Conditional Edges
-workflow.add_conditional_edges(
-    "classify_query",
-    route_query,
-    {
-        "crew_ai_node": "crew_ai_node",
-        "autogen_node": "autogen_node",
-        "langchain_node": "langchain_node",
-        "llamaindex_node": "llamaindex_node",
-        "customer_management_node": "customer_management_node",
-        "fallback_handler": "fallback_handler"
-    }
-)
+def build_graph():
+    """Build and compile the orchestration workflow."""
+    workflow = StateGraph(AgentState)
 
-# Add Edges to End
-workflow.add_edge("crew_ai_node", END)
-workflow.add_edge("autogen_node", END)
-workflow.add_edge("langchain_node", END)
-workflow.add_edge("llamaindex_node", END)
-workflow.add_edge("customer_management_node", END)
-workflow.add_edge("fallback_handler", END)
+    # Add Nodes
+    workflow.add_node("load_customer_context", load_customer_context)
+    workflow.add_node("classify_query", classify_query)
+    workflow.add_node("crew_ai_node", crew_ai_node)
+    workflow.add_node("autogen_node", autogen_node)
+    workflow.add_node("langchain_node", langchain_node)
+    workflow.add_node("llamaindex_node", llamaindex_node)
+    workflow.add_node("customer_management_node", customer_management_node)
+    workflow.add_node("fallback_handler", fallback_handler)
+    workflow.add_node("compact_history", compact_history)
 
-# Initialize MemorySaver
-checkpointer = MemorySaver()
+    # Set Entry Point
+    # Customer facts are loaded (or reused from the thread) before routing
+    workflow.set_entry_point("load_customer_context")
+    workflow.add_edge("load_customer_context", "classify_query")
 
-# Compile Graph with Checkpointer
-app = workflow.compile(checkpointer=checkpointer)
+    workflow.add_node("merge_responses", merge_responses)
 
-def run_orchestrator(query: str, customer_id: str = "CUST001", thread_id: str = None):
-    """Run the orchestration graph for a given query."""
+    # Add Conditional Edges
+    # Each intent is sent to its agent node; several intents run in parallel
+    workflow.add_conditional_edges(
+        "classify_query",
+        dispatch_intents,
+        [
+            "crew_ai_node",
+            "autogen_node",
+            "langchain_node",
+            "llamaindex_node",
+            "customer_management_node",
+            "fallback_handler",
+        ]
+    )
+
+    # Every route joins in merge_responses, then the conversation history is compacted
+    workflow.add_edge("crew_ai_node", "merge_responses")
+    workflow.add_edge("autogen_node", "merge_responses")
+    workflow.add_edge("langchain_node", "merge_responses")
+    workflow.add_edge("llamaindex_node", "merge_responses")
+    workflow.add_edge("customer_management_node", "merge_responses")
+    workflow.add_edge("fallback_handler", "merge_responses")
+    workflow.add_edge("merge_responses", "compact_history")
+    workflow.add_edge("compact_history", END)
+
+    # Compile Graph with the disk-backed checkpointer
+    return workflow.compile(checkpointer=get_checkpointer())
+
+_app = None
+_app_lock = threading.Lock()
+
+def get_app():
+    """Return the compiled graph, building it on first use."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = build_graph()
+    return _app
+
+# Human-readable labels for the stage updates emitted while streaming
+NODE_LABELS = {
+    "classify_query": "Classifying your query",
+    "crew_ai_node": "Billing agents are reviewing your account",
+    "autogen_node": "Network agents are troubleshooting",
+    "langchain_node": "Service advisor is comparing plans",
+    "llamaindex_node": "Searching the knowledge base",
+    "customer_management_node": "Customer management agent is working",
+    "fallback_handler": "Preparing a response",
+    "merge_responses": "Combining the answers",
+}
+
+# Nodes whose LLM tokens are internal and must not be shown to the user
+SILENT_NODES = {"load_customer_context", "classify_query", "merge_responses", "compact_history"}
+
+def _build_run(query: str, customer_id: str, thread_id: str = None):
+    """Build the graph inputs and thread config for a single turn."""
     if not thread_id:
         thread_id = str(uuid.uuid4())
         
     config = {"configurable": {"thread_id": thread_id}}
     
     # Add user message to history in input
-    # Since 'history' has operator.add, this will append to existing history
+    # The 'history' reducer appends this to the existing history
     user_msg = {"role": "user", "content": query}
     
     inputs = {
         "query": query, 
         "customer_id": customer_id, 
-        "history": [user_msg] 
+        "history": [user_msg],
+        "deadline": request_deadline(),
     }
+    return inputs, config
+
+def run_orchestrator(query: str, customer_id: str = "CUST001", thread_id: str = None, graph=None):
+    """Run the orchestration graph for a given query."""
+    graph = graph or get_app()
+    inputs, config = _build_run(query, customer_id, thread_id)
+    
+    result = graph.invoke(inputs, config=config)
+    return result["response"]
+
+def stream_orchestrator(query: str, customer_id: str = "CUST001", thread_id: str = None, graph=None):
+    """
+    Run the orchestration graph for a given query and yield events as they happen.
+    
+    Yields dicts of the form:
+        {"type": "stage", "node": ..., "label": ...}  when a graph node starts or finishes
+        {"type": "token", "content": ...}             for each user-facing LLM token
+        {"type": "final", "response": ..., "category": ...} once the turn is complete
+    
+    Tokens are only produced by LangChain-based agents; CrewAI, AutoGen and
+    LlamaIndex routes report stage updates and then the final response.
+    """
+    graph = graph or get_app()
+    inputs, config = _build_run(query, customer_id, thread_id)
+    
+    yield {"type": "stage", "node": "classify_query", "label": NODE_LABELS["classify_query"]}
+    
+    # Tokens from parallel branches would interleave, so multi-intent turns
+    # only report stages and the merged final response
+    multi_intent = False
+    
+    # subgraphs=True is needed to receive tokens from the ReAct agents,
+    # which run as nested graphs inside our nodes.
+    for namespace, mode, chunk in graph.stream(
+        inputs, config=config, stream_mode=["updates", "messages"], subgraphs=True
+    ):
+        if mode == "updates":
+            if namespace:
+                continue
+            for node, update in chunk.items():
+                if node == "classify_query" and update:
+                    intents = update.get("intents") or [{"category": update.get("category", "OTHER")}]
+                    multi_intent = len(intents) > 1
+                    for intent in intents:
+                        next_node = route_query({"category": intent["category"]})
+                        yield {"type": "stage", "node": next_node, "label": NODE_LABELS[next_node]}
+                    if multi_intent:
+                        yield {"type": "stage", "node": "merge_responses", "label": NODE_LABELS["merge_responses"]}
+        elif mode == "messages":
+            message, metadata = chunk
+            if multi_intent or metadata.get("langgraph_node") in SILENT_NODES:
+                continue
+            content = getattr(message, "content", None)
+            # Skip tool calls/results; only stream plain assistant text
+            if isinstance(content, str) and content and getattr(message, "type", "") in ("AIMessageChunk", "ai"):
+                yield {"type": "token", "content": content}
     
-    result = app.invoke(inputs, config=config)
-    return result["response"]
\ No newline at end of file
+    values = graph.get_state(config).values
+    yield {"type": "final", "response": values.get("response", ""), "category": values.get("category")}
@@ -0,0 +1,114 @@
+from langchain_openai import ChatOpenAI
+from langchain_core.prompts import PromptTemplate
+from telecom_assistant.config.config import Config
+from telecom_assistant.orchestration.state import AgentState, replace_history
+
+# Keeps prompt context roughly constant in size as a conversation grows:
+# older turns are folded into a running summary, and only the last few
+# messages are kept verbatim (each clipped, all within a token budget).
+
+SUMMARY_PROMPT = PromptTemplate.from_template(
+    """You maintain a running summary of a conversation between a telecom customer and a support assistant.
+    Update the summary with the new messages below. Keep facts the assistant may need later
+    (customer details, locations, devices, plans, amounts, open issues, actions taken) and drop pleasantries.
+    Write at most {max_words} words.
+
+    Current summary:
+    {summary}
+
+    New messages:
+    {messages}
+
+    Updated summary:"""
+)
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+def _clip(text: str, max_tokens: int) -> str:
+    """Truncate text to roughly max_tokens."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + " ..."
+
+def _format_messages(messages: list, max_tokens_per_message: int) -> list:
+    return [f"{msg['role']}: {_clip(str(msg['content']), max_tokens_per_message)}" for msg in messages]
+
+def format_history_context(history: list, summary: str = "", current_query: str = None) -> str:
+    """
+    Render the summary plus recent messages for a prompt, within HISTORY_TOKEN_BUDGET.
+
+    If the last message is the current query itself it is left out, since the
+    caller adds the query separately.
+    """
+    history = list(history or [])
+    if current_query is not None and history and history[-1].get("role") == "user" and history[-1].get("content") == current_query:
+        history = history[:-1]
+
+    budget = Config.HISTORY_TOKEN_BUDGET
+    parts = []
+    if summary:
+        summary_text = _clip(summary, Config.HISTORY_SUMMARY_MAX_TOKENS)
+        parts.append(f"Conversation summary: {summary_text}")
+        budget -= estimate_tokens(summary_text)
+
+    # Newest messages first until the budget runs out
+    lines = []
+    for line in reversed(_format_messages(history, Config.HISTORY_MESSAGE_MAX_TOKENS)):
+        cost = estimate_tokens(line)
+        if cost > budget:
+            break
+        lines.append(line)
+        budget -= cost
+
+    if lines:
+        parts.append("Recent messages:\n" + "\n".join(reversed(lines)))
+    return "\n".join(parts)
+
+def _update_summary(summary: str, evicted: list) -> str:
+    """Fold evicted messages into the running summary."""
+    messages = "\n".join(_format_messages(evicted, Config.HISTORY_MESSAGE_MAX_TOKENS))
+    try:
+        llm = ChatOpenAI(
+            model=Config.OPENAI_MODEL_NAME,
+            temperature=0,
+            max_tokens=Config.HISTORY_SUMMARY_MAX_TOKENS,
+        )
+        chain = SUMMARY_PROMPT | llm
+        result = chain.invoke({
+            "summary": summary or "(empty)",
+            "messages": messages,
+            "max_words": int(Config.HISTORY_SUMMARY_MAX_TOKENS * 0.75),
+        })
+        return result.content.strip()
+    except Exception as e:
+        # Never lose context because summarization failed; append and clip instead
+        print(f"History summarization failed: {e}")
+        combined = f"{summary}\n{messages}".strip()
+        return _clip(combined[-Config.HISTORY_SUMMARY_MAX_TOKENS * 4:], Config.HISTORY_SUMMARY_MAX_TOKENS)
+
+def compact_history(state: AgentState) -> AgentState:
+    """
+    Compaction stage run after every turn.
+
+    Once the history exceeds HISTORY_MAX_MESSAGES (or the token budget), the
+    oldest messages are summarized into `summary` and only the last
+    HISTORY_KEEP_MESSAGES are kept. The summarizer only ever sees the previous
+    summary plus the evicted messages, so each update is small.
+    """
+    history = state.get("history", [])
+    summary = state.get("summary", "")
+
+    total_tokens = sum(estimate_tokens(str(msg.get("content", ""))) for msg in history)
+    if len(history) <= Config.HISTORY_MAX_MESSAGES and total_tokens <= Config.HISTORY_TOKEN_BUDGET:
+        return {}
+
+    keep = Config.HISTORY_KEEP_MESSAGES
+    evicted, recent = history[:-keep] if keep else history, history[-keep:] if keep else []
+    if not evicted:
+        return {}
+
+    print(f"--- Compacting history: summarizing {len(evicted)} messages ---")
+    return {"summary": _update_summary(summary, evicted), "history": replace_history(recent)}
@@ -0,0 +1,178 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from telecom_assistant.config.config import Config
+
+# Deadlines and circuit breakers for the agent nodes.
+#
+# Every turn gets a request deadline (REQUEST_DEADLINE_SECONDS from when it
+# starts) and every node a per-category deadline (NODE_DEADLINES), whichever
+# comes first. The wait for a scheduler slot happens in the calling thread and
+# counts against that deadline. Admitted agent runs are blocking framework
+# calls that can't be cancelled, so they execute on a worker pool and the node
+# stops waiting when its deadline passes; an abandoned run finishes in the
+# background (bounded by the agents' own timeouts) and holds its scheduler
+# slot until then.
+#
+# A per-category circuit breaker opens after CIRCUIT_FAILURE_THRESHOLD
+# consecutive failures, timeouts or runs slower than CIRCUIT_SLOW_CALL_SECONDS.
+# While open, the category isn't called at all; after CIRCUIT_COOLDOWN_SECONDS
+# one trial run is let through, and its outcome closes or re-opens the breaker.
+
+class DeadlineExceeded(Exception):
+    """Raised when an agent run doesn't finish before its deadline."""
+
+class CircuitOpen(Exception):
+    """Raised when a category's circuit breaker is refusing calls."""
+
+def _parse_seconds(spec: str) -> dict:
+    """Parse 'NETWORK:75,KNOWLEDGE:30' into {'NETWORK': 75.0, 'KNOWLEDGE': 30.0}."""
+    seconds = {}
+    for item in (spec or "").split(","):
+        if ":" in item:
+            category, value = item.split(":", 1)
+            seconds[category.strip().upper()] = float(value)
+    return seconds
+
+_node_deadlines = _parse_seconds(Config.NODE_DEADLINES)
+
+def request_deadline() -> float:
+    """Wall-clock deadline for a turn starting now (stored in AgentState.deadline)."""
+    return time.time() + Config.REQUEST_DEADLINE_SECONDS
+
+def node_time_budget(category: str, deadline: float = None) -> float:
+    """Seconds a node may spend: its own limit, capped by what's left of the request deadline."""
+    budget = _node_deadlines.get(category, Config.REQUEST_DEADLINE_SECONDS)
+    if deadline:
+        # Leave time to merge the branches and compact the history
+        budget = min(budget, deadline - time.time() - Config.DEADLINE_RESERVE_SECONDS)
+    return max(0.0, budget)
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open trial after a cooldown."""
+
+    def __init__(self, failure_threshold: int, slow_call_seconds: float, cooldown_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_running = False
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = "half_open"
+            if self.state == "half_open" and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def release(self):
+        """Give back an allowed call that never ran (its outcome says nothing about the agent)."""
+        with self._lock:
+            self.trial_running = False
+
+    def record(self, ok: bool, seconds: float = 0.0):
+        """Record a call's outcome; slow successes count as failures."""
+        failed = not ok or seconds > self.slow_call_seconds
+        with self._lock:
+            self.trial_running = False
+            if not failed:
+                self.state = "closed"
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.trips += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, "trips": self.trips}
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(category: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for a category."""
+    with _breakers_lock:
+        if category not in _breakers:
+            _breakers[category] = CircuitBreaker(
+                failure_threshold=Config.CIRCUIT_FAILURE_THRESHOLD,
+                slow_call_seconds=Config.CIRCUIT_SLOW_CALL_SECONDS,
+                cooldown_seconds=Config.CIRCUIT_COOLDOWN_SECONDS,
+            )
+        return _breakers[category]
+
+def breaker_stats() -> dict:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {category: breaker.stats() for category, breaker in breakers.items()}
+
+# Runs hold a scheduler slot while on the pool, so it never needs more threads than there are slots
+_pool = ThreadPoolExecutor(max_workers=Config.AGENT_MAX_CONCURRENCY, thread_name_prefix="agent-run")
+
+def call_with_deadline(category: str, fn, budget: float, scheduler=None, neutral=()):
+    """
+    Run fn() through the category's circuit breaker, waiting at most `budget` seconds.
+
+    With a scheduler, a run slot is taken first (in the calling thread, within
+    the same budget) and released when fn() returns, even if the caller has
+    stopped waiting by then. Exceptions listed in `neutral` (e.g. admission
+    rejections) are re-raised without counting as a failure of the category.
+
+    Raises:
+        CircuitOpen: The breaker is refusing calls (fn is not run).
+        DeadlineExceeded: fn didn't finish in time (it keeps running in the background).
+    """
+    breaker = get_breaker(category)
+    if not breaker.allow():
+        raise CircuitOpen(f"{category} circuit is open")
+    if budget <= 0:
+        breaker.release()
+        raise DeadlineExceeded(f"No time left for {category}")
+
+    waited = time.monotonic()
+    if scheduler is not None:
+        try:
+            scheduler.acquire(category, timeout=budget)
+        except BaseException:
+            # Not being admitted says nothing about the agent's health
+            breaker.release()
+            raise
+    remaining = budget - (time.monotonic() - waited)
+
+    def task():
+        try:
+            return fn()
+        finally:
+            if scheduler is not None:
+                scheduler.release(category)
+
+    start = time.monotonic()
+    # Carry the caller's context (LangGraph run config and callbacks) into the
+    # worker thread, so LLM tokens produced there are still streamed
+    future = _pool.submit(contextvars.copy_context().run, task)
+    try:
+        result = future.result(timeout=max(0.0, remaining))
+    except FutureTimeout:
+        breaker.record(False)
+        raise DeadlineExceeded(f"{category} did not finish within {budget:.0f}s")
+    except neutral:
+        breaker.release()
+        raise
+    except Exception:
+        breaker.record(False)
+        raise
+    breaker.record(True, time.monotonic() - start)
+    return result
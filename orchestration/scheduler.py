@@ -0,0 +1,211 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from telecom_assistant.config.config import Config
+
+# Admission control in front of the agent nodes.
+#
+# Each category has a priority, a concurrency limit and a queue-depth limit.
+# Free slots always go to the highest-priority waiter whose category still has
+# capacity, so a burst of slow NETWORK/BILLING runs can't starve quick
+# KNOWLEDGE lookups. When a category's queue is full, requests are rejected
+# immediately instead of piling up. A shared token bucket approximates the
+# LLM provider's request rate limit: each run draws its expected number of
+# LLM calls before it starts.
+
+# priority: lower runs first; llm_calls: expected LLM requests per run
+CATEGORY_POLICIES = {
+    "KNOWLEDGE": {"priority": 0, "llm_calls": 2},
+    "CUSTOMER_MANAGEMENT": {"priority": 0, "llm_calls": 3},
+    "SERVICE": {"priority": 1, "llm_calls": 4},
+    "BILLING": {"priority": 2, "llm_calls": 8},
+    "NETWORK": {"priority": 2, "llm_calls": 12},
+}
+DEFAULT_POLICY = {"priority": 1, "llm_calls": 1}
+
+class AdmissionRejected(Exception):
+    """Raised when a run is refused because the system is saturated."""
+
+class QueueTimeout(AdmissionRejected):
+    """Raised when no slot (or LLM rate budget) frees up within the allowed wait."""
+
+def _parse_limits(spec: str) -> dict:
+    """Parse 'NETWORK:2,BILLING:2' into {'NETWORK': 2, 'BILLING': 2}."""
+    limits = {}
+    for item in (spec or "").split(","):
+        if ":" in item:
+            category, value = item.split(":", 1)
+            limits[category.strip().upper()] = int(value)
+    return limits
+
+class TokenBucket:
+    """Thread-safe token bucket; `rate` tokens are added per second up to `capacity`."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float, timeout: float) -> bool:
+        """Take `amount` tokens, waiting up to `timeout` seconds. Returns False on timeout."""
+        amount = min(amount, self.capacity)
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return True
+                wait = (amount - self.tokens) / self.rate if self.rate > 0 else timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    return False
+                self.cond.wait(wait)
+
+class AgentScheduler:
+    """Priority scheduler with per-category concurrency and queue-depth limits."""
+
+    def __init__(self, max_concurrency: int, category_limits: dict, queue_limits: dict,
+                 queue_timeout: float, llm_bucket: TokenBucket = None):
+        self.max_concurrency = max_concurrency
+        self.category_limits = category_limits
+        self.queue_limits = queue_limits
+        self.queue_timeout = queue_timeout
+        self.llm_bucket = llm_bucket
+        self.cond = threading.Condition()
+        self.running = {}
+        self.waiting = {}
+        self.total_running = 0
+        self.heap = []
+        self.seq = itertools.count()
+        self.stats_counters = {"admitted": {}, "rejected": {}}
+
+    def _policy(self, category: str) -> dict:
+        return CATEGORY_POLICIES.get(category, DEFAULT_POLICY)
+
+    def _has_capacity(self, category: str) -> bool:
+        limit = self.category_limits.get(category, self.max_concurrency)
+        return self.total_running < self.max_concurrency and self.running.get(category, 0) < limit
+
+    def _is_next(self, entry: tuple) -> bool:
+        """True if `entry` is the best-priority waiter that could run right now."""
+        for candidate in sorted(self.heap):
+            if self._has_capacity(candidate[2]):
+                return candidate is entry
+        return False
+
+    def _count(self, kind: str, category: str):
+        self.stats_counters[kind][category] = self.stats_counters[kind].get(category, 0) + 1
+
+    def _acquire(self, category: str, timeout: float = None):
+        wait = self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+        deadline = time.monotonic() + wait
+        with self.cond:
+            queue_limit = self.queue_limits.get(category)
+            if queue_limit is not None and self.waiting.get(category, 0) >= queue_limit:
+                self._count("rejected", category)
+                raise AdmissionRejected(f"{category} queue is full")
+
+            entry = (self._policy(category)["priority"], next(self.seq), category)
+            heapq.heappush(self.heap, entry)
+            self.waiting[category] = self.waiting.get(category, 0) + 1
+            try:
+                while not self._is_next(entry):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._count("rejected", category)
+                        raise QueueTimeout(f"Timed out waiting for a {category} slot")
+                    self.cond.wait(remaining)
+            finally:
+                self.heap.remove(entry)
+                heapq.heapify(self.heap)
+                self.waiting[category] -= 1
+                # Another waiter may now be at the head
+                self.cond.notify_all()
+
+            self.running[category] = self.running.get(category, 0) + 1
+            self.total_running += 1
+        return deadline
+
+    def acquire(self, category: str, timeout: float = None):
+        """
+        Take a run slot for `category`, waiting at most `timeout` seconds (and
+        never longer than the queue timeout). Every successful acquire must be
+        paired with release(), which may happen on another thread.
+
+        Raises AdmissionRejected if the category's queue is full, and
+        QueueTimeout if no slot or LLM rate budget frees up in time. A waiter
+        that gives up leaves the queue and is not charged any LLM tokens.
+        """
+        deadline = self._acquire(category, timeout)
+        try:
+            if self.llm_bucket is not None:
+                cost = self._policy(category)["llm_calls"]
+                if not self.llm_bucket.acquire(cost, max(0.0, deadline - time.monotonic())):
+                    with self.cond:
+                        self._count("rejected", category)
+                    raise QueueTimeout("LLM rate limit budget exhausted")
+            with self.cond:
+                self._count("admitted", category)
+        except BaseException:
+            self.release(category)
+            raise
+
+    def release(self, category: str):
+        with self.cond:
+            self.running[category] -= 1
+            self.total_running -= 1
+            self.cond.notify_all()
+
+    @contextmanager
+    def slot(self, category: str, timeout: float = None):
+        """Hold a run slot for `category` for the duration of the block (see acquire())."""
+        self.acquire(category, timeout)
+        try:
+            yield
+        finally:
+            self.release(category)
+
+    def stats(self) -> dict:
+        """Current running/waiting counts and cumulative admitted/rejected per category."""
+        with self.cond:
+            return {
+                "running": dict(self.running),
+                "waiting": dict(self.waiting),
+                "admitted": dict(self.stats_counters["admitted"]),
+                "rejected": dict(self.stats_counters["rejected"]),
+                "llm_tokens_available": round(self.llm_bucket.tokens, 1) if self.llm_bucket else None,
+            }
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> AgentScheduler:
+    """Return the process-wide scheduler configured from Config."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                bucket = None
+                if Config.LLM_REQUESTS_PER_MINUTE > 0:
+                    bucket = TokenBucket(
+                        capacity=Config.LLM_BURST_REQUESTS or Config.LLM_REQUESTS_PER_MINUTE,
+                        rate=Config.LLM_REQUESTS_PER_MINUTE / 60.0,
+                    )
+                _scheduler = AgentScheduler(
+                    max_concurrency=Config.AGENT_MAX_CONCURRENCY,
+                    category_limits=_parse_limits(Config.AGENT_CATEGORY_LIMITS),
+                    queue_limits=_parse_limits(Config.AGENT_QUEUE_LIMITS),
+                    queue_timeout=Config.AGENT_QUEUE_TIMEOUT_SECONDS,
+                    llm_bucket=bucket,
+                )
+    return _scheduler
@@ -1,9 +1,48 @@
 from typing import TypedDict, List, Any, Annotated
-import operator
+
+def replace_history(messages: list) -> dict:
+    """Wrap messages so that merge_history replaces the history instead of appending."""
+    return {"__replace__": list(messages)}
+
+def merge_history(left: list, right) -> list:
+    """
+    Reducer for AgentState.history.
+    
+    Lists are appended (as operator.add did). A value produced by
+    replace_history() overwrites the history, which is how the compaction
+    stage drops messages it has folded into the running summary.
+    """
+    if isinstance(right, dict) and "__replace__" in right:
+        return list(right["__replace__"])
+    return (left or []) + (right or [])
+
+def reset_branches() -> dict:
+    """Value that clears AgentState.branch_responses at the start of a turn."""
+    return {"__replace__": []}
+
+def merge_branch_responses(left: list, right) -> list:
+    """
+    Reducer for AgentState.branch_responses.
+    
+    Branches dispatched in parallel each append their result; the classifier
+    resets the list with reset_branches() so every turn starts empty.
+    """
+    return merge_history(left, right)
 
 class AgentState(TypedDict):
     query: str
     category: str
     response: str
-    history: Annotated[List[Any], operator.add]
+    history: Annotated[List[Any], merge_history]
+    summary: str
     customer_id: str
+    # Profile, plan, latest usage, location and device (utils/customer_context.py)
+    customer_context: dict
+    # Sub-queries found by the classifier, as [{"category", "query"}]
+    intents: List[dict]
+    # Position of a dispatched branch's intent (set in the branch's Send payload)
+    intent_index: int
+    # One {"index", "category", "query", "response"} per dispatched intent
+    branch_responses: Annotated[List[dict], merge_branch_responses]
+    # Wall-clock time (epoch seconds) by which the turn must be answered
+    deadline: float
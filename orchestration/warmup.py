@@ -0,0 +1,135 @@
+import argparse
+import sys
+import threading
+import time
+from telecom_assistant.config.config import Config
+from telecom_assistant.utils.import_profiler import timed_import
+
+# Warm-up preloads the expensive shared resources in background threads so
+# the first KNOWLEDGE / NETWORK / BILLING query after a deploy doesn't pay for
+# them. Every component is a process-wide cached getter guarded by its own
+# lock: a request that needs a component still warming simply waits for that
+# same load, and requests that need only warm components are never blocked.
+
+def _warm_database():
+    from sqlalchemy import text
+    from telecom_assistant.utils.database import get_database
+    from telecom_assistant.utils.analytics import ensure_analytics_tables
+    db = get_database()
+    with db._engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    ensure_analytics_tables()
+
+def _warm_graph():
+    from telecom_assistant.orchestration.graph import get_app
+    get_app()
+
+def _warm_vector_index():
+    timed_import("telecom_assistant.utils.document_loader").get_index()
+
+def _warm_knowledge_engine():
+    timed_import("telecom_assistant.agents.knowledge_agents").get_knowledge_engine()
+
+def _warm_agent_modules():
+    from telecom_assistant.orchestration.graph import AGENT_MODULES
+    for module_name in AGENT_MODULES.values():
+        timed_import(module_name)
+
+COMPONENTS = {
+    "database": _warm_database,
+    "graph": _warm_graph,
+    "vector_index": _warm_vector_index,
+    "knowledge_engine": _warm_knowledge_engine,
+    "agent_modules": _warm_agent_modules,
+}
+
+class WarmupManager:
+    """Runs component warm-ups in background threads and tracks readiness."""
+
+    def __init__(self, components: list):
+        unknown = [name for name in components if name not in COMPONENTS]
+        if unknown:
+            raise ValueError(f"Unknown warm-up components: {', '.join(unknown)}")
+        self.components = list(components)
+        self._lock = threading.Lock()
+        self._events = {name: threading.Event() for name in self.components}
+        self._status = {name: {"state": "pending", "seconds": None, "error": None} for name in self.components}
+        self._started = False
+
+    def start(self):
+        """Start one daemon thread per component (idempotent)."""
+        with self._lock:
+            if self._started:
+                return self
+            self._started = True
+        for name in self.components:
+            threading.Thread(target=self._run, args=(name,), name=f"warmup-{name}", daemon=True).start()
+        return self
+
+    def _run(self, name: str):
+        self._set(name, state="warming")
+        start = time.perf_counter()
+        try:
+            COMPONENTS[name]()
+            self._set(name, state="ready", seconds=round(time.perf_counter() - start, 2))
+            print(f"Warm-up: {name} ready in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            self._set(name, state="failed", seconds=round(time.perf_counter() - start, 2), error=str(e))
+            print(f"Warm-up: {name} failed: {e}")
+        finally:
+            self._events[name].set()
+
+    def _set(self, name: str, **fields):
+        with self._lock:
+            self._status[name].update(fields)
+
+    def status(self) -> dict:
+        """Snapshot of {component: {"state", "seconds", "error"}}."""
+        with self._lock:
+            return {name: dict(info) for name, info in self._status.items()}
+
+    def is_ready(self, name: str) -> bool:
+        return self.status().get(name, {}).get("state") == "ready"
+
+    def wait(self, name: str = None, timeout: float = None) -> bool:
+        """Wait for one component (or all of them) to finish warming. Returns False on timeout."""
+        names = [name] if name else self.components
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for component in names:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not self._events[component].wait(remaining):
+                return False
+        return True
+
+_manager = None
+_manager_lock = threading.Lock()
+
+def start_warmup(components: list = None) -> WarmupManager:
+    """Start the process-wide warm-up once and return its manager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = WarmupManager(components or Config.WARMUP_COMPONENTS).start()
+    return _manager
+
+def get_warmup_status() -> dict:
+    """Readiness per component, or an empty dict if warm-up was never started."""
+    return _manager.status() if _manager else {}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Preload indexes, engines and the DB, and report readiness.")
+    parser.add_argument("components", nargs="*", help=f"Components to warm (default: {', '.join(Config.WARMUP_COMPONENTS)}). "
+                                                      f"Available: {', '.join(COMPONENTS)}")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds to wait before giving up.")
+    args = parser.parse_args()
+
+    manager = start_warmup(args.components or None)
+    finished = manager.wait(timeout=args.timeout)
+
+    print(f"\n{'Component':<20} {'State':<10} {'Seconds':>8}  Error")
+    for name, info in manager.status().items():
+        seconds = "" if info["seconds"] is None else f"{info['seconds']:.2f}"
+        print(f"{name:<20} {info['state']:<10} {seconds:>8}  {info['error'] or ''}")
+
+    all_ready = finished and all(info["state"] == "ready" for info in manager.status().values())
+    sys.exit(0 if all_ready else 1)
@@ -0,0 +1,21 @@
+import os
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+# The repository root is the telecom_assistant package itself (modules import
+# telecom_assistant.*), so make it importable under that name wherever it is checked out.
+ROOT = Path(__file__).resolve().parent.parent
+if "telecom_assistant" not in sys.modules:
+    package = types.ModuleType("telecom_assistant")
+    package.__path__ = [str(ROOT)]
+    sys.modules["telecom_assistant"] = package
+
+# Keep tests offline and away from the real data files
+_tmp = tempfile.mkdtemp(prefix="telecom-assistant-tests-")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("CHECKPOINT_DB_PATH", os.path.join(_tmp, "checkpoints.db"))
+os.environ.setdefault("QUERY_LOGGING_ENABLED", "false")
+os.environ.setdefault("WARMUP_ON_START", "false")
+os.environ.setdefault("LLM_CASSETTE_MODE", "off")
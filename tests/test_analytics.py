@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine, text
+from telecom_assistant.utils import analytics
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'analytics.db'}")
+    monkeypatch.setattr(analytics, "get_database", lambda: SimpleNamespace(_engine=engine))
+    monkeypatch.setattr(analytics, "_initialized", False)
+    return engine
+
+def test_rollups_track_every_logged_query(engine):
+    analytics.record_query_log("CUST001", "why is my bill high", "BILLING", -0.5)
+    analytics.record_query_log("CUST001", "thanks, great service", "SERVICE", 0.8)
+    analytics.record_query_log("CUST002", "roaming rates", "BILLING", 0.0)
+    analytics.record_query_log(None, "hello", None, None)
+
+    summary = analytics.get_analytics_summary()
+    assert summary["total_queries"] == 4
+    assert summary["active_users"] == 2
+    assert summary["by_category"] == {"BILLING": 2, "SERVICE": 1, "OTHER": 1}
+    assert summary["by_sentiment"] == {"Negative": 1, "Positive": 1, "Neutral": 2}
+    assert summary["avg_sentiment"] == pytest.approx(0.3 / 4)
+
+    volume = analytics.get_query_volume("hour")
+    assert len(volume) == 1 and volume[0]["queries"] == 4
+
+def test_existing_logs_are_backfilled_once(engine):
+    with engine.begin() as conn:
+        conn.execute(text(analytics._SCHEMA[0]))
+        conn.execute(text(
+            "INSERT INTO query_logs (timestamp, customer_id, query_text, category, sentiment_score) VALUES "
+            "('2026-01-01 10:15:00', 'CUST001', 'a', 'NETWORK', 0.5), "
+            "('2026-01-01 11:20:00', 'CUST002', 'b', 'NETWORK', -0.5), "
+            "('2026-01-02 09:00:00', 'CUST001', 'c', 'KNOWLEDGE', 0.0)"
+        ))
+
+    summary = analytics.get_analytics_summary()
+    assert summary["total_queries"] == 3
+    assert summary["active_users"] == 2
+    assert analytics.get_query_volume("day") == [
+        {"bucket_start": "2026-01-01", "queries": 2},
+        {"bucket_start": "2026-01-02", "queries": 1},
+    ]
+    assert len(analytics.get_query_volume("hour")) == 3
+
+    # New rows are added on top of the backfilled totals, not backfilled again
+    analytics.record_query_log("CUST003", "d", "NETWORK", 0.0)
+    summary = analytics.get_analytics_summary()
+    assert summary["total_queries"] == 4
+    assert summary["active_users"] == 3
+    assert summary["by_category"]["NETWORK"] == 3
+
+def test_recent_logs_page_newest_first(engine):
+    for i in range(5):
+        analytics.record_query_log("CUST001", f"query {i}", "OTHER", 0.0)
+    first = analytics.get_recent_logs(limit=2)
+    second = analytics.get_recent_logs(limit=2, before_id=first[-1]["id"])
+    assert [row["query_text"] for row in first + second] == ["query 4", "query 3", "query 2", "query 1"]
+
+def test_unknown_granularity_is_rejected(engine):
+    with pytest.raises(ValueError):
+        analytics.get_query_volume("week")
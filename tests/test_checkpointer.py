@@ -0,0 +1,71 @@
+import operator
+import sqlite3
+from typing import Annotated, TypedDict
+from langgraph.graph import StateGraph, END
+from telecom_assistant.orchestration.checkpointer import PruningSqliteSaver
+
+class _State(TypedDict):
+    values: Annotated[list, operator.add]
+
+def _build_app(saver):
+    # Parent node invokes a compiled subgraph, as the ReAct agents do, so each
+    # turn checkpoints under a new "node:<task_id>" namespace
+    child = StateGraph(_State)
+    child.add_node("first", lambda state: {"values": ["a"]})
+    child.add_node("second", lambda state: {"values": ["b"]})
+    child.set_entry_point("first")
+    child.add_edge("first", "second")
+    child.add_edge("second", END)
+    subgraph = child.compile()
+
+    def agent(state):
+        subgraph.invoke({"values": []})
+        return {"values": ["answer"]}
+
+    parent = StateGraph(_State)
+    parent.add_node("agent", agent)
+    parent.set_entry_point("agent")
+    parent.add_edge("agent", END)
+    return parent.compile(checkpointer=saver)
+
+def _saver(max_checkpoints):
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    return conn, PruningSqliteSaver(conn, ttl_seconds=3600, max_checkpoints=max_checkpoints)
+
+def test_checkpoints_stay_capped_across_subgraph_namespaces():
+    conn, saver = _saver(max_checkpoints=5)
+    app = _build_app(saver)
+    config = {"configurable": {"thread_id": "thread-1"}}
+    for turn in range(10):
+        app.invoke({"values": [f"question {turn}"]}, config)
+
+    checkpoints = conn.execute("SELECT COUNT(*) FROM checkpoints WHERE thread_id = 'thread-1'").fetchone()[0]
+    namespaces = conn.execute(
+        "SELECT COUNT(DISTINCT checkpoint_ns) FROM checkpoints WHERE thread_id = 'thread-1' AND checkpoint_ns != ''"
+    ).fetchone()[0]
+    orphan_writes = conn.execute(
+        "SELECT COUNT(*) FROM writes w WHERE NOT EXISTS (SELECT 1 FROM checkpoints c WHERE c.thread_id = w.thread_id "
+        "AND c.checkpoint_ns = w.checkpoint_ns AND c.checkpoint_id = w.checkpoint_id)"
+    ).fetchone()[0]
+    assert checkpoints <= 5
+    # Only the last turn's subgraph is left
+    assert namespaces <= 1
+    assert orphan_writes == 0
+    # The conversation itself is intact
+    assert app.get_state(config).values["values"].count("answer") == 10
+
+def test_latest_root_checkpoint_survives_a_long_subgraph():
+    conn, saver = _saver(max_checkpoints=1)
+    app = _build_app(saver)
+    config = {"configurable": {"thread_id": "thread-2"}}
+    app.invoke({"values": ["first"]}, config)
+    app.invoke({"values": ["second"]}, config)
+    assert app.get_state(config).values["values"] == ["first", "answer", "second", "answer"]
+
+def test_evict_expired_removes_idle_threads():
+    conn, saver = _saver(max_checkpoints=5)
+    app = _build_app(saver)
+    app.invoke({"values": ["hi"]}, {"configurable": {"thread_id": "idle"}})
+    saver.ttl_seconds = -1
+    assert saver.evict_expired() == 1
+    assert conn.execute("SELECT COUNT(*) FROM checkpoints WHERE thread_id = 'idle'").fetchone()[0] == 0
@@ -0,0 +1,44 @@
+from telecom_assistant.utils.chunking import NearDuplicateFilter, chunk_text, simhash, split_sections
+
+DOCUMENT = """# Roaming
+Intro to roaming.
+
+## Activation
+Dial *123# to activate international roaming before you travel.
+
+## Charges
+Roaming calls cost 2 per minute.
+
+# Billing
+Bills are issued monthly.
+"""
+
+def test_sections_carry_their_heading_path():
+    sections = split_sections(DOCUMENT)
+    assert [path for path, _ in sections] == [["Roaming"], ["Roaming", "Activation"], ["Roaming", "Charges"], ["Billing"]]
+
+def test_chunks_never_span_top_level_sections():
+    chunks = chunk_text(DOCUMENT, max_tokens=200, min_tokens=50)
+    # Small roaming sections are packed together; billing stays separate
+    assert len(chunks) == 2
+    assert "Activation" in chunks[0][1] and "Charges" in chunks[0][1]
+    assert "Bills are issued" not in chunks[0][1]
+    assert chunks[1][0] == "Billing"
+
+def test_long_sections_are_split_and_keep_their_heading():
+    body = "\n\n".join(f"Paragraph {i} " + "word " * 40 for i in range(6))
+    chunks = chunk_text(f"# Guide\n## Setup\n{body}", max_tokens=120, min_tokens=0)
+    assert len(chunks) > 1
+    assert all(text.startswith("Guide\nSetup\n") for _, text in chunks)
+    assert all(len(text) // 4 + 1 <= 120 + 10 for _, text in chunks)
+
+def test_near_duplicates_are_detected():
+    text = "To set up the APN open Settings, choose Mobile Network, then Access Point Names and add a new entry named internet."
+    near_copy = text.replace("entry", "profile")
+    other = "Bills are issued on the first day of every month and can be paid online or at any store."
+
+    assert bin(simhash(text) ^ simhash(near_copy)).count("1") < bin(simhash(text) ^ simhash(other)).count("1")
+    dedup = NearDuplicateFilter(max_distance=3)
+    assert not dedup.seen(simhash(text))
+    assert dedup.seen(simhash(text))
+    assert not dedup.seen(simhash(other))
@@ -0,0 +1,67 @@
+import threading
+import time
+import pytest
+from telecom_assistant.orchestration.coalescing import SingleFlight, coalescing_key, normalize_query
+
+def _run_concurrently(single_flight, key, fn, followers=3):
+    """Start a leader running fn, then `followers` identical calls while it is in flight."""
+    started, finish = threading.Event(), threading.Event()
+    outcomes = []
+
+    def leader_fn():
+        started.set()
+        finish.wait(timeout=2)
+        return fn()
+
+    def call(target):
+        try:
+            outcomes.append(("ok", single_flight.do(key, "NETWORK", target, timeout=2)))
+        except Exception as e:
+            outcomes.append(("error", e))
+
+    leader = threading.Thread(target=call, args=(leader_fn,))
+    leader.start()
+    started.wait(timeout=2)
+    threads = [threading.Thread(target=call, args=(lambda: pytest.fail("follower ran fn"),)) for _ in range(followers)]
+    for thread in threads:
+        thread.start()
+    # Followers register synchronously under the lock before waiting
+    while single_flight.stats()["coalesced"].get("NETWORK", 0) < followers:
+        time.sleep(0.01)
+    finish.set()
+    for thread in [leader] + threads:
+        thread.join(timeout=2)
+    return outcomes
+
+def test_concurrent_identical_calls_share_one_run():
+    single_flight = SingleFlight()
+    calls = []
+    outcomes = _run_concurrently(single_flight, "NETWORK:outage in mumbai", lambda: calls.append(1) or "answer")
+
+    assert len(calls) == 1
+    assert sorted(shared for _, (_, shared) in outcomes) == [False, True, True, True]
+    assert all(result == "answer" for _, (result, _) in outcomes)
+    stats = single_flight.stats()
+    assert stats == {"in_flight": 0, "leaders": {"NETWORK": 1}, "coalesced": {"NETWORK": 3}}
+
+def test_leader_error_reaches_every_caller():
+    single_flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("agent failed")
+
+    outcomes = _run_concurrently(single_flight, "NETWORK:outage in mumbai", fail)
+    assert len(outcomes) == 4
+    assert all(kind == "error" and str(e) == "agent failed" for kind, e in outcomes)
+    # The key is released, so the next call runs again
+    assert single_flight.do("NETWORK:outage in mumbai", "NETWORK", lambda: "retry") == ("retry", False)
+
+def test_personal_or_contextual_questions_are_not_coalesced():
+    assert coalescing_key("NETWORK", "Is there an outage in Mumbai?", has_context=False) == "NETWORK:is there an outage in mumbai"
+    assert coalescing_key("NETWORK", "Why is my signal bad in Mumbai?", has_context=False) is None
+    assert coalescing_key("NETWORK", "Is there an outage in Mumbai?", has_context=True) is None
+    assert coalescing_key("BILLING", "What does roaming cost?", has_context=False) is None
+
+def test_normalization_keeps_word_order():
+    assert normalize_query("  Switch PREPAID to postpaid?! ") == "switch prepaid to postpaid"
+    assert normalize_query("switch prepaid to postpaid") != normalize_query("switch postpaid to prepaid")
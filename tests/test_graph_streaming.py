@@ -0,0 +1,20 @@
+from types import SimpleNamespace
+from langchain_core.language_models.fake_chat_models import FakeListChatModel, GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from telecom_assistant.orchestration import graph as g
+
+def test_agent_tokens_are_streamed_through_node(monkeypatch):
+    # Classifier routes to the service agent, whose chat model streams its answer
+    monkeypatch.setattr(g, "ChatOpenAI", lambda **kwargs: FakeListChatModel(responses=["SERVICE: which plan suits me"]))
+    agent_model = GenericFakeChatModel(messages=iter([AIMessage(content="Try the Premium plan")]))
+
+    def process_recommendation_query(query, customer_context=None):
+        return "".join(chunk.content for chunk in agent_model.stream(query))
+
+    monkeypatch.setattr(g, "_load_agent", lambda node: SimpleNamespace(process_recommendation_query=process_recommendation_query))
+
+    events = list(g.stream_orchestrator("which plan suits me", customer_id=None, thread_id="stream-test", graph=g.build_graph()))
+
+    tokens = [event["content"] for event in events if event["type"] == "token"]
+    assert "".join(tokens) == "Try the Premium plan"
+    assert events[-1] == {"type": "final", "response": "Try the Premium plan", "category": "SERVICE"}
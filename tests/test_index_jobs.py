@@ -0,0 +1,60 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine, text
+from telecom_assistant.utils import index_jobs
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    monkeypatch.setattr(index_jobs, "get_database", lambda: SimpleNamespace(_engine=engine))
+    monkeypatch.setattr(index_jobs, "_schema_ready", False)
+    return engine
+
+def _ago(seconds: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+def _running_job(engine, updated_at: str, heartbeat_at: str) -> int:
+    index_jobs._engine()
+    with engine.begin() as conn:
+        return conn.execute(
+            text("INSERT INTO index_jobs (status, updated_at, heartbeat_at) VALUES ('running', :updated, :heartbeat)"),
+            {"updated": updated_at, "heartbeat": heartbeat_at},
+        ).lastrowid
+
+def test_only_jobs_without_a_recent_heartbeat_are_recovered(engine, monkeypatch):
+    monkeypatch.setattr(index_jobs.Config, "INDEX_JOB_STALE_SECONDS", 60)
+    # A slow build: no progress for an hour, but its worker is alive
+    slow = _running_job(engine, updated_at=_ago(3600), heartbeat_at=_ago(5))
+    dead = _running_job(engine, updated_at=_ago(3600), heartbeat_at=_ago(300))
+
+    assert index_jobs.recover_stale_jobs() == 1
+    assert index_jobs.get_job(slow)["status"] == "running"
+    assert index_jobs.get_job(dead)["status"] == "failed"
+
+def test_heartbeat_is_refreshed_while_running(engine, monkeypatch):
+    monkeypatch.setattr(index_jobs.Config, "INDEX_JOB_HEARTBEAT_SECONDS", 0.01)
+    job_id = _running_job(engine, updated_at=_ago(3600), heartbeat_at=_ago(3600))
+    stop = threading.Event()
+    beat = threading.Thread(target=index_jobs._heartbeat, args=(job_id, stop))
+    beat.start()
+    try:
+        deadline = datetime.now(timezone.utc) + timedelta(seconds=2)
+        while index_jobs.get_job(job_id)["heartbeat_at"] < _ago(10):
+            assert datetime.now(timezone.utc) < deadline
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        beat.join(timeout=2)
+
+def test_existing_tables_gain_the_heartbeat_column(engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE index_jobs (job_id INTEGER PRIMARY KEY AUTOINCREMENT, status TEXT NOT NULL, "
+                          "requested_by TEXT, worker TEXT, files_done INTEGER NOT NULL DEFAULT 0, "
+                          "files_total INTEGER NOT NULL DEFAULT 0, current_file TEXT, chunks INTEGER, version TEXT, "
+                          "error TEXT, created_at TEXT, started_at TEXT, updated_at TEXT, finished_at TEXT)"))
+        conn.execute(text("INSERT INTO index_jobs (status, updated_at) VALUES ('running', :ts)"), {"ts": _ago(3600)})
+    assert index_jobs.recover_stale_jobs() == 1
+    assert index_jobs.list_jobs()[0]["heartbeat_at"] is None
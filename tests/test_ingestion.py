@@ -0,0 +1,24 @@
+from telecom_assistant.utils.ingestion import ingest_files, list_document_files
+
+class _Index:
+    def __init__(self):
+        self.nodes = []
+
+    def insert_nodes(self, nodes):
+        self.nodes.extend(nodes)
+
+def test_report_is_keyed_by_path_relative_to_the_documents_dir(tmp_path):
+    for folder, text in (("prepaid", "# Roaming\nPrepaid roaming packs start at 5 per day."),
+                         ("postpaid", "# Roaming\nPostpaid roaming is billed per minute and per MB used.")):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "faq.md").write_text(text, encoding="utf-8")
+
+    progress = []
+    index = _Index()
+    report = ingest_files(list_document_files(tmp_path), index, documents_dir=tmp_path, workers=1,
+                          progress=lambda done, total, file_report: progress.append(file_report["file"]))
+
+    assert sorted(report) == ["postpaid/faq.md", "prepaid/faq.md"]
+    assert all(stats["chunks"] == 1 and stats["error"] is None for stats in report.values())
+    assert progress == ["postpaid/faq.md", "prepaid/faq.md"]
+    assert len(index.nodes) == 2
@@ -0,0 +1,32 @@
+from telecom_assistant.orchestration import graph as g
+
+def test_multi_intent_output_is_split_into_branches():
+    output = "BILLING: why is my bill so high\n- network: no signal in Mumbai\n2) Customer Management: update my email"
+    assert g.parse_intents(output, "original") == [
+        {"category": "BILLING", "query": "why is my bill so high"},
+        {"category": "NETWORK", "query": "no signal in Mumbai"},
+        {"category": "CUSTOMER_MANAGEMENT", "query": "update my email"},
+    ]
+
+def test_single_intent_keeps_the_original_query():
+    assert g.parse_intents("SERVICE: plans", "Which plan suits me?") == [{"category": "SERVICE", "query": "Which plan suits me?"}]
+
+def test_unlabelled_lines_are_ignored():
+    output = "Note: the customer asks two things\nCategory: BILLING\nBILLING: bill\nNETWORK: signal\nBILLING: bill"
+    assert g.parse_intents(output, "q") == [
+        {"category": "BILLING", "query": "bill"},
+        {"category": "NETWORK", "query": "signal"},
+    ]
+
+def test_plain_label_falls_back_to_a_single_category():
+    assert g.parse_intents("Network issue", "q") == [{"category": "NETWORK", "query": "q"}]
+    assert g.parse_intents("I'm not sure", "q") == [{"category": "OTHER", "query": "q"}]
+
+def test_intents_are_capped(monkeypatch):
+    monkeypatch.setattr(g.Config, "MAX_INTENTS", 2)
+    output = "BILLING: a\nNETWORK: b\nSERVICE: c"
+    assert [intent["category"] for intent in g.parse_intents(output, "q")] == ["BILLING", "NETWORK"]
+
+def test_splitting_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(g.Config, "MULTI_INTENT_ENABLED", False)
+    assert g.parse_intents("BILLING: a\nNETWORK: b", "q") == [{"category": "BILLING", "query": "q"}]
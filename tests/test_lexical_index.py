@@ -0,0 +1,39 @@
+from telecom_assistant.utils.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+DOCS = [
+    ("volte", "Enable VoLTE in settings to make HD voice calls over 4G."),
+    ("apn", "Set the APN to internet to fix mobile data issues."),
+    ("roaming", "International roaming packs cover calls and data abroad."),
+    ("bills", "Bills are issued monthly and include roaming charges."),
+]
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("How do I enable the VoLTE calls?") == ["enable", "volte", "call"]
+
+def test_bm25_ranks_exact_term_matches_first():
+    index = BM25Index.from_texts(DOCS)
+    hits, confidence = index.search("volte calls", top_k=2)
+    assert hits[0][0] == "volte"
+    assert 0 < confidence <= 1
+
+    hits, _ = index.search("roaming charges on my bill")
+    assert hits[0][0] == "bills"
+    assert {doc_id for doc_id, _ in hits} == {"bills", "roaming"}
+
+def test_unknown_terms_lower_confidence():
+    index = BM25Index.from_texts(DOCS)
+    _, known = index.search("apn")
+    _, partly_unknown = index.search("apn reset procedure")
+    assert partly_unknown < known
+    assert index.search("completely unrelated words") == ([], 0.0)
+
+def test_saved_index_scores_the_same(tmp_path):
+    index = BM25Index.from_texts(DOCS)
+    path = tmp_path / "lexical_index.json"
+    index.save(str(path))
+    assert BM25Index.load(str(path)).search("mobile data apn") == index.search("mobile data apn")
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+    assert [node_id for node_id, _ in fused] == ["b", "a", "d", "c"]
+    assert fused[0][1] == 1 / 62 + 1 / 61
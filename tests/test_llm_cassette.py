@@ -0,0 +1,43 @@
+import time
+import httpx
+import openai
+import pytest
+from telecom_assistant.utils import llm_cassette
+from telecom_assistant.utils.llm_cassette import CassetteMiss, install_cassette, request_key, uninstall_cassette
+
+EMBEDDING = {"object": "list", "model": "text-embedding-3-small", "usage": {"prompt_tokens": 1, "total_tokens": 1},
+             "data": [{"object": "embedding", "index": 0, "embedding": [0.1, 0.2]}]}
+
+@pytest.fixture
+def cassette(tmp_path):
+    cassette = install_cassette("replay", str(tmp_path / "cassette.db"), hosts={"api.openai.com"})
+    yield cassette
+    uninstall_cassette()
+
+def _client():
+    return openai.OpenAI(api_key="sk-test", max_retries=2)
+
+def _capture_misses(monkeypatch) -> list:
+    misses = []
+    original = llm_cassette.Cassette.miss
+    monkeypatch.setattr(llm_cassette.Cassette, "miss", lambda self, request, key: misses.append(request) or original(self, request, key))
+    return misses
+
+def test_recorded_response_is_replayed(cassette, monkeypatch):
+    # Capture the exact request the SDK sends, then record a response for it
+    misses = _capture_misses(monkeypatch)
+    with pytest.raises(CassetteMiss):
+        _client().embeddings.create(model="text-embedding-3-small", input="roaming", encoding_format="float")
+    request = misses[0]
+    cassette.store.save(request_key(request), request, httpx.Response(200, json=EMBEDDING, request=request), 0.2)
+
+    result = _client().embeddings.create(model="text-embedding-3-small", input="roaming", encoding_format="float")
+    assert result.data[0].embedding == [0.1, 0.2]
+
+def test_miss_surfaces_unchanged_without_retries(cassette, monkeypatch):
+    misses = _capture_misses(monkeypatch)
+    start = time.monotonic()
+    with pytest.raises(CassetteMiss):
+        _client().embeddings.create(model="text-embedding-3-small", input="not recorded", encoding_format="float")
+    assert len(misses) == 1
+    assert time.monotonic() - start < 0.5
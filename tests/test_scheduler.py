@@ -0,0 +1,94 @@
+import threading
+import time
+import pytest
+from telecom_assistant.orchestration.scheduler import AdmissionRejected, AgentScheduler, QueueTimeout, TokenBucket
+
+def _scheduler(max_concurrency=1, category_limits=None, queue_limits=None, queue_timeout=5.0, llm_bucket=None):
+    return AgentScheduler(
+        max_concurrency=max_concurrency,
+        category_limits=category_limits or {},
+        queue_limits=queue_limits or {},
+        queue_timeout=queue_timeout,
+        llm_bucket=llm_bucket,
+    )
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.01)
+
+def test_free_slot_goes_to_the_highest_priority_waiter():
+    scheduler = _scheduler(max_concurrency=1)
+    scheduler.acquire("NETWORK")
+    order = []
+
+    def run(category):
+        with scheduler.slot(category):
+            order.append(category)
+
+    # NETWORK queues first, KNOWLEDGE (higher priority) second
+    threads = [threading.Thread(target=run, args=("NETWORK",))]
+    threads[0].start()
+    _wait_for(lambda: scheduler.stats()["waiting"].get("NETWORK") == 1)
+    threads.append(threading.Thread(target=run, args=("KNOWLEDGE",)))
+    threads[1].start()
+    _wait_for(lambda: scheduler.stats()["waiting"].get("KNOWLEDGE") == 1)
+
+    scheduler.release("NETWORK")
+    for thread in threads:
+        thread.join(timeout=2)
+    assert order == ["KNOWLEDGE", "NETWORK"]
+
+def test_category_at_its_limit_does_not_block_other_categories():
+    scheduler = _scheduler(max_concurrency=4, category_limits={"NETWORK": 1})
+    scheduler.acquire("NETWORK")
+    with pytest.raises(QueueTimeout):
+        scheduler.acquire("NETWORK", timeout=0.05)
+    start = time.monotonic()
+    with scheduler.slot("KNOWLEDGE", timeout=1.0):
+        pass
+    assert time.monotonic() - start < 0.5
+
+def test_full_queue_is_rejected_immediately():
+    scheduler = _scheduler(max_concurrency=1, queue_limits={"NETWORK": 1})
+    scheduler.acquire("NETWORK")
+    waiter = threading.Thread(target=lambda: pytest.raises(QueueTimeout, scheduler.acquire, "NETWORK", 0.5))
+    waiter.start()
+    _wait_for(lambda: scheduler.stats()["waiting"].get("NETWORK") == 1)
+
+    start = time.monotonic()
+    with pytest.raises(AdmissionRejected) as rejected:
+        scheduler.acquire("NETWORK")
+    assert not isinstance(rejected.value, QueueTimeout)
+    assert time.monotonic() - start < 0.1
+    waiter.join(timeout=2)
+
+def test_timed_out_waiter_leaves_the_queue_without_using_tokens():
+    bucket = TokenBucket(capacity=20, rate=0)
+    scheduler = _scheduler(max_concurrency=1, queue_timeout=10.0, llm_bucket=bucket)
+    scheduler.acquire("KNOWLEDGE")
+    tokens = bucket.tokens
+
+    start = time.monotonic()
+    with pytest.raises(QueueTimeout):
+        scheduler.acquire("NETWORK", timeout=0.1)
+    # The caller's timeout wins over the (longer) queue timeout
+    assert time.monotonic() - start < 1.0
+    stats = scheduler.stats()
+    assert stats["waiting"]["NETWORK"] == 0
+    assert stats["rejected"]["NETWORK"] == 1
+    assert scheduler.heap == []
+    assert bucket.tokens == tokens
+
+    scheduler.release("KNOWLEDGE")
+    with scheduler.slot("NETWORK", timeout=0.1):
+        assert scheduler.stats()["running"]["NETWORK"] == 1
+
+def test_exhausted_llm_budget_times_out_and_frees_the_slot():
+    scheduler = _scheduler(max_concurrency=1, llm_bucket=TokenBucket(capacity=2, rate=0))
+    with scheduler.slot("KNOWLEDGE"):
+        pass
+    with pytest.raises(QueueTimeout):
+        scheduler.acquire("KNOWLEDGE", timeout=0.1)
+    assert scheduler.stats()["running"]["KNOWLEDGE"] == 0
@@ -0,0 +1,58 @@
+from telecom_assistant.utils.cache import SQLResultCache, invalidate_tables, is_read_only, referenced_tables
+
+def test_read_only_detection():
+    assert is_read_only("SELECT * FROM customers WHERE customer_id = 'CUST001'")
+    assert is_read_only("with t as (select 1) select * from t;")
+    assert is_read_only("SELECT replace(name, 'a', 'b') FROM customers")
+    assert is_read_only("SELECT 'DELETE FROM customers' AS note")
+    assert is_read_only("SELECT 1 -- ; DROP TABLE customers")
+    assert not is_read_only("UPDATE customers SET name = 'x'")
+    assert not is_read_only("SELECT 1; DELETE FROM customers")
+    assert not is_read_only("WITH t AS (SELECT 1) DELETE FROM customers")
+    assert not is_read_only("REPLACE INTO customers (customer_id) VALUES ('x')")
+
+def test_referenced_tables_ignore_literals():
+    known = ["customers", "network_status", "service_plans"]
+    sql = "SELECT * FROM customers c JOIN service_plans p ON 1 WHERE c.note = 'network_status'"
+    assert referenced_tables(sql, known) == {"customers", "service_plans"}
+
+def test_cached_result_is_invalidated_by_its_own_tables_only():
+    cache = SQLResultCache(max_entries=10, ttl_seconds=60)
+    runs = []
+
+    def run(sql, tables):
+        return cache.get_or_run(sql, None, tables, lambda: runs.append(sql) or len(runs))
+
+    plans = "SELECT * FROM test_plans"
+    towers = "SELECT * FROM test_towers"
+    assert run(plans, ["test_plans"]) == 1
+    assert run(towers, ["test_towers"]) == 2
+    assert run(plans, ["test_plans"]) == 1
+    assert cache.stats["hits"] == 1
+
+    invalidate_tables("TEST_PLANS")
+    assert run(plans, ["test_plans"]) == 3
+    assert run(towers, ["test_towers"]) == 2
+    assert cache.stats["stale"] == 1
+
+def test_writes_run_every_time_and_invalidate_their_tables():
+    cache = SQLResultCache(max_entries=10, ttl_seconds=60)
+    reads = []
+    read = lambda: cache.get_or_run("SELECT * FROM test_usage", None, ["test_usage"], lambda: reads.append(1) or len(reads))
+
+    read()
+    cache.get_or_run("UPDATE test_usage SET data_used_gb = 1", None, ["test_usage"], lambda: None)
+    cache.get_or_run("UPDATE test_usage SET data_used_gb = 2", None, ["test_usage"], lambda: None)
+    assert cache.stats["writes"] == 2
+    assert read() == 2
+
+def test_params_are_part_of_the_key_and_rejected_results_are_not_stored():
+    cache = SQLResultCache(max_entries=10, ttl_seconds=60)
+    sql = "SELECT * FROM test_customers WHERE customer_id = :id"
+    assert cache.get_or_run(sql, {"id": "A"}, ["test_customers"], lambda: "a") == "a"
+    assert cache.get_or_run(sql, {"id": "B"}, ["test_customers"], lambda: "b") == "b"
+    assert cache.get_or_run(sql, {"id": "A"}, ["test_customers"], lambda: "other") == "a"
+
+    error = "Error: no such table"
+    assert cache.get_or_run("SELECT 1 FROM test_missing", None, [], lambda: error, should_cache=lambda r: not r.startswith("Error")) == error
+    assert cache.get_or_run("SELECT 1 FROM test_missing", None, [], lambda: "ok") == "ok"
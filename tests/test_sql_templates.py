@@ -0,0 +1,40 @@
+import pytest
+from telecom_assistant.utils import sql_templates
+from telecom_assistant.utils.sql_templates import _apply_transform, _is_single_select, extract_template, parameterize_sql
+
+@pytest.fixture
+def vocabulary(monkeypatch):
+    pairs = [("device_make", "Apple"), ("device_model", "iPhone 12"), ("device_model", "Galaxy S21"),
+             ("city", "Mumbai"), ("state", "IN"), ("technology", "4G LTE"), ("technology", "4G")]
+    monkeypatch.setattr(sql_templates, "_vocabulary", sorted(pairs, key=lambda pair: len(pair[1]), reverse=True))
+
+def test_questions_differing_only_in_entity_share_a_template(vocabulary):
+    template, slots = extract_template("Is the iPhone 12 compatible with 4G LTE in Mumbai?")
+    other, _ = extract_template("is the galaxy s21 compatible with 4G LTE in Mumbai")
+    assert template == other == "is the {device_model} compatible with {technology} in {city}"
+    assert [slot["value"] for slot in slots] == ["iPhone 12", "4G LTE", "Mumbai"]
+
+def test_state_codes_only_match_in_upper_case(vocabulary):
+    assert extract_template("what is 4G in Mumbai")[0] == "what is {technology} in {city}"
+
+def test_literals_become_bind_parameters():
+    slots = [{"name": "device_model", "type": "device_model", "value": "iPhone 12"},
+             {"name": "city", "type": "city", "value": "Mumbai"}]
+    sql, specs = parameterize_sql(
+        "SELECT * FROM device_compatibility d JOIN coverage_areas c "
+        "WHERE lower(d.device_model) = 'iphone 12' AND c.city LIKE '%Mumbai%'",
+        slots,
+    )
+    assert sql == ("SELECT * FROM device_compatibility d JOIN coverage_areas c "
+                   "WHERE lower(d.device_model) = :device_model AND c.city LIKE '%' || :city || '%'")
+    assert [spec["transform"] for spec in specs] == ["lower", "none"]
+    assert _apply_transform("Galaxy S21", specs[0]["transform"]) == "galaxy s21"
+
+def test_sql_without_the_slot_literal_is_not_reused():
+    slots = [{"name": "city", "type": "city", "value": "Mumbai"}]
+    assert parameterize_sql("SELECT * FROM coverage_areas WHERE city_id = 7", slots) == (None, None)
+
+def test_only_single_selects_are_cached():
+    assert _is_single_select("SELECT * FROM coverage_areas;")
+    assert not _is_single_select("SELECT 1; DELETE FROM coverage_areas")
+    assert not _is_single_select("DELETE FROM coverage_areas")
@@ -0,0 +1,38 @@
+import json
+import urllib.request
+from telecom_assistant.config.config import Config
+
+# Client for the headless API (api/server.py). When ASSISTANT_API_URL is set,
+# the Streamlit UI sends chat turns to the API instead of running the graph
+# in its own script thread.
+
+def stream_chat(query: str, customer_id: str, thread_id: str = None, base_url: str = None):
+    """
+    Stream one chat turn from the API.
+
+    Yields the same event dicts as stream_orchestrator(): `stage`, `token`
+    and `final`. An `error` event from the server is raised as RuntimeError.
+    """
+    base_url = (base_url or Config.ASSISTANT_API_URL).rstrip("/")
+    payload = json.dumps({"query": query, "customer_id": customer_id, "thread_id": thread_id}).encode("utf-8")
+    request = urllib.request.Request(
+        f"{base_url}/v1/chat/stream",
+        data=payload,
+        headers={"Content-Type": "application/json", "Accept": "text/event-stream"},
+        method="POST",
+    )
+
+    with urllib.request.urlopen(request, timeout=Config.ASSISTANT_API_TIMEOUT_SECONDS) as response:
+        data_lines = []
+        for raw_line in response:
+            line = raw_line.decode("utf-8").rstrip("\r\n")
+            if line.startswith("data:"):
+                data_lines.append(line[5:].strip())
+            elif not line and data_lines:
+                # Blank line terminates an SSE event
+                event = json.loads("\n".join(data_lines))
+                data_lines = []
+                if event["type"] == "error":
+                    raise RuntimeError(event["message"])
+                if event["type"] != "thread":
+                    yield event
@@ -2,44 +2,113 @@ import streamlit as st
 import os
 import shutil
 from telecom_assistant.config.config import Config
-from telecom_assistant.utils.document_loader import load_documents
-from telecom_assistant.orchestration.graph import run_orchestrator
+from telecom_assistant.orchestration.graph import get_app, stream_orchestrator
 
 from telecom_assistant.utils.database import get_database
+from telecom_assistant.utils.cache import customer_version
+from telecom_assistant.utils.customer_context import get_customer_context
+from telecom_assistant.utils.analytics import get_analytics_summary, get_query_volume, get_recent_logs
+from telecom_assistant.utils.import_profiler import get_import_report
+from telecom_assistant.orchestration.warmup import get_warmup_status
+from telecom_assistant.ui.api_client import stream_chat
 from sqlalchemy import text
 
+# --- Cached Resources ---
+# st.cache_resource keeps these alive across reruns and sessions, so a rerun
+# only pays for rendering.
+
+@st.cache_resource(show_spinner=False)
+def get_cached_database():
+    """Shared SQLDatabase (engine + reflected schema)."""
+    return get_database()
+
+@st.cache_resource(show_spinner="Loading assistant...")
+def get_cached_graph():
+    """Compiled orchestration graph."""
+    return get_app()
+
+def get_cached_index():
+    """
+    Vector index used by the document search tools.
+    
+    Not wrapped in st.cache_resource: get_index() is already a process-wide
+    singleton and follows newly published index versions.
+    """
+    # LlamaIndex is only imported when the index is actually needed
+    from telecom_assistant.utils.document_loader import get_index
+    return get_index()
+
+@st.cache_data(ttl=Config.PROFILE_CACHE_TTL_SECONDS, show_spinner=False)
+def get_cached_customer_info(customer_id, version):
+    """
+    Customer profile for the sidebar.
+    
+    `version` is part of the cache key: customer-management writes bump it,
+    so the next rerun misses the cache instead of showing stale data.
+    """
+    return get_customer_info(customer_id)
+
 def get_customer_info(customer_id):
-    """Fetch customer, plan, and latest usage info from DB."""
-    db = get_database()
+    """Customer, plan, and latest usage info for the sidebar, from the shared customer context."""
+    context = get_customer_context(customer_id)
     info = {}
+    if not context:
+        return info
     
-    with db._engine.connect() as conn:
-        # 1. Customer Details
-        cust_query = text(f"SELECT * FROM customers WHERE customer_id = '{customer_id}'")
-        cust_res = conn.execute(cust_query).fetchone()
-        if cust_res:
-            info['name'] = cust_res[1]
-            info['email'] = cust_res[2]
-            info['phone'] = cust_res[3]
-            plan_id = cust_res[5]
-            
-            # 2. Plan Details
-            plan_query = text(f"SELECT * FROM service_plans WHERE plan_id = '{plan_id}'")
-            plan_res = conn.execute(plan_query).fetchone()
-            if plan_res:
-                info['plan_name'] = plan_res[1]
-                info['plan_cost'] = plan_res[2]
-                info['data_limit'] = "Unlimited" if plan_res[4] else f"{plan_res[3]} GB"
-            
-            # 3. Latest Usage
-            usage_query = text(f"SELECT * FROM customer_usage WHERE customer_id = '{customer_id}' ORDER BY billing_period_end DESC LIMIT 1")
-            usage_res = conn.execute(usage_query).fetchone()
-            if usage_res:
-                info['data_used'] = f"{usage_res[4]} GB"
-                info['bill_amount'] = f"${usage_res[8]}"
+    profile, plan, usage = context["profile"], context["plan"], context["usage"]
+    info['name'] = profile["name"]
+    info['email'] = profile["email"]
+    info['phone'] = profile["phone_number"]
+    if plan:
+        info['plan_name'] = plan["name"]
+        info['plan_cost'] = plan["monthly_cost"]
+        info['data_limit'] = "Unlimited" if plan["unlimited_data"] else f"{plan['data_limit_gb']} GB"
+    if usage:
+        info['data_used'] = f"{usage['data_used_gb']} GB"
+        info['bill_amount'] = f"${usage['total_bill_amount']}"
                 
     return info
 
+def render_streamed_response(prompt, customer_id, thread_id):
+    """
+    Stream the orchestrator's reply into the current chat message container.
+    
+    Stage updates go into a status container and LLM tokens are written as they
+    arrive. Once the turn completes, the streamed text is replaced with the final
+    response so the transcript matches what is replayed on later reruns.
+    """
+    status = st.status("Working on it...", expanded=False)
+    placeholder = st.empty()
+    final = {}
+    
+    if Config.ASSISTANT_API_URL:
+        # Delegate to the headless API service
+        events = stream_chat(prompt, customer_id, thread_id=thread_id)
+    else:
+        events = stream_orchestrator(prompt, customer_id, thread_id=thread_id, graph=get_cached_graph())
+    
+    def token_stream():
+        for event in events:
+            if event["type"] == "stage":
+                status.update(label=f"{event['label']}...")
+                status.write(event["label"])
+            elif event["type"] == "token":
+                yield event["content"]
+            elif event["type"] == "final":
+                final.update(event)
+    
+    try:
+        with placeholder.container():
+            st.write_stream(token_stream())
+    except Exception:
+        status.update(label="Something went wrong", state="error")
+        raise
+    
+    response = final.get("response", "")
+    placeholder.markdown(response)
+    status.update(label="Done", state="complete")
+    return response
+
 def render_login():
     """Renders the login page."""
     st.title("Telecom Assistant Login")
@@ -57,9 +126,9 @@ def render_login():
                 st.rerun()
             elif password == "user":
                 # Validate Customer ID in DB
-                db = get_database()
+                db = get_cached_database()
                 with db._engine.connect() as conn:
-                    result = conn.execute(text(f"SELECT count(*) FROM customers WHERE customer_id = '{username}'")).fetchone()
+                    result = conn.execute(text("SELECT count(*) FROM customers WHERE customer_id = :cid"), {"cid": username}).fetchone()
                     if result[0] > 0:
                         st.session_state["logged_in"] = True
                         st.session_state["role"] = "customer"
@@ -71,14 +140,72 @@ def render_login():
             else:
                 st.error("Invalid credentials")
 
+def render_index_job_status():
+    """Latest indexing job, refreshed every INDEX_JOB_POLL_SECONDS while it is queued or running."""
+    from telecom_assistant.utils.index_jobs import ACTIVE_STATUSES, list_jobs
+    
+    latest = list_jobs(limit=1)
+    active = bool(latest) and latest[0]["status"] in ACTIVE_STATUSES
+    
+    @st.fragment(run_every=Config.INDEX_JOB_POLL_SECONDS if active else None)
+    def job_status():
+        jobs = list_jobs(limit=1)
+        if not jobs:
+            return
+        job = jobs[0]
+        st.write(f"### Indexing Job {job['job_id']}: {job['status']}")
+        if job["status"] == "queued":
+            st.info("Waiting for the indexing worker...")
+        elif job["status"] == "running":
+            total = job["files_total"] or 0
+            st.progress(job["files_done"] / total if total else 0.0)
+            if job["current_file"]:
+                st.caption(f"Indexed {job['files_done']}/{total} files, last: {job['current_file']}")
+        elif job["status"] == "succeeded":
+            st.success(f"Knowledge Base updated to version {job['version']} ({job['chunks']} chunks).")
+        else:
+            st.error(f"Indexing failed: {job['error']}")
+        
+        # Once the watched job finishes, rerun the whole page to show the new index
+        if job["status"] not in ACTIVE_STATUSES and st.session_state.get("index_job_watch") == job["job_id"]:
+            del st.session_state["index_job_watch"]
+            st.rerun()
+    
+    job_status()
+
 def render_admin_dashboard():
     """Renders the Admin Dashboard for document management."""
     st.title("Admin Dashboard")
     
+    warmup = get_warmup_status()
+    if warmup:
+        with st.expander("System readiness"):
+            for name, info in warmup.items():
+                seconds = f" ({info['seconds']:.1f}s)" if info["seconds"] is not None else ""
+                error = f": {info['error']}" if info["error"] else ""
+                st.text(f"{name}: {info['state']}{seconds}{error}")
+    
     tab1, tab2, tab3 = st.tabs(["Knowledge Base", "Analytics", "Admin Chat"])
     
     with tab1:
         st.header("Knowledge Base Management")
+        index = get_cached_index()
+        if index is not None:
+            st.caption(f"{len(index.docstore.docs)} chunks currently indexed.")
+            from telecom_assistant.utils.document_loader import get_chunk_report
+            chunk_report = get_chunk_report()
+            if chunk_report:
+                with st.expander("Chunks per document"):
+                    st.table([
+                        {
+                            "Document": name,
+                            "Chunks": stats["chunks"],
+                            "Near-duplicates dropped": stats["duplicates"],
+                            "Parse time (s)": stats.get("seconds", ""),
+                            "Error": stats.get("error") or "",
+                        }
+                        for name, stats in chunk_report.items()
+                    ])
         st.write("### Upload Technical Documents")
         st.write("Supported formats: PDF, Markdown, Text")
         
@@ -105,53 +232,81 @@ def render_admin_dashboard():
                     
                     progress_bar.progress((i + 1) / len(uploaded_files))
                 
-                status_text.text("Updating Knowledge Base (Indexing)...")
-                
-                try:
-                    # Reload documents to update vector store
-                    load_documents()
-                    st.success(f"Successfully processed {len(uploaded_files)} documents and updated the Knowledge Base!")
-                except Exception as e:
-                    st.error(f"Error updating knowledge base: {e}")
+                # Indexing runs as a background job; the status panel below polls it
+                from telecom_assistant.utils.index_jobs import enqueue_index_job
+                job_id = enqueue_index_job(requested_by="admin")
+                st.session_state["index_job_watch"] = job_id
+                status_text.text(f"Saved {len(uploaded_files)} documents. Indexing job {job_id} queued.")
             else:
                 st.warning("Please upload at least one file.")
+        
+        render_index_job_status()
 
     with tab2:
         st.header("System Analytics")
         import pandas as pd
         import plotly.express as px
         
-        db = get_database()
         try:
-            with db._engine.connect() as conn:
-                # Fetch logs
-                logs_df = pd.read_sql("SELECT * FROM query_logs", conn)
+            # Metrics come from incrementally maintained rollups, so this tab
+            # costs the same no matter how large query_logs grows.
+            summary = get_analytics_summary()
+            
+            if summary["total_queries"]:
+                # 1. Key Metrics
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Total Queries", summary["total_queries"])
+                col2.metric("Avg Sentiment", f"{summary['avg_sentiment']:.2f}")
+                col3.metric("Active Users", summary["active_users"])
                 
-                if not logs_df.empty:
-                    # 1. Key Metrics
-                    col1, col2, col3 = st.columns(3)
-                    col1.metric("Total Queries", len(logs_df))
-                    col2.metric("Avg Sentiment", f"{logs_df['sentiment_score'].mean():.2f}")
-                    col3.metric("Active Users", logs_df['customer_id'].nunique())
-                    
-                    # 2. Category Distribution
-                    st.subheader("Query Categories")
-                    fig_cat = px.pie(logs_df, names='category', title='Distribution of Query Types')
-                    st.plotly_chart(fig_cat)
-                    
-                    # 3. Sentiment Analysis
-                    st.subheader("Sentiment Analysis")
-                    logs_df['sentiment_label'] = logs_df['sentiment_score'].apply(
-                        lambda x: 'Positive' if x > 0.1 else ('Negative' if x < -0.1 else 'Neutral')
-                    )
-                    fig_sent = px.bar(logs_df, x='sentiment_label', title='User Sentiment', color='sentiment_label')
-                    st.plotly_chart(fig_sent)
-                    
-                    # 4. Recent Logs
-                    st.subheader("Recent Logs")
-                    st.dataframe(logs_df.sort_values(by='timestamp', ascending=False).head(10))
+                # 2. Category Distribution
+                st.subheader("Query Categories")
+                cat_df = pd.DataFrame(list(summary["by_category"].items()), columns=["category", "queries"])
+                fig_cat = px.pie(cat_df, names='category', values='queries', title='Distribution of Query Types')
+                st.plotly_chart(fig_cat)
+                
+                # 3. Sentiment Analysis
+                st.subheader("Sentiment Analysis")
+                sent_df = pd.DataFrame(list(summary["by_sentiment"].items()), columns=["sentiment_label", "queries"])
+                fig_sent = px.bar(sent_df, x='sentiment_label', y='queries', title='User Sentiment', color='sentiment_label')
+                st.plotly_chart(fig_sent)
+                
+                # 4. Query Volume
+                st.subheader("Query Volume")
+                granularity = st.radio("Granularity", ["day", "hour"], horizontal=True)
+                volume_df = pd.DataFrame(get_query_volume(granularity))
+                if not volume_df.empty:
+                    st.line_chart(volume_df, x="bucket_start", y="queries")
+                
+                # 5. Recent Logs (keyset-paginated on the server)
+                st.subheader("Recent Logs")
+                if "log_page_cursors" not in st.session_state:
+                    # Stack of `before_id` cursors; None is the newest page
+                    st.session_state["log_page_cursors"] = [None]
+                cursors = st.session_state["log_page_cursors"]
+                
+                page_size = 10
+                logs = get_recent_logs(limit=page_size, before_id=cursors[-1])
+                st.dataframe(pd.DataFrame(logs))
+                
+                prev_col, page_col, next_col = st.columns([1, 2, 1])
+                page_col.caption(f"Page {len(cursors)}")
+                if prev_col.button("Newer", disabled=len(cursors) == 1):
+                    cursors.pop()
+                    st.rerun()
+                if next_col.button("Older", disabled=len(logs) < page_size):
+                    cursors.append(logs[-1]["id"])
+                    st.rerun()
+            else:
+                st.info("No query logs available yet.")
+            
+            # 6. Lazy module loads in this process (agents load on first use of their route)
+            with st.expander("Module load times"):
+                report = get_import_report()
+                if report:
+                    st.dataframe(pd.DataFrame(report))
                 else:
-                    st.info("No query logs available yet.")
+                    st.caption("No agent modules loaded yet.")
                     
         except Exception as e:
             st.error(f"Error loading analytics: {e}")
@@ -186,15 +341,13 @@ def render_admin_dashboard():
 
             # Generate response
             with st.chat_message("assistant"):
-                with st.spinner("Processing admin command..."):
-                    try:
-                        # Run orchestrator with ADMIN ID
-                        response = run_orchestrator(prompt, customer_id="ADMIN", thread_id=st.session_state["admin_thread_id"])
-                        st.markdown(response)
-                        # Add assistant response to chat history
-                        st.session_state["admin_messages"].append({"role": "assistant", "content": response})
-                    except Exception as e:
-                        st.error(f"An error occurred: {e}")
+                try:
+                    # Run orchestrator with ADMIN ID
+                    response = render_streamed_response(prompt, "ADMIN", st.session_state["admin_thread_id"])
+                    # Add assistant response to chat history
+                    st.session_state["admin_messages"].append({"role": "assistant", "content": response})
+                except Exception as e:
+                    st.error(f"An error occurred: {e}")
             
     if st.button("Logout"):
         st.session_state["logged_in"] = False
@@ -202,6 +355,7 @@ def render_admin_dashboard():
         st.session_state["admin_messages"] = []
         st.session_state["customer_id"] = None
         st.session_state["role"] = None
+        st.session_state.pop("admin_thread_id", None)
         st.rerun()
 
 def render_customer_dashboard():
@@ -216,7 +370,7 @@ def render_customer_dashboard():
         
         # Fetch and display info
         try:
-            info = get_customer_info(customer_id)
+            info = get_cached_customer_info(customer_id, customer_version(customer_id))
             if info:
                 st.subheader(info.get('name', 'Unknown'))
                 st.caption(f"ID: {customer_id}")
@@ -234,6 +388,8 @@ def render_customer_dashboard():
         st.markdown("---")
         if st.button("Clear Chat History"):
             st.session_state["messages"] = []
+            # Start a fresh graph thread so cleared turns don't leak back in as context
+            st.session_state.pop("thread_id", None)
             st.rerun()
             
         if st.button("Logout"):
@@ -241,6 +397,7 @@ def render_customer_dashboard():
             st.session_state["messages"] = []
             st.session_state["customer_id"] = None
             st.session_state["role"] = None
+            st.session_state.pop("thread_id", None)
             st.rerun()
     
     # Initialize chat history and thread_id
@@ -270,12 +427,10 @@ def render_customer_dashboard():
 
         # Generate response
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    # Pass thread_id instead of history
-                    response = run_orchestrator(prompt, customer_id, thread_id=st.session_state["thread_id"])
-                    st.markdown(response)
-                    # Add assistant response to chat history
-                    st.session_state["messages"].append({"role": "assistant", "content": response})
-                except Exception as e:
-                    st.error(f"An error occurred: {e}")
+            try:
+                # Pass thread_id instead of history
+                response = render_streamed_response(prompt, customer_id, st.session_state["thread_id"])
+                # Add assistant response to chat history
+                st.session_state["messages"].append({"role": "assistant", "content": response})
+            except Exception as e:
+                st.error(f"An error occurred: {e}")
@@ -0,0 +1,237 @@
+import threading
+from datetime import datetime, timezone
+from sqlalchemy import text
+from telecom_assistant.utils.database import get_database
+from telecom_assistant.utils.cache import invalidate_tables
+
+# Query analytics are served from rollup tables that are maintained in the same
+# transaction as each query_logs insert, so the admin dashboard never scans
+# query_logs itself.
+#
+# - query_log_rollups: counts and sentiment sums per granularity ('hour', 'day'
+#   or 'all') x bucket x category x sentiment label. The 'all' rows hold the
+#   all-time totals (at most categories x 3 rows).
+# - query_log_users: one row per customer that has ever sent a query.
+# - query_log_counters: scalar counters such as the number of active users.
+
+ROLLUP_GRANULARITIES = ("hour", "day", "all")
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS query_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        customer_id TEXT,
+        query_text TEXT,
+        category TEXT,
+        sentiment_score REAL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS query_log_rollups (
+        granularity TEXT NOT NULL,
+        bucket_start TEXT NOT NULL,
+        category TEXT NOT NULL,
+        sentiment_label TEXT NOT NULL,
+        query_count INTEGER NOT NULL DEFAULT 0,
+        sentiment_sum REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (granularity, bucket_start, category, sentiment_label)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS query_log_users (
+        customer_id TEXT PRIMARY KEY,
+        first_seen TEXT,
+        last_seen TEXT,
+        query_count INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS query_log_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+_initialized = False
+_init_lock = threading.Lock()
+
+def sentiment_label(score: float) -> str:
+    """Bucket a TextBlob polarity score into Positive / Neutral / Negative."""
+    if score is None:
+        return "Neutral"
+    if score > 0.1:
+        return "Positive"
+    if score < -0.1:
+        return "Negative"
+    return "Neutral"
+
+def _bucket_start(granularity: str, ts: str) -> str:
+    """Bucket key for a 'YYYY-MM-DD HH:MM:SS' timestamp."""
+    if granularity == "hour":
+        return ts[:13] + ":00:00"
+    if granularity == "day":
+        return ts[:10]
+    return ""
+
+def _backfill(conn):
+    """Build rollups from existing query_logs rows (runs once, on an empty rollup table)."""
+    label_sql = (
+        "CASE WHEN sentiment_score > 0.1 THEN 'Positive' "
+        "WHEN sentiment_score < -0.1 THEN 'Negative' ELSE 'Neutral' END"
+    )
+    bucket_sql = {
+        "hour": "strftime('%Y-%m-%d %H:00:00', timestamp)",
+        "day": "strftime('%Y-%m-%d', timestamp)",
+        "all": "''",
+    }
+    for granularity in ROLLUP_GRANULARITIES:
+        conn.execute(text(f"""
+            INSERT INTO query_log_rollups (granularity, bucket_start, category, sentiment_label, query_count, sentiment_sum)
+            SELECT :g, {bucket_sql[granularity]}, COALESCE(category, 'OTHER'), {label_sql},
+                   COUNT(*), COALESCE(SUM(sentiment_score), 0)
+            FROM query_logs
+            GROUP BY 2, 3, 4
+        """), {"g": granularity})
+    conn.execute(text("""
+        INSERT OR IGNORE INTO query_log_users (customer_id, first_seen, last_seen, query_count)
+        SELECT customer_id, MIN(timestamp), MAX(timestamp), COUNT(*)
+        FROM query_logs
+        WHERE customer_id IS NOT NULL
+        GROUP BY customer_id
+    """))
+    conn.execute(text("""
+        INSERT OR REPLACE INTO query_log_counters (name, value)
+        SELECT 'active_users', COUNT(*) FROM query_log_users
+    """))
+
+def ensure_analytics_tables():
+    """Create the query log and rollup tables, backfilling rollups if needed."""
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        db = get_database()
+        with db._engine.begin() as conn:
+            for ddl in _SCHEMA:
+                conn.execute(text(ddl))
+            has_rollups = conn.execute(text("SELECT 1 FROM query_log_rollups LIMIT 1")).fetchone()
+            has_logs = conn.execute(text("SELECT 1 FROM query_logs LIMIT 1")).fetchone()
+            if has_logs and not has_rollups:
+                print("Backfilling query log rollups...")
+                _backfill(conn)
+        _initialized = True
+
+def record_query_log(customer_id: str, query: str, category: str, sentiment: float):
+    """Insert a query log row and update the rollups in the same transaction."""
+    ensure_analytics_tables()
+    ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    label = sentiment_label(sentiment)
+    category = category or "OTHER"
+
+    db = get_database()
+    with db._engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO query_logs (timestamp, customer_id, query_text, category, sentiment_score) VALUES (:ts, :cid, :q, :cat, :sent)"),
+            {"ts": ts, "cid": customer_id, "q": query, "cat": category, "sent": sentiment},
+        )
+        for granularity in ROLLUP_GRANULARITIES:
+            conn.execute(text("""
+                INSERT INTO query_log_rollups (granularity, bucket_start, category, sentiment_label, query_count, sentiment_sum)
+                VALUES (:g, :b, :cat, :label, 1, :sent)
+                ON CONFLICT (granularity, bucket_start, category, sentiment_label)
+                DO UPDATE SET query_count = query_count + 1, sentiment_sum = sentiment_sum + excluded.sentiment_sum
+            """), {"g": granularity, "b": _bucket_start(granularity, ts), "cat": category, "label": label, "sent": sentiment or 0.0})
+
+        if customer_id:
+            new_user = conn.execute(
+                text("INSERT OR IGNORE INTO query_log_users (customer_id, first_seen, last_seen, query_count) VALUES (:cid, :ts, :ts, 0)"),
+                {"cid": customer_id, "ts": ts},
+            ).rowcount
+            conn.execute(
+                text("UPDATE query_log_users SET last_seen = :ts, query_count = query_count + 1 WHERE customer_id = :cid"),
+                {"cid": customer_id, "ts": ts},
+            )
+            if new_user:
+                conn.execute(text("""
+                    INSERT INTO query_log_counters (name, value) VALUES ('active_users', 1)
+                    ON CONFLICT (name) DO UPDATE SET value = value + 1
+                """))
+    invalidate_tables("query_logs", "query_log_rollups", "query_log_users", "query_log_counters")
+
+def get_analytics_summary() -> dict:
+    """
+    All-time dashboard metrics, read from the 'all' rollup rows.
+
+    Returns:
+        dict: total_queries, avg_sentiment, active_users, and per-category /
+        per-sentiment-label counts.
+    """
+    ensure_analytics_tables()
+    db = get_database()
+    with db._engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT category, sentiment_label, query_count, sentiment_sum
+            FROM query_log_rollups WHERE granularity = 'all'
+        """)).fetchall()
+        users = conn.execute(text("SELECT value FROM query_log_counters WHERE name = 'active_users'")).fetchone()
+
+    by_category, by_sentiment = {}, {}
+    total, sentiment_sum = 0, 0.0
+    for category, label, count, s_sum in rows:
+        by_category[category] = by_category.get(category, 0) + count
+        by_sentiment[label] = by_sentiment.get(label, 0) + count
+        total += count
+        sentiment_sum += s_sum
+
+    return {
+        "total_queries": total,
+        "avg_sentiment": sentiment_sum / total if total else 0.0,
+        "active_users": users[0] if users else 0,
+        "by_category": by_category,
+        "by_sentiment": by_sentiment,
+    }
+
+def get_query_volume(granularity: str = "day", limit: int = 30) -> list:
+    """Query counts for the most recent `limit` hour/day buckets, oldest first."""
+    if granularity not in ("hour", "day"):
+        raise ValueError(f"Unsupported granularity: {granularity}")
+    ensure_analytics_tables()
+    db = get_database()
+    with db._engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT bucket_start, SUM(query_count) FROM query_log_rollups
+            WHERE granularity = :g
+            GROUP BY bucket_start
+            ORDER BY bucket_start DESC
+            LIMIT :limit
+        """), {"g": granularity, "limit": limit}).fetchall()
+    return [{"bucket_start": r[0], "queries": r[1]} for r in reversed(rows)]
+
+def get_recent_logs(limit: int = 10, before_id: int = None) -> list:
+    """
+    Page through query_logs newest-first using keyset pagination on the id.
+
+    Args:
+        limit (int): Page size.
+        before_id (int): Only return rows with a smaller id (the last id of the
+            previous page). None starts from the newest row.
+    """
+    ensure_analytics_tables()
+    db = get_database()
+    params = {"limit": limit}
+    where = ""
+    if before_id is not None:
+        where = "WHERE id < :before_id"
+        params["before_id"] = before_id
+    with db._engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT id, timestamp, customer_id, query_text, category, sentiment_score
+            FROM query_logs {where}
+            ORDER BY id DESC
+            LIMIT :limit
+        """), params).fetchall()
+    return [dict(r._mapping) for r in rows]
@@ -0,0 +1,145 @@
+import re
+import threading
+import time
+from collections import defaultdict, OrderedDict
+from telecom_assistant.config.config import Config
+
+# Per-customer data versions. Any write to a customer's profile, plan or usage
+# bumps the version, so caches keyed on (customer_id, version) miss on the
+# next read instead of serving stale data until their TTL expires.
+_customer_versions = defaultdict(int)
+_lock = threading.Lock()
+
+def customer_version(customer_id: str) -> int:
+    """Return the current data version for a customer."""
+    with _lock:
+        return _customer_versions[customer_id]
+
+def invalidate_customer(customer_id: str) -> int:
+    """Mark a customer's cached data as stale and return the new version."""
+    with _lock:
+        _customer_versions[customer_id] += 1
+        return _customer_versions[customer_id]
+
+# Per-table data versions. Cached SQL results are tagged with the version of
+# every table they read, so an entry is served only while none of those tables
+# has been written since. The app's own writes (customer-management tools,
+# query logging, write statements through the cached SQL tool) call
+# invalidate_tables(); changes made outside the app, e.g. editing telecom.db
+# directly, are only picked up once the TTL expires.
+_table_versions = defaultdict(int)
+
+def table_version(table: str) -> int:
+    """Return the current data version for a table."""
+    with _lock:
+        return _table_versions[table.lower()]
+
+def invalidate_tables(*tables: str):
+    """Mark cached results that read any of `tables` as stale (call after every write to them)."""
+    with _lock:
+        for table in tables:
+            _table_versions[table.lower()] += 1
+
+_READ_ONLY = re.compile(r"^\s*(select|with|pragma\s+table_info|explain)\b", re.IGNORECASE)
+
+# Write keywords, except when used as a function name (replace(...) is a string function)
+_WRITE_KEYWORD = re.compile(r"\b(insert|update|delete|replace|drop|alter|create)\b(?!\s*\()", re.IGNORECASE)
+
+def is_read_only(sql: str) -> bool:
+    """Whether a statement only reads: a single SELECT/WITH/EXPLAIN/PRAGMA table_info with no writing clause."""
+    code = _strip_non_code(sql).strip().rstrip(";")
+    if not _READ_ONLY.match(code) or ";" in code:
+        # Chained statements can hide a write after a leading SELECT
+        return False
+    # A WITH clause may lead into INSERT/UPDATE/DELETE in SQLite
+    return not _WRITE_KEYWORD.search(code)
+
+def _strip_literals(sql: str) -> str:
+    return re.sub(r"'(?:[^']|'')*'", "''", sql)
+
+# String literals, quoted identifiers and comments, matched left to right so
+# that e.g. '--' inside a literal isn't taken for a comment
+_NON_CODE = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\]|--[^\n]*|/\*.*?\*/""", re.DOTALL)
+
+def _strip_non_code(sql: str) -> str:
+    """Blank out literals, quoted identifiers and comments so their contents aren't read as keywords."""
+    return _NON_CODE.sub(lambda m: " " if m.group(0)[0] in "-/" else "''", sql)
+
+def normalize_sql(sql: str) -> str:
+    """Canonical form for cache keys: whitespace collapsed, keywords/identifiers lowercased, literals kept."""
+    parts = re.split(r"('(?:[^']|'')*')", sql.strip().rstrip(";").strip())
+    return "".join(part if part.startswith("'") else re.sub(r"\s+", " ", part).lower() for part in parts)
+
+def referenced_tables(sql: str, known_tables) -> set:
+    """Known table names that appear as identifiers in the statement."""
+    words = set(re.findall(r"[a-z_][a-z0-9_]*", _strip_literals(sql).lower()))
+    return {table.lower() for table in known_tables if table.lower() in words}
+
+class SQLResultCache:
+    """LRU cache of query results, validated against table versions and a TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "writes": 0}
+
+    def _versions(self, tables) -> tuple:
+        return tuple(sorted((table, table_version(table)) for table in tables))
+
+    def get_or_run(self, sql: str, params, tables, run, should_cache=None):
+        """
+        Return the cached result of `sql` with `params`, or call run() and cache it.
+
+        Write statements are never cached; they run and invalidate the tables
+        they touch. Results rejected by should_cache (e.g. error strings) are
+        returned without being stored.
+        """
+        if not is_read_only(sql):
+            result = run()
+            invalidate_tables(*tables)
+            with self._lock:
+                self.stats["writes"] += 1
+            return result
+
+        key = (normalize_sql(sql), repr(sorted(params.items())) if params else "")
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                versions, expires_at, result = entry
+                if versions == self._versions(tables) and now < expires_at:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return result
+                del self._entries[key]
+                self.stats["stale"] += 1
+            self.stats["misses"] += 1
+
+        # Capture versions before running so a concurrent write makes this entry stale
+        versions = self._versions(tables)
+        result = run()
+        if should_cache is not None and not should_cache(result):
+            return result
+        with self._lock:
+            self._entries[key] = (versions, now + self.ttl_seconds, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+_sql_cache = None
+
+def get_sql_result_cache() -> SQLResultCache:
+    """Return the process-wide SQL result cache."""
+    global _sql_cache
+    if _sql_cache is None:
+        with _lock:
+            if _sql_cache is None:
+                _sql_cache = SQLResultCache(Config.SQL_RESULT_CACHE_MAX_ENTRIES, Config.SQL_RESULT_CACHE_TTL_SECONDS)
+    return _sql_cache
@@ -0,0 +1,130 @@
+import hashlib
+import re
+from typing import List, Tuple
+from telecom_assistant.config.config import Config
+from telecom_assistant.utils.lexical_index import tokenize
+
+# Structure-aware chunking with near-duplicate suppression.
+#
+# Documents are split at markdown headings (plain-text files in the corpus use
+# the same heading syntax), so a chunk never spans two unrelated sections.
+# Small neighbouring sections are packed together up to CHUNK_MAX_TOKENS and
+# oversized ones are split at paragraph boundaries. Each chunk starts with its
+# heading path so it still makes sense on its own in a prompt.
+#
+# Chunks whose 64-bit SimHash is within NEAR_DUPLICATE_MAX_DISTANCE bits of
+# an already kept chunk are dropped, which removes copies of the same content
+# that appear in several source files.
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+def split_sections(text: str) -> List[Tuple[List[str], str]]:
+    """Split text into (heading_path, body) sections at markdown headings."""
+    sections = []
+    path, body = [], []
+    for line in text.replace("\r\n", "\n").split("\n"):
+        match = _HEADING.match(line)
+        if match:
+            if "".join(body).strip():
+                sections.append((list(path), "\n".join(body).strip()))
+            level = len(match.group(1))
+            path = path[:level - 1] + [match.group(2)]
+            body = []
+        else:
+            body.append(line)
+    if "".join(body).strip():
+        sections.append((list(path), "\n".join(body).strip()))
+    return sections
+
+def _split_long(body: str, max_tokens: int) -> List[str]:
+    """Split an oversized section at paragraph (then line) boundaries."""
+    pieces, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", body):
+        units = [paragraph] if _estimate_tokens(paragraph) <= max_tokens else paragraph.split("\n")
+        for unit in units:
+            candidate = f"{current}\n\n{unit}" if current else unit
+            if current and _estimate_tokens(candidate) > max_tokens:
+                pieces.append(current)
+                current = unit
+            else:
+                current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+def chunk_text(text: str, max_tokens: int = None, min_tokens: int = None) -> List[Tuple[str, str]]:
+    """
+    Chunk a document by structure.
+
+    Returns:
+        list: (section_path, chunk_text) pairs; chunk_text starts with the heading path.
+    """
+    max_tokens = max_tokens or Config.CHUNK_MAX_TOKENS
+    min_tokens = min_tokens if min_tokens is not None else Config.CHUNK_MIN_TOKENS
+
+    chunks = []
+    pending_path, pending_parts = None, []
+
+    def flush():
+        if pending_parts:
+            chunks.append((pending_path, "\n\n".join(pending_parts)))
+
+    for path, body in split_sections(text):
+        title = " > ".join(path)
+        for piece in _split_long(body, max_tokens):
+            block = f"{path[-1]}\n{piece}" if path else piece
+            # Pack small sections that share a top-level heading into one chunk
+            same_parent = pending_path is not None and pending_path.split(" > ")[:1] == path[:1]
+            candidate_tokens = _estimate_tokens("\n\n".join(pending_parts + [block]))
+            if pending_parts and same_parent and candidate_tokens <= max_tokens and (
+                _estimate_tokens("\n\n".join(pending_parts)) < min_tokens or _estimate_tokens(block) < min_tokens
+            ):
+                pending_parts.append(block)
+                continue
+            flush()
+            parent = " > ".join(path[:-1])
+            pending_path = title
+            pending_parts = [f"{parent}\n{block}" if parent else block]
+    flush()
+    return chunks
+
+def simhash(text: str, bits: int = 64) -> int:
+    """64-bit SimHash over word 3-shingles."""
+    tokens = tokenize(text)
+    shingles = [" ".join(tokens[i:i + 3]) for i in range(max(1, len(tokens) - 2))] if tokens else [text]
+    weights = [0] * bits
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(bits):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(bits) if weights[bit] > 0)
+
+class NearDuplicateFilter:
+    """
+    Detects near-duplicate chunks by SimHash Hamming distance.
+
+    Fingerprints are bucketed by 16-bit bands; with a distance limit below 4,
+    any near-duplicate shares at least one band with the original, so only
+    same-band candidates are compared.
+    """
+
+    def __init__(self, max_distance: int = None):
+        self.max_distance = Config.NEAR_DUPLICATE_MAX_DISTANCE if max_distance is None else max_distance
+        self.bands = [{} for _ in range(4)]
+
+    def _band_keys(self, fingerprint: int):
+        return [(fingerprint >> (16 * i)) & 0xFFFF for i in range(4)]
+
+    def seen(self, fingerprint: int) -> bool:
+        """Return True if a chunk with this SimHash is a near-duplicate of an earlier one; otherwise remember it."""
+        keys = self._band_keys(fingerprint)
+        for band, key in zip(self.bands, keys):
+            for other in band.get(key, ()):
+                if bin(fingerprint ^ other).count("1") <= self.max_distance:
+                    return True
+        for band, key in zip(self.bands, keys):
+            band.setdefault(key, []).append(fingerprint)
+        return False
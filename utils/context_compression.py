@@ -0,0 +1,171 @@
+import math
+import re
+import threading
+from typing import List, Optional
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+from telecom_assistant.config.config import Config
+from telecom_assistant.utils.lexical_index import tokenize
+
+# Post-retrieval stage that runs before answer synthesis, entirely locally:
+#
+# - LexicalReranker: retrieval over-fetches candidates; they are re-scored by
+#   idf-weighted query term coverage (plus a small bonus for the retriever's
+#   own rank) and only the best `top_n` are kept.
+# - SentenceCompressor: if the kept chunks exceed the context token budget,
+#   only the query-relevant sentences / list blocks are kept, in their
+#   original order, each chunk keeping its heading line.
+#
+# Tokens saved per query are printed and accumulated in get_compression_stats().
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+def _idf(query_terms: set, texts: List[str]) -> dict:
+    """Query-term idf over the candidate set (rarer terms discriminate better)."""
+    n = len(texts) or 1
+    doc_terms = [set(tokenize(text)) for text in texts]
+    return {
+        term: math.log(1 + (n + 1) / (1 + sum(1 for terms in doc_terms if term in terms)))
+        for term in query_terms
+    }
+
+def _coverage(text_terms: set, weights: dict) -> float:
+    total = sum(weights.values()) or 1.0
+    return sum(weight for term, weight in weights.items() if term in text_terms) / total
+
+_stats = {"queries": 0, "tokens_before": 0, "tokens_after": 0}
+_stats_lock = threading.Lock()
+
+def get_compression_stats() -> dict:
+    """Cumulative tokens before/after the stage across all queries in this process."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["tokens_saved"] = stats["tokens_before"] - stats["tokens_after"]
+    return stats
+
+class LexicalReranker(BaseNodePostprocessor):
+    """Rerank retrieved nodes by idf-weighted query term coverage."""
+
+    top_n: int = 3
+    rank_weight: float = 0.2
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "LexicalReranker"
+
+    def _postprocess_nodes(self, nodes: List[NodeWithScore], query_bundle: Optional[QueryBundle] = None) -> List[NodeWithScore]:
+        if query_bundle is None or len(nodes) <= 1:
+            return nodes[:self.top_n]
+        query_terms = set(tokenize(query_bundle.query_str))
+        if not query_terms:
+            return nodes[:self.top_n]
+        texts = [n.node.get_content() for n in nodes]
+        weights = _idf(query_terms, texts)
+        scored = []
+        for rank, (node, text) in enumerate(zip(nodes, texts)):
+            score = _coverage(set(tokenize(text)), weights) + self.rank_weight / (rank + 1)
+            scored.append((score, rank, node))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [NodeWithScore(node=node.node, score=score) for score, _, node in scored[:self.top_n]]
+
+def _split_units(body: str) -> List[str]:
+    """Split chunk text into sentences, keeping list blocks together."""
+    units = []
+    for paragraph in re.split(r"\n\s*\n", body):
+        lines = [line for line in paragraph.split("\n") if line.strip()]
+        if not lines:
+            continue
+        if any(re.match(r"\s*([-*•]|\d+\.)\s", line) for line in lines):
+            units.append("\n".join(lines))
+            continue
+        for line in lines:
+            units.extend(s for s in re.split(r"(?<=[.!?])\s+", line.strip()) if s)
+    return units
+
+class SentenceCompressor(BaseNodePostprocessor):
+    """Keep only query-relevant sentences when the context exceeds `token_budget`."""
+
+    token_budget: int = 400
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "SentenceCompressor"
+
+    def _record(self, before: int, after: int):
+        with _stats_lock:
+            _stats["queries"] += 1
+            _stats["tokens_before"] += before
+            _stats["tokens_after"] += after
+        if before > after:
+            print(f"--- Context compression: {before} -> {after} tokens (saved {before - after}) ---")
+
+    def _postprocess_nodes(self, nodes: List[NodeWithScore], query_bundle: Optional[QueryBundle] = None) -> List[NodeWithScore]:
+        texts = [n.node.get_content() for n in nodes]
+        before = sum(_estimate_tokens(text) for text in texts)
+        if query_bundle is None or before <= self.token_budget:
+            self._record(before, before)
+            return nodes
+
+        query_terms = set(tokenize(query_bundle.query_str))
+        weights = _idf(query_terms, texts)
+
+        # Candidate units: (score, node_rank, unit_index, text)
+        per_node = []
+        candidates = []
+        for rank, text in enumerate(texts):
+            heading, _, body = text.partition("\n")
+            units = _split_units(body)
+            per_node.append((heading, units))
+            heading_score = 0.3 * _coverage(set(tokenize(heading)), weights)
+            for i, unit in enumerate(units):
+                score = _coverage(set(tokenize(unit)), weights) + heading_score
+                if score > 0:
+                    candidates.append((score, rank, i, unit))
+        candidates.sort(key=lambda c: (-c[0], c[1], c[2]))
+
+        selected = {}
+        used = 0
+        for score, rank, i, unit in candidates:
+            picks = [i]
+            # A sentence introducing a list ("... includes:") brings the list along
+            units = per_node[rank][1]
+            if unit.rstrip().endswith(":") and i + 1 < len(units):
+                picks.append(i + 1)
+            cost = sum(_estimate_tokens(units[j]) for j in picks if j not in selected.get(rank, set()))
+            if rank not in selected:
+                cost += _estimate_tokens(per_node[rank][0])
+            if used + cost > self.token_budget:
+                continue
+            selected.setdefault(rank, set()).update(picks)
+            used += cost
+
+        if not selected:
+            # Nothing matched: fall back to the top chunk, truncated to the budget
+            text = texts[0][: self.token_budget * 4]
+            self._record(before, _estimate_tokens(text))
+            return [NodeWithScore(node=TextNode(text=text, metadata=nodes[0].node.metadata), score=nodes[0].score)]
+
+        compressed = []
+        for rank in sorted(selected):
+            heading, units = per_node[rank]
+            kept = [units[j] for j in sorted(selected[rank])]
+            original = nodes[rank]
+            node = TextNode(
+                id_=original.node.node_id,
+                text="\n".join([heading] + kept),
+                metadata=original.node.metadata,
+                excluded_llm_metadata_keys=original.node.excluded_llm_metadata_keys,
+                excluded_embed_metadata_keys=original.node.excluded_embed_metadata_keys,
+                relationships=original.node.relationships,
+            )
+            compressed.append(NodeWithScore(node=node, score=original.score))
+        self._record(before, sum(_estimate_tokens(n.node.get_content()) for n in compressed))
+        return compressed
+
+def context_postprocessors(similarity_top_k: int) -> list:
+    """Rerank + compress postprocessors for a query engine that over-fetches candidates."""
+    return [
+        LexicalReranker(top_n=similarity_top_k),
+        SentenceCompressor(token_budget=Config.CONTEXT_TOKEN_BUDGET),
+    ]
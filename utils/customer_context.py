@@ -0,0 +1,159 @@
+import re
+import threading
+import time
+from sqlalchemy import text
+from telecom_assistant.config.config import Config
+from telecom_assistant.utils.cache import customer_version
+from telecom_assistant.utils.database import cached_query, get_database
+
+# Customer context shared by every route in a conversation.
+#
+# The profile, plan, latest usage and inferred location are loaded once per
+# customer and carried in AgentState.customer_context, so agents don't each
+# re-query (or ask an LLM to write SQL for) the same facts. A context is
+# reloaded only when the customer's data version changes (customer-management
+# writes bump it) or after PROFILE_CACHE_TTL_SECONDS, which bounds staleness
+# for writes made by other processes. The device isn't stored in the
+# database; it is picked up from known device models mentioned in the
+# conversation and kept across reloads.
+
+def _row_dict(row) -> dict:
+    return dict(row._mapping) if row is not None else None
+
+def _known_cities() -> list:
+    rows = cached_query("SELECT DISTINCT city FROM service_areas UNION SELECT DISTINCT city FROM coverage_areas")
+    return sorted({row[0] for row in rows if row[0]}, key=len, reverse=True)
+
+def infer_location(address: str) -> dict:
+    """City (and district, if recognizable) of a known service area mentioned in an address."""
+    if not address:
+        return None
+    for city in _known_cities():
+        if re.search(rf"\b{re.escape(city)}\b", address, re.IGNORECASE):
+            districts = cached_query("SELECT DISTINCT district FROM service_areas WHERE city = :city", {"city": city})
+            district = next(
+                (row[0] for row in districts if row[0] and re.search(rf"\b{re.escape(row[0])}\b", address, re.IGNORECASE)),
+                None,
+            )
+            return {"city": city, "district": district}
+    return None
+
+def infer_device(message: str) -> dict:
+    """Known device model mentioned in a message, as {"make", "model"}."""
+    if not message:
+        return None
+    rows = cached_query("SELECT DISTINCT device_make, device_model FROM device_compatibility")
+    for make, model in sorted(rows, key=lambda row: len(row[1] or ""), reverse=True):
+        if model and re.search(rf"(?<!\w){re.escape(model)}(?!\w)", message, re.IGNORECASE):
+            return {"make": make, "model": model}
+    return None
+
+def load_customer_context(customer_id: str) -> dict:
+    """
+    Read a customer's context from the database.
+
+    Returns:
+        dict: customer_id, version, loaded_at, profile, plan, usage (latest
+        billing period), location and device; None if the customer doesn't exist.
+    """
+    version = customer_version(customer_id)
+    with get_database()._engine.connect() as conn:
+        profile = _row_dict(conn.execute(
+            text("SELECT * FROM customers WHERE customer_id = :cid"), {"cid": customer_id}
+        ).fetchone())
+        if profile is None:
+            return None
+        plan = _row_dict(conn.execute(
+            text("SELECT * FROM service_plans WHERE plan_id = :pid"), {"pid": profile.get("service_plan_id")}
+        ).fetchone())
+        usage = _row_dict(conn.execute(
+            text("SELECT * FROM customer_usage WHERE customer_id = :cid ORDER BY billing_period_end DESC LIMIT 1"),
+            {"cid": customer_id},
+        ).fetchone())
+    return {
+        "customer_id": customer_id,
+        "version": version,
+        "loaded_at": time.time(),
+        "profile": profile,
+        "plan": plan,
+        "usage": usage,
+        "location": infer_location(profile.get("address")),
+        "device": None,
+    }
+
+def is_current(context: dict, customer_id: str) -> bool:
+    """Whether a context still reflects the customer's data."""
+    return (
+        context is not None
+        and context.get("customer_id") == customer_id
+        and context.get("version") == customer_version(customer_id)
+        and time.time() - context.get("loaded_at", 0) < Config.PROFILE_CACHE_TTL_SECONDS
+    )
+
+_contexts = {}
+_contexts_lock = threading.Lock()
+
+def get_customer_context(customer_id: str) -> dict:
+    """Process-wide cached context for a customer (reloaded after writes)."""
+    if not customer_id:
+        return None
+    with _contexts_lock:
+        context = _contexts.get(customer_id)
+    if is_current(context, customer_id):
+        return context
+    context = load_customer_context(customer_id)
+    if context is not None:
+        with _contexts_lock:
+            _contexts[customer_id] = context
+    return context
+
+def refresh_customer_context(context: dict, customer_id: str, message: str = None) -> dict:
+    """
+    Bring a conversation's context up to date for this turn.
+
+    Returns the same object if nothing changed, otherwise a new dict (the
+    cached copy is never mutated).
+    """
+    if not customer_id:
+        return context
+    if not is_current(context, customer_id):
+        device = context.get("device") if context and context.get("customer_id") == customer_id else None
+        fresh = get_customer_context(customer_id)
+        if fresh is None:
+            return None
+        context = {**fresh, "device": device}
+    device = infer_device(message)
+    if device and device != context.get("device"):
+        context = {**context, "device": device}
+    return context
+
+def format_customer_context(context: dict) -> str:
+    """Plain-text summary of a context for agent prompts ("" if there is none)."""
+    if not context:
+        return ""
+    profile, plan, usage = context["profile"], context.get("plan"), context.get("usage")
+    lines = [
+        f"Customer: {profile.get('name')} (ID {context['customer_id']}), account {profile.get('account_status')}, "
+        f"email {profile.get('email')}, phone {profile.get('phone_number')}, address {profile.get('address')}",
+    ]
+    if plan:
+        data = "unlimited data" if plan.get("unlimited_data") else f"{plan.get('data_limit_gb')} GB data"
+        voice = "unlimited minutes" if plan.get("unlimited_voice") else f"{plan.get('voice_minutes')} minutes"
+        sms = "unlimited SMS" if plan.get("unlimited_sms") else f"{plan.get('sms_count')} SMS"
+        lines.append(
+            f"Plan: {plan.get('name')} ({plan.get('plan_id')}), monthly cost {plan.get('monthly_cost')}, "
+            f"{data}, {voice}, {sms}, international roaming {'included' if plan.get('international_roaming') else 'not included'}"
+        )
+    if usage:
+        lines.append(
+            f"Latest usage ({usage.get('billing_period_start')} to {usage.get('billing_period_end')}, usage ID {usage.get('usage_id')}): "
+            f"{usage.get('data_used_gb')} GB data, {usage.get('voice_minutes_used')} minutes, {usage.get('sms_count_used')} SMS, "
+            f"additional charges {usage.get('additional_charges')}, total bill {usage.get('total_bill_amount')}"
+        )
+    location = context.get("location")
+    if location:
+        lines.append(f"Location: {location['city']}" + (f" ({location['district']})" if location.get("district") else ""))
+    device = context.get("device")
+    if device:
+        lines.append(f"Device: {device['make']} {device['model']}")
+    return "\n".join(lines)
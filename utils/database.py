@@ -1,11 +1,23 @@
 from langchain_community.utilities import SQLDatabase
+from langchain_community.tools.sql_database.tool import QuerySQLDataBaseTool
+from sqlalchemy import text
 from telecom_assistant.config.config import Config
+from telecom_assistant.utils.cache import get_sql_result_cache, referenced_tables
+from functools import lru_cache
 import os
 
+@lru_cache(maxsize=None)
+def _connect(db_uri: str) -> SQLDatabase:
+    """Create the SQLDatabase once per URI; schema reflection is expensive."""
+    return SQLDatabase.from_uri(db_uri)
+
 def get_database() -> SQLDatabase:
     """
     Connect to the SQLite database and return a SQLDatabase instance.
     
+    The instance (and its SQLAlchemy engine/connection pool) is shared by all
+    callers in the process.
+    
     Returns:
         SQLDatabase: The LangChain SQLDatabase wrapper.
         
@@ -21,7 +33,38 @@ def get_database() -> SQLDatabase:
     # We use the sqlite:/// prefix for SQLAlchemy
     db_uri = f"sqlite:///{db_path}"
     
-    return SQLDatabase.from_uri(db_uri)
+    return _connect(db_uri)
+
+def cached_query(sql: str, params: dict = None) -> list:
+    """
+    Run a read query through the shared result cache and return its rows as tuples.
+    
+    Results are reused until one of the tables the query reads is written
+    (see utils/cache.invalidate_tables) or the cache TTL expires.
+    """
+    db = get_database()
+    
+    def run():
+        with db._engine.connect() as conn:
+            return [tuple(row) for row in conn.execute(text(sql), params or {}).fetchall()]
+    
+    if not Config.SQL_RESULT_CACHE_ENABLED:
+        return run()
+    tables = referenced_tables(sql, db.get_usable_table_names())
+    return get_sql_result_cache().get_or_run(sql, params, tables, run)
+
+class CachedQuerySQLDataBaseTool(QuerySQLDataBaseTool):
+    """QuerySQLDataBaseTool whose read results are served from the shared result cache."""
+    
+    def _run(self, query: str, run_manager=None):
+        if not Config.SQL_RESULT_CACHE_ENABLED:
+            return super()._run(query, run_manager)
+        tables = referenced_tables(query, self.db.get_usable_table_names())
+        return get_sql_result_cache().get_or_run(
+            query, None, tables,
+            lambda: super(CachedQuerySQLDataBaseTool, self)._run(query, run_manager),
+            should_cache=lambda result: not (isinstance(result, str) and result.startswith("Error:")),
+        )
 
 def initialize_logs_table():
     """Creates the query_logs table if it doesn't exist."""
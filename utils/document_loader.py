@@ -1,55 +1,166 @@
+import json
 import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from filelock import FileLock
 from llama_index.core import (
     VectorStoreIndex,
-    SimpleDirectoryReader,
     StorageContext,
     load_index_from_storage,
     Settings
 )
 from llama_index.vector_stores.faiss import FaissVectorStore
 from llama_index.llms.openai import OpenAI
-from llama_index.embeddings.openai import OpenAIEmbedding
 import faiss
 from telecom_assistant.config.config import Config
+from telecom_assistant.utils.embeddings import get_embed_model, embedding_signature, LEGACY_SIGNATURE
+from telecom_assistant.utils.lexical_index import HybridRetriever, build_lexical_index, load_lexical_index
+from telecom_assistant.utils.ingestion import ingest_files, list_document_files
+from telecom_assistant.utils.context_compression import context_postprocessors
+from telecom_assistant.utils.mmap_index import MmapIndex, export_mmap_index, has_mmap_index
 
-# Configure global settings
-Settings.llm = OpenAI(model=Config.OPENAI_MODEL_NAME, temperature=0)
-Settings.embed_model = OpenAIEmbedding()
+_settings_configured = False
 
-def load_documents(persist_dir: str = "data/storage"):
+def configure_settings():
+    """
+    Configure the global LlamaIndex LLM and embedding model.
+    
+    Done on first use rather than at import time, so importing this module
+    doesn't construct API clients.
+    """
+    global _settings_configured
+    if _settings_configured:
+        return
+    # Embedding calls go through the cassette too when one is configured
+    from telecom_assistant.utils.llm_cassette import install_from_config
+    install_from_config()
+    Settings.llm = OpenAI(model=Config.OPENAI_MODEL_NAME, temperature=0)
+    Settings.embed_model = get_embed_model()
+    _settings_configured = True
+
+EMBEDDING_META_FILE = "embedding.json"
+CHUNK_REPORT_FILE = "chunk_report.json"
+
+# Index builds are written to versions/.<version>.tmp under the storage root,
+# renamed to versions/<version> once complete, and published by atomically
+# replacing the CURRENT pointer file, so readers never see a partial index.
+# A storage root without CURRENT holds a single unversioned index.
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+# Held while building, so processes sharing a storage root build one at a time
+BUILD_LOCK_FILE = ".build.lock"
+
+def _storage_root(persist_dir: str = None) -> str:
+    persist_dir = persist_dir or Config.INDEX_STORAGE_DIR
+    if not os.path.isabs(persist_dir):
+        persist_dir = str(Config.PROJECT_ROOT / persist_dir)
+    return persist_dir
+
+def current_index_version(persist_dir: str = None) -> str:
+    """Published index version under the storage root ("" for an unversioned index)."""
+    try:
+        with open(os.path.join(_storage_root(persist_dir), CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ""
+
+def index_dir(persist_dir: str = None, version: str = None) -> str:
+    """Directory holding the given (default: published) index version."""
+    root = _storage_root(persist_dir)
+    version = current_index_version(root) if version is None else version
+    return os.path.join(root, VERSIONS_DIR, version) if version else root
+
+def _publish_version(root: str, version: str):
+    """Point CURRENT at `version` (atomic rename) and prune old versions."""
+    pointer_tmp = os.path.join(root, f".{CURRENT_FILE}.tmp")
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer_tmp, os.path.join(root, CURRENT_FILE))
+    
+    # Loaded indexes are in memory or mmapped (unlinked files stay readable on
+    # POSIX), so older directories can go once superseded
+    versions_root = os.path.join(root, VERSIONS_DIR)
+    published = sorted(name for name in os.listdir(versions_root) if not name.startswith("."))
+    for name in published[:-max(1, Config.INDEX_KEEP_VERSIONS)]:
+        shutil.rmtree(os.path.join(versions_root, name), ignore_errors=True)
+
+def _read_embedding_signature(persist_dir: str) -> dict:
+    path = os.path.join(persist_dir, EMBEDDING_META_FILE)
+    if not os.path.exists(path):
+        return dict(LEGACY_SIGNATURE)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_embedding_signature(persist_dir: str, signature: dict):
+    with open(os.path.join(persist_dir, EMBEDDING_META_FILE), "w", encoding="utf-8") as f:
+        json.dump(signature, f, indent=2)
+
+def load_documents(persist_dir: str = None, rebuild: bool = False, progress=None):
     """
     Load documents from the data directory and create/load a FAISS index.
     
     Args:
-        persist_dir (str): Directory to persist the index.
+        persist_dir (str): Index storage root (default: Config.INDEX_STORAGE_DIR).
+        rebuild (bool): Ignore any persisted index and build and publish a new version.
+            An index built with a different embedding backend is always rebuilt.
+        progress: Optional callback(done, total, file_report) called per file while building.
         
     Returns:
         VectorStoreIndex: The loaded or created vector index.
     """
-    # Ensure persist directory is absolute
-    if not os.path.isabs(persist_dir):
-        persist_dir = str(Config.PROJECT_ROOT / persist_dir)
-        
+    configure_settings()
+    signature = embedding_signature(Settings.embed_model)
+    forced = rebuild
+    
+    root = _storage_root(persist_dir)
+    published = current_index_version(root)
+    persist_dir = index_dir(root, published)
     documents_dir = Config.DOCUMENTS_DIR
     
     print(f"Checking for existing index in {persist_dir}...")
     
     # Check if storage context exists
-    if os.path.exists(persist_dir) and os.path.exists(os.path.join(persist_dir, "docstore.json")):
+    if not rebuild and os.path.exists(persist_dir) and os.path.exists(os.path.join(persist_dir, "docstore.json")):
+        stored = _read_embedding_signature(persist_dir)
+        if stored != signature:
+            print(f"Index was built with {stored}, current backend is {signature}. Rebuilding...")
+            rebuild = True
+    
+    if not rebuild and os.path.exists(persist_dir) and os.path.exists(os.path.join(persist_dir, "docstore.json")):
         print("Loading existing index...")
         try:
+            if Config.INDEX_MMAP_ENABLED and has_mmap_index(persist_dir):
+                # Shared read-only mapping instead of a private deserialized copy
+                index = MmapIndex(persist_dir)
+                _set_lexical_index(index, load_lexical_index(index, persist_dir))
+                return index
+            
             # Reconstruct the storage context
-            # For FAISS, we need to reload the vector store specifically if we want to add to it,
-            # but for simple loading, load_index_from_storage is usually sufficient if the vector store was persisted correctly.
-            # However, FAISS vector store persistence in LlamaIndex can be tricky. 
-            # Standard load_index_from_storage might expect a simple vector store.
-            # Let's try the standard way first.
-            storage_context = StorageContext.from_defaults(persist_dir=persist_dir)
+            # The default vector store file is a FAISS binary, so the FAISS store
+            # has to be loaded explicitly; the default loader expects JSON.
+            vector_store = FaissVectorStore.from_persist_dir(persist_dir)
+            storage_context = StorageContext.from_defaults(
+                vector_store=vector_store, persist_dir=persist_dir
+            )
             index = load_index_from_storage(storage_context)
+            _set_lexical_index(index, load_lexical_index(index, persist_dir))
             return index
         except Exception as e:
             print(f"Error loading existing index: {e}. Recreating...")
     
+    # One build at a time, across threads and processes
+    os.makedirs(root, exist_ok=True)
+    with _build_lock, FileLock(os.path.join(root, BUILD_LOCK_FILE)):
+        if not forced and current_index_version(root) != published:
+            # Another process published an index while this one waited
+            return load_documents(root, progress=progress)
+        return _build_index(root, documents_dir, signature, progress)
+
+def _build_index(root: str, documents_dir: str, signature: dict, progress=None):
+    """Index documents_dir and publish the result as a new version under root."""
     print(f"Creating new index from documents in {documents_dir}...")
     
     if not os.path.exists(documents_dir):
@@ -57,18 +168,15 @@ def load_documents(persist_dir: str = "data/storage"):
         print(f"Created documents directory at {documents_dir}. Please add documents.")
         return None
 
-    # Load documents
-    documents = SimpleDirectoryReader(str(documents_dir)).load_data()
-    
-    if not documents:
+    files = list_document_files(documents_dir)
+    if not files:
         print("No documents found to index.")
         return None
         
-    print(f"Loaded {len(documents)} documents.")
+    print(f"Found {len(files)} documents.")
 
-    # Create FAISS index
-    # Dimensions for OpenAI text-embedding-ada-002 is 1536
-    d = 1536
+    # Create FAISS index sized for the configured embedding backend
+    d = signature["dimension"]
     faiss_index = faiss.IndexFlatL2(d)
     
     # Create VectorStore
@@ -76,24 +184,131 @@ def load_documents(persist_dir: str = "data/storage"):
     storage_context = StorageContext.from_defaults(vector_store=vector_store)
     
     # Create Index
-    index = VectorStoreIndex.from_documents(
-        documents, 
-        storage_context=storage_context
-    )
+    # Files are parsed and chunked in a process pool and inserted in batches;
+    # near-duplicate chunks across sources are dropped
+    index = VectorStoreIndex([], storage_context=storage_context)
+    chunk_report = ingest_files(files, index, documents_dir=documents_dir, progress=progress)
+    if not index.docstore.docs:
+        print("No content could be indexed.")
+        return None
+    
+    # Persist to a temporary directory, then publish it as a new version
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    build_dir = os.path.join(root, VERSIONS_DIR, f".{version}.tmp")
+    print(f"Persisting index version {version} to {build_dir}...")
+    try:
+        index.storage_context.persist(persist_dir=build_dir)
+        _write_embedding_signature(build_dir, signature)
+        with open(os.path.join(build_dir, CHUNK_REPORT_FILE), "w", encoding="utf-8") as f:
+            json.dump(chunk_report, f, indent=2)
+        lexical = build_lexical_index(index, build_dir)
+        export_mmap_index(index, build_dir)
+        os.rename(build_dir, os.path.join(root, VERSIONS_DIR, version))
+    except Exception:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    _publish_version(root, version)
+    if Config.INDEX_MMAP_ENABLED:
+        # Serve from the shared mapping and let the in-memory build be freed
+        index = MmapIndex(os.path.join(root, VERSIONS_DIR, version))
+    _set_lexical_index(index, lexical)
+    print(f"Published index version {version}.")
     
-    # Persist Index
-    print(f"Persisting index to {persist_dir}...")
-    index.storage_context.persist(persist_dir=persist_dir)
+    return index
+
+_build_lock = threading.Lock()
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+def get_index():
+    """
+    Return the process-wide vector index, loading it on first use.
     
+    Tools should use this instead of calling load_documents() per query, which
+    deserializes the whole docstore every time. When another process (or a
+    background index job) publishes a new version, the next call loads it;
+    callers already holding the previous index keep using it unchanged.
+    """
+    global _index, _index_version
+    version = current_index_version()
+    if _index is None or version != _index_version:
+        with _index_lock:
+            if _index is None or version != _index_version:
+                _index = load_documents()
+                _index_version = version
+    return _index
+
+def get_loaded_index():
+    """The shared index if this process has already loaded one, else None (never loads or builds)."""
+    return _index
+
+def refresh_index(progress=None):
+    """Build and publish a new index version and swap the shared index in place."""
+    global _index, _index_version
+    index = load_documents(rebuild=True, progress=progress)
+    with _index_lock:
+        _index = index
+        _index_version = current_index_version()
     return index
 
+def get_chunk_report(persist_dir: str = None) -> dict:
+    """Per-document chunk, duplicate, size, parse time and error report from the last index build ({} if unknown)."""
+    path = os.path.join(index_dir(persist_dir), CHUNK_REPORT_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+# BM25 index belonging to the most recently loaded vector index
+_lexical = (None, None)
+
+def _set_lexical_index(index, lexical):
+    global _lexical
+    _lexical = (index, lexical)
+
+def get_lexical_index(index=None):
+    """Return the BM25 index for `index` (default: the shared index), or None if it has none."""
+    index = index if index is not None else get_index()
+    owner, lexical = _lexical
+    return lexical if owner is index else None
+
+def create_query_engine(index=None, similarity_top_k: int = 3):
+    """
+    Build a query engine over the document index.
+    
+    Uses hybrid BM25 + vector retrieval when a lexical index is available
+    (HYBRID_RETRIEVAL_ENABLED), so keyword-heavy queries can skip the
+    embedding call; otherwise plain vector retrieval. With
+    CONTEXT_COMPRESSION_ENABLED, RERANK_CANDIDATES chunks are retrieved,
+    reranked down to similarity_top_k and compressed to CONTEXT_TOKEN_BUDGET.
+    """
+    from llama_index.core.query_engine import RetrieverQueryEngine
+    
+    index = index if index is not None else get_index()
+    if index is None:
+        return None
+    
+    # Over-fetch candidates, then rerank and compress them locally before synthesis
+    postprocessors, top_k = [], similarity_top_k
+    if Config.CONTEXT_COMPRESSION_ENABLED:
+        postprocessors = context_postprocessors(similarity_top_k)
+        top_k = max(similarity_top_k, Config.RERANK_CANDIDATES)
+    
+    lexical = get_lexical_index(index) if Config.HYBRID_RETRIEVAL_ENABLED else None
+    if lexical is None:
+        return index.as_query_engine(similarity_top_k=top_k, node_postprocessors=postprocessors)
+    retriever = HybridRetriever(index, lexical, similarity_top_k=top_k)
+    return RetrieverQueryEngine.from_args(retriever, node_postprocessors=postprocessors)
+
 if __name__ == "__main__":
     try:
         index = load_documents()
         if index:
             print("Successfully loaded/created index.")
             # Test query
-            query_engine = index.as_query_engine()
+            query_engine = create_query_engine(index)
             response = query_engine.query("What are the service plans?")
             print(f"\nTest Query Response:\n{response}")
     except Exception as e:
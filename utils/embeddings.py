@@ -0,0 +1,94 @@
+import zlib
+from typing import List
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import Field
+from telecom_assistant.config.config import Config
+from telecom_assistant.utils.lexical_index import tokenize
+
+# Embedding backends for the document index, selected by EMBEDDING_BACKEND:
+#
+# - "openai": OpenAIEmbedding (remote; best quality).
+# - "local": signed feature hashing of word unigrams/bigrams with sublinear TF,
+#   computed with NumPy on the CPU. No network, no model download, and
+#   thousands of chunks per second, for bulk re-indexing and air-gapped tests.
+#
+# The index dimension follows the backend, and the backend signature is stored
+# next to the persisted index so a mismatched index is rebuilt instead of
+# being queried with incompatible vectors.
+
+# Output dimensions of the OpenAI embedding models we use
+OPENAI_EMBEDDING_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+class HashingEmbedding(BaseEmbedding):
+    """Deterministic local embeddings via the hashing trick."""
+
+    dimension: int = Field(default=512, description="Number of hash buckets / vector size.")
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "HashingEmbedding"
+
+    def _features(self, text: str) -> List[str]:
+        tokens = tokenize(text)
+        return tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed many texts at once into an (n, dimension) float32 matrix of unit vectors."""
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(row)
+                cols.append(h % self.dimension)
+                # One hash bit picks the sign so collisions tend to cancel out
+                values.append(1.0 if (h >> 31) & 1 else -1.0)
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        if rows:
+            np.add.at(matrix, (np.array(rows), np.array(cols)), np.array(values, dtype=np.float32))
+        # Sublinear TF, then L2-normalize
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self.embed_batch([query])[0].tolist()
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self.embed_batch([text])[0].tolist()
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_batch(texts).tolist()
+
+def get_embed_model():
+    """Create the embedding model for the configured backend."""
+    backend = Config.EMBEDDING_BACKEND
+    if backend == "local":
+        return HashingEmbedding(dimension=Config.LOCAL_EMBEDDING_DIM, embed_batch_size=Config.EMBEDDING_BATCH_SIZE)
+    if backend == "openai":
+        from llama_index.embeddings.openai import OpenAIEmbedding
+        return OpenAIEmbedding(model=Config.OPENAI_EMBEDDING_MODEL, embed_batch_size=Config.EMBEDDING_BATCH_SIZE)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+
+def embedding_signature(embed_model=None) -> dict:
+    """Backend, model and dimension of the configured embeddings, as stored with the index."""
+    backend = Config.EMBEDDING_BACKEND
+    if backend == "local":
+        return {"backend": "local", "model": "hashing-v1", "dimension": Config.LOCAL_EMBEDDING_DIM}
+    model = Config.OPENAI_EMBEDDING_MODEL
+    dimension = OPENAI_EMBEDDING_DIMENSIONS.get(model)
+    if dimension is None:
+        # Unknown model: ask it once
+        dimension = len((embed_model or get_embed_model()).get_text_embedding("dimension probe"))
+    return {"backend": backend, "model": model, "dimension": dimension}
+
+# Indexes persisted before the signature was recorded were built with the OpenAI default
+LEGACY_SIGNATURE = {"backend": "openai", "model": "text-embedding-ada-002", "dimension": 1536}
@@ -0,0 +1,80 @@
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# Agent modules are imported lazily, the first time their route is taken.
+# timed_import() records how long each of those first imports took so the
+# startup/first-use cost can be broken down per module.
+
+_timings = {}
+_lock = threading.RLock()
+
+# Modules measured by the cold-start report (`python -m telecom_assistant.utils.import_profiler`)
+REPORT_MODULES = [
+    "telecom_assistant.orchestration.graph",
+    "telecom_assistant.ui.streamlit_app",
+    "telecom_assistant.agents.billing_agents",
+    "telecom_assistant.agents.network_agents",
+    "telecom_assistant.agents.service_agents",
+    "telecom_assistant.agents.knowledge_agents",
+    "telecom_assistant.agents.customer_management_agent",
+    "telecom_assistant.utils.document_loader",
+    "crewai",
+    "autogen",
+    "langchain_openai",
+    "llama_index.core",
+    "textblob",
+]
+
+def timed_import(module_name: str):
+    """Import a module, recording the wall time of its first import."""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    with _lock:
+        # Serialize first imports so two routes don't race to import the same framework
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        _timings[module_name] = time.perf_counter() - start
+        print(f"Loaded {module_name} in {_timings[module_name]:.2f}s")
+        return module
+
+def get_import_report() -> list:
+    """Lazy imports performed in this process so far, slowest first."""
+    return [
+        {"module": name, "seconds": round(seconds, 3)}
+        for name, seconds in sorted(_timings.items(), key=lambda item: item[1], reverse=True)
+    ]
+
+def measure_cold_import(module_name: str) -> float:
+    """Import a module in a fresh interpreter and return the import time in seconds."""
+    code = (
+        "import time, importlib; t = time.perf_counter(); "
+        f"importlib.import_module({module_name!r}); print(time.perf_counter() - t)"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    return float(result.stdout.strip().splitlines()[-1])
+
+def print_cold_start_report(modules: list = None):
+    """Print the cold import cost of each module, each measured in its own interpreter."""
+    modules = modules or REPORT_MODULES
+    print(f"{'Module':<55} {'Cold import (s)':>16}")
+    print("-" * 72)
+    for module_name in modules:
+        try:
+            seconds = f"{measure_cold_import(module_name):.2f}"
+        except Exception as e:
+            seconds = f"error: {e}"
+        print(f"{module_name:<55} {seconds:>16}")
+
+if __name__ == "__main__":
+    print_cold_start_report(sys.argv[1:] or None)
@@ -0,0 +1,251 @@
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from telecom_assistant.config.config import Config
+from telecom_assistant.utils.database import get_database
+
+# Background re-indexing jobs.
+#
+# Jobs are rows in the index_jobs table of the main database, so their status
+# survives restarts and can be polled from any process (the admin dashboard,
+# the API, the CLI below). A job is claimed with a conditional UPDATE, which
+# lets only one worker run it. The build itself is document_loader's
+# versioned build: the new index is written to a temporary directory and
+# published with an atomic rename, and running retrievers switch to it on
+# their next get_index() call.
+#
+# Requests made while a job is still queued are folded into that job, since
+# every build indexes the whole documents folder anyway.
+#
+# While a job runs, its worker refreshes heartbeat_at every
+# INDEX_JOB_HEARTBEAT_SECONDS, independently of build progress (embedding one
+# large file can take many minutes). Only jobs whose heartbeat has stopped,
+# i.e. whose worker process died, are recovered as failed.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS index_jobs (
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    status TEXT NOT NULL,
+    requested_by TEXT,
+    worker TEXT,
+    files_done INTEGER NOT NULL DEFAULT 0,
+    files_total INTEGER NOT NULL DEFAULT 0,
+    current_file TEXT,
+    chunks INTEGER,
+    version TEXT,
+    error TEXT,
+    created_at TEXT,
+    started_at TEXT,
+    updated_at TEXT,
+    heartbeat_at TEXT,
+    finished_at TEXT
+)
+"""
+
+_COLUMNS = [
+    "job_id", "status", "requested_by", "worker", "files_done", "files_total", "current_file",
+    "chunks", "version", "error", "created_at", "started_at", "updated_at", "heartbeat_at", "finished_at",
+]
+
+ACTIVE_STATUSES = ("queued", "running")
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def _engine():
+    global _schema_ready
+    engine = get_database()._engine
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                with engine.begin() as conn:
+                    conn.execute(text(_SCHEMA))
+                    columns = {row[1] for row in conn.execute(text("PRAGMA table_info(index_jobs)"))}
+                    if "heartbeat_at" not in columns:
+                        # Tables created before heartbeats were added
+                        conn.execute(text("ALTER TABLE index_jobs ADD COLUMN heartbeat_at TEXT"))
+                _schema_ready = True
+    return engine
+
+def _row_to_job(row) -> dict:
+    return dict(zip(_COLUMNS, row)) if row else None
+
+def get_job(job_id: int) -> dict:
+    """Job row as a dict, or None if it doesn't exist."""
+    with _engine().connect() as conn:
+        row = conn.execute(
+            text(f"SELECT {', '.join(_COLUMNS)} FROM index_jobs WHERE job_id = :id"), {"id": job_id}
+        ).fetchone()
+    return _row_to_job(row)
+
+def list_jobs(limit: int = 10) -> list:
+    """Most recent jobs first."""
+    with _engine().connect() as conn:
+        rows = conn.execute(
+            text(f"SELECT {', '.join(_COLUMNS)} FROM index_jobs ORDER BY job_id DESC LIMIT :limit"), {"limit": limit}
+        ).fetchall()
+    return [_row_to_job(row) for row in rows]
+
+def recover_stale_jobs() -> int:
+    """Mark running jobs whose heartbeat stopped INDEX_JOB_STALE_SECONDS ago as failed (their worker died)."""
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=Config.INDEX_JOB_STALE_SECONDS)).isoformat()
+    with _engine().begin() as conn:
+        result = conn.execute(
+            text(
+                "UPDATE index_jobs SET status = 'failed', error = 'Worker stopped before finishing', finished_at = :now "
+                "WHERE status = 'running' AND COALESCE(heartbeat_at, updated_at) < :cutoff"
+            ),
+            {"now": _now(), "cutoff": cutoff},
+        )
+    return result.rowcount
+
+def enqueue_index_job(requested_by: str = None, start_worker: bool = True) -> int:
+    """
+    Queue a re-index of the documents folder and return its job id.
+
+    If a job is already queued it is returned instead of adding another.
+    With start_worker, a background thread in this process picks the job up.
+    """
+    recover_stale_jobs()
+    with _engine().begin() as conn:
+        row = conn.execute(
+            text("SELECT job_id FROM index_jobs WHERE status = 'queued' ORDER BY job_id LIMIT 1")
+        ).fetchone()
+        if row:
+            job_id = row[0]
+        else:
+            now = _now()
+            job_id = conn.execute(
+                text(
+                    "INSERT INTO index_jobs (status, requested_by, created_at, updated_at) "
+                    "VALUES ('queued', :requested_by, :now, :now)"
+                ),
+                {"requested_by": requested_by, "now": now},
+            ).lastrowid
+    print(f"--- Index job {job_id} queued ---")
+    if start_worker:
+        _ensure_worker()
+    return job_id
+
+def _worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+def _claim_next_job() -> dict:
+    """Atomically move the oldest queued job to running; None if there is none (or another worker won)."""
+    engine = _engine()
+    with engine.begin() as conn:
+        # Only one job runs at a time across processes
+        if conn.execute(text("SELECT 1 FROM index_jobs WHERE status = 'running' LIMIT 1")).fetchone():
+            return None
+        row = conn.execute(
+            text("SELECT job_id FROM index_jobs WHERE status = 'queued' ORDER BY job_id LIMIT 1")
+        ).fetchone()
+        if row is None:
+            return None
+        now = _now()
+        claimed = conn.execute(
+            text(
+                "UPDATE index_jobs SET status = 'running', worker = :worker, started_at = :now, updated_at = :now, "
+                "heartbeat_at = :now WHERE job_id = :id AND status = 'queued'"
+            ),
+            {"worker": _worker_name(), "now": now, "id": row[0]},
+        ).rowcount
+    return get_job(row[0]) if claimed == 1 else None
+
+def _update_job(job_id: int, **fields):
+    fields["updated_at"] = _now()
+    assignments = ", ".join(f"{name} = :{name}" for name in fields)
+    with _engine().begin() as conn:
+        conn.execute(text(f"UPDATE index_jobs SET {assignments} WHERE job_id = :job_id"), {**fields, "job_id": job_id})
+
+def _heartbeat(job_id: int, stop: threading.Event):
+    """Refresh a running job's heartbeat until `stop` is set."""
+    while not stop.wait(Config.INDEX_JOB_HEARTBEAT_SECONDS):
+        try:
+            with _engine().begin() as conn:
+                conn.execute(
+                    text("UPDATE index_jobs SET heartbeat_at = :now WHERE job_id = :id AND status = 'running'"),
+                    {"now": _now(), "id": job_id},
+                )
+        except Exception as e:
+            print(f"Index job {job_id} heartbeat failed: {e}")
+
+def run_job(job: dict) -> dict:
+    """Build and publish a new index version for a claimed job, recording progress as it goes."""
+    from telecom_assistant.utils.document_loader import current_index_version, refresh_index
+
+    job_id = job["job_id"]
+    print(f"--- Index job {job_id} running ---")
+
+    def on_progress(done, total, file_report):
+        _update_job(job_id, files_done=done, files_total=total, current_file=file_report["file"])
+
+    stop_heartbeat = threading.Event()
+    threading.Thread(
+        target=_heartbeat, args=(job_id, stop_heartbeat), name=f"index-job-{job_id}-heartbeat", daemon=True
+    ).start()
+    try:
+        index = refresh_index(progress=on_progress)
+        if index is None:
+            raise RuntimeError("No documents could be indexed")
+        _update_job(
+            job_id, status="succeeded", current_file=None, chunks=len(index.docstore.docs),
+            version=current_index_version(), finished_at=_now(),
+        )
+        print(f"--- Index job {job_id} succeeded ---")
+    except Exception as e:
+        _update_job(job_id, status="failed", error=f"{type(e).__name__}: {e}", finished_at=_now())
+        print(f"--- Index job {job_id} failed: {e} ---")
+    finally:
+        stop_heartbeat.set()
+    return get_job(job_id)
+
+def run_pending_jobs() -> int:
+    """Run queued jobs until none are left; returns how many this worker ran."""
+    ran = 0
+    while True:
+        job = _claim_next_job()
+        if job is None:
+            return ran
+        run_job(job)
+        ran += 1
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def _claimable() -> bool:
+    with _engine().connect() as conn:
+        return conn.execute(text(
+            "SELECT 1 FROM index_jobs WHERE status = 'queued' "
+            "AND NOT EXISTS (SELECT 1 FROM index_jobs WHERE status = 'running') LIMIT 1"
+        )).fetchone() is not None
+
+def _drain():
+    global _worker
+    while True:
+        run_pending_jobs()
+        # Re-check under the lock so a job queued while we were finishing isn't stranded
+        with _worker_lock:
+            if not _claimable():
+                _worker = None
+                return
+
+def _ensure_worker():
+    """Start the in-process worker thread unless one is already draining the queue."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_drain, name="index-jobs", daemon=True)
+            _worker.start()
+
+if __name__ == "__main__":
+    # Queue a re-index and run it in the foreground
+    job_id = enqueue_index_job(requested_by="cli", start_worker=False)
+    run_pending_jobs()
+    job = get_job(job_id)
+    print(f"Job {job_id}: {job['status']} (version {job['version']}, {job['chunks']} chunks) {job['error'] or ''}")
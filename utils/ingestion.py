@@ -0,0 +1,137 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from telecom_assistant.config.config import Config
+from telecom_assistant.utils.chunking import NearDuplicateFilter, chunk_text, simhash
+
+# Document ingestion pipeline used when (re)building the index.
+#
+# Files are parsed and chunked in a process pool (PDF parsing is CPU-bound),
+# and results are consumed in file order through a bounded window of
+# in-flight files, so at most INGEST_WORKERS * 2 parsed files are held in
+# memory at once. Chunks are de-duplicated and embedded/inserted into the
+# index in batches of INGEST_BATCH_SIZE as they arrive instead of after the
+# whole folder has been read.
+
+SUPPORTED_EXTENSIONS = {".pdf", ".md", ".txt"}
+
+def list_document_files(documents_dir) -> list:
+    """Supported files under documents_dir, in a stable order."""
+    files = []
+    for root, _, names in os.walk(str(documents_dir)):
+        for name in names:
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS and not name.startswith("."):
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+def parse_file(path: str) -> dict:
+    """
+    Parse and chunk one file (runs in a worker process).
+
+    Returns:
+        dict: file, bytes, seconds, error, and documents as
+        [{"doc_id", "metadata", "excluded_embed", "excluded_llm", "chunks": [(section, text, simhash)]}].
+    """
+    from llama_index.core import SimpleDirectoryReader
+
+    start = time.perf_counter()
+    result = {"file": path, "bytes": 0, "seconds": 0.0, "error": None, "documents": []}
+    try:
+        result["bytes"] = os.path.getsize(path)
+        for document in SimpleDirectoryReader(input_files=[path]).load_data():
+            result["documents"].append({
+                "doc_id": document.doc_id,
+                "metadata": document.metadata,
+                "excluded_embed": list(document.excluded_embed_metadata_keys),
+                "excluded_llm": list(document.excluded_llm_metadata_keys),
+                "chunks": [(section, text, simhash(text)) for section, text in chunk_text(document.text)],
+            })
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+def iter_parsed_files(files: list, workers: int = None):
+    """Yield parse_file() results in file order, keeping at most 2 * workers files in flight."""
+    workers = workers or Config.INGEST_WORKERS
+    if workers <= 1 or len(files) <= 1:
+        for path in files:
+            yield parse_file(path)
+        return
+
+    # spawn: the app process is multi-threaded (Streamlit, API), which fork doesn't handle safely
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque()
+        remaining = iter(files)
+        for path in remaining:
+            pending.append(pool.submit(parse_file, path))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            yield pending.popleft().result()
+            next_path = next(remaining, None)
+            if next_path is not None:
+                pending.append(pool.submit(parse_file, next_path))
+
+def ingest_files(files: list, index, documents_dir=None, workers: int = None, batch_size: int = None,
+                 progress=None) -> dict:
+    """
+    Parse, chunk, de-duplicate and insert files into `index` in bounded batches.
+
+    Args:
+        documents_dir: Folder the files were listed from; report keys are relative to it
+            (so same-named files in different subfolders are reported separately).
+        progress: Optional callback called with (done, total, file_report) after each file.
+
+    Returns:
+        dict: Per-file report {relative path: {"chunks", "duplicates", "bytes", "seconds", "error"}}.
+    """
+    from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+
+    batch_size = batch_size or Config.INGEST_BATCH_SIZE
+    duplicates = NearDuplicateFilter()
+    report, batch = {}, []
+    start = time.perf_counter()
+
+    def flush():
+        if batch:
+            index.insert_nodes(batch)
+            batch.clear()
+
+    for done, parsed in enumerate(iter_parsed_files(files, workers), start=1):
+        name = os.path.relpath(parsed["file"], str(documents_dir)) if documents_dir else parsed["file"]
+        name = name.replace(os.sep, "/")
+        stats = {"chunks": 0, "duplicates": 0, "bytes": parsed["bytes"], "seconds": parsed["seconds"], "error": parsed["error"]}
+        for document in parsed["documents"]:
+            for section, text, fingerprint in document["chunks"]:
+                if duplicates.seen(fingerprint):
+                    stats["duplicates"] += 1
+                    continue
+                node = TextNode(
+                    text=text,
+                    metadata={**document["metadata"], "section": section},
+                    excluded_embed_metadata_keys=document["excluded_embed"] + ["section"],
+                    excluded_llm_metadata_keys=document["excluded_llm"] + ["section"],
+                )
+                node.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id=document["doc_id"])
+                batch.append(node)
+                stats["chunks"] += 1
+                if len(batch) >= batch_size:
+                    flush()
+        report[name] = stats
+        if stats["error"]:
+            print(f"  {name}: ERROR {stats['error']}")
+        else:
+            print(f"  {name}: {stats['chunks']} chunks, {stats['duplicates']} near-duplicates dropped "
+                  f"({stats['bytes'] / 1024:.0f} KB parsed in {stats['seconds']:.2f}s)")
+        if progress is not None:
+            progress(done, len(files), {"file": name, **stats})
+    flush()
+
+    elapsed = time.perf_counter() - start
+    total_bytes = sum(stats["bytes"] for stats in report.values())
+    print(f"Ingested {len(files)} files ({total_bytes / 1024 / 1024:.1f} MB) in {elapsed:.1f}s")
+    return report
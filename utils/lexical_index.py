@@ -0,0 +1,177 @@
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import List
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from telecom_assistant.config.config import Config
+
+# Local BM25 index over the same chunks as the vector index.
+#
+# Support questions are often keyword-heavy (VoLTE, APN, roaming, device
+# models), and for those an exact-term match is at least as good as the
+# embedding search. HybridRetriever answers such queries from BM25 alone,
+# skipping the embedding round trip, and otherwise fuses the BM25 and vector
+# result lists with reciprocal-rank fusion.
+
+LEXICAL_INDEX_FILE = "lexical_index.json"
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how",
+    "i", "if", "in", "is", "it", "me", "my", "of", "on", "or", "our", "so", "that", "the", "this",
+    "to", "up", "was", "we", "what", "when", "where", "which", "who", "why", "will", "with", "you",
+    "your", "there", "their", "about", "please", "tell", "get", "set",
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word/number tokens without stopwords; plural 's' is stripped from longer words."""
+    tokens = []
+    for token in re.findall(r"[a-z0-9]+", text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+class BM25Index:
+    """Okapi BM25 over a fixed set of chunks, stored as an inverted index."""
+
+    def __init__(self, doc_ids: list, doc_lens: list, postings: dict, k1: float = 1.2, b: float = 0.75):
+        self.doc_ids = doc_ids
+        self.doc_lens = doc_lens
+        self.postings = postings
+        self.k1 = k1
+        self.b = b
+        self.avg_len = (sum(doc_lens) / len(doc_lens)) if doc_lens else 0.0
+        n = len(doc_ids)
+        self.idf = {
+            term: math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for term, plist in postings.items()
+        }
+
+    @classmethod
+    def from_texts(cls, items: list, **kwargs) -> "BM25Index":
+        """Build from [(doc_id, text), ...]."""
+        doc_ids, doc_lens, postings = [], [], {}
+        for position, (doc_id, text) in enumerate(items):
+            tokens = tokenize(text)
+            doc_ids.append(doc_id)
+            doc_lens.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append([position, tf])
+        return cls(doc_ids, doc_lens, postings, **kwargs)
+
+    def search(self, query: str, top_k: int = 5):
+        """
+        Score documents against the query.
+
+        Returns:
+            tuple: ([(doc_id, score), ...] best first, confidence) where
+            confidence is the top score relative to the best score the query's
+            known terms could reach, in [0, 1].
+        """
+        terms = [term for term in set(tokenize(query)) if term in self.postings]
+        if not terms or not self.doc_ids:
+            return [], 0.0
+        scores = {}
+        for term in terms:
+            idf = self.idf[term]
+            for position, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lens[position] / (self.avg_len or 1))
+                scores[position] = scores.get(position, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+        # Unknown query terms count against confidence at the average idf
+        all_terms = set(tokenize(query))
+        avg_idf = sum(self.idf.values()) / len(self.idf)
+        ceiling = sum(self.idf.get(term, avg_idf) for term in all_terms) * (self.k1 + 1)
+        confidence = min(1.0, ranked[0][1] / ceiling) if ceiling else 0.0
+        return [(self.doc_ids[position], score) for position, score in ranked], confidence
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "k1": self.k1, "b": self.b, "doc_ids": self.doc_ids,
+                "doc_lens": self.doc_lens, "postings": self.postings,
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["doc_ids"], data["doc_lens"], data["postings"], k1=data["k1"], b=data["b"])
+
+def build_lexical_index(index, persist_dir: str = None) -> BM25Index:
+    """Build a BM25 index from the vector index's docstore (and persist it next to it)."""
+    items = [(node_id, node.get_content()) for node_id, node in index.docstore.docs.items()]
+    lexical = BM25Index.from_texts(items)
+    if persist_dir:
+        lexical.save(os.path.join(persist_dir, LEXICAL_INDEX_FILE))
+    return lexical
+
+def load_lexical_index(index, persist_dir: str) -> BM25Index:
+    """Load the persisted BM25 index, rebuilding it if missing or out of sync with the docstore."""
+    path = os.path.join(persist_dir, LEXICAL_INDEX_FILE)
+    if os.path.exists(path):
+        try:
+            lexical = BM25Index.load(path)
+            if set(lexical.doc_ids) == set(index.docstore.docs):
+                return lexical
+            print("Lexical index is out of sync with the docstore. Rebuilding...")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error loading lexical index: {e}. Rebuilding...")
+    return build_lexical_index(index, persist_dir)
+
+def reciprocal_rank_fusion(result_lists: list, k: int = 60) -> list:
+    """Fuse ranked lists of node IDs; returns [(node_id, fused_score), ...] best first."""
+    fused = {}
+    for results in result_lists:
+        for rank, node_id in enumerate(results):
+            fused[node_id] = fused.get(node_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+class HybridRetriever(BaseRetriever):
+    """
+    BM25 + vector retriever.
+
+    If the BM25 confidence reaches `lexical_only_threshold` the vector search
+    (and its query embedding) is skipped; otherwise both lists are fused with RRF.
+    """
+
+    def __init__(self, index, lexical: BM25Index, similarity_top_k: int = 3,
+                 lexical_only_threshold: float = None, **kwargs):
+        super().__init__(**kwargs)
+        self.index = index
+        self.lexical = lexical
+        self.similarity_top_k = similarity_top_k
+        self.lexical_only_threshold = (
+            Config.LEXICAL_ONLY_MIN_CONFIDENCE if lexical_only_threshold is None else lexical_only_threshold
+        )
+        self.vector_retriever = index.as_retriever(similarity_top_k=similarity_top_k * 2)
+
+    def _lexical_nodes(self, hits: list) -> list:
+        return [
+            NodeWithScore(node=self.index.docstore.get_node(node_id), score=score)
+            for node_id, score in hits[:self.similarity_top_k]
+        ]
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        hits, confidence = self.lexical.search(query_bundle.query_str, top_k=self.similarity_top_k * 2)
+        if hits and confidence >= self.lexical_only_threshold:
+            print(f"--- Lexical-only retrieval (confidence {confidence:.2f}) ---")
+            return self._lexical_nodes(hits)
+
+        vector_nodes = self.vector_retriever.retrieve(query_bundle)
+        if not hits:
+            return vector_nodes[:self.similarity_top_k]
+
+        by_id = {n.node.node_id: n.node for n in vector_nodes}
+        fused = reciprocal_rank_fusion([[n.node.node_id for n in vector_nodes], [node_id for node_id, _ in hits]])
+        results = []
+        for node_id, score in fused[:self.similarity_top_k]:
+            node = by_id.get(node_id) or self.index.docstore.get_node(node_id)
+            results.append(NodeWithScore(node=node, score=score))
+        return results
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+import httpx
+from openai import OpenAIError
+from telecom_assistant.config.config import Config
+
+# Record/replay layer for LLM and embedding calls.
+#
+# Every client we use (LangChain's ChatOpenAI, CrewAI, AutoGen's config_list
+# client, LlamaIndex's OpenAI / OpenAIEmbedding) ends up in the OpenAI SDK,
+# which sends requests through httpx. Patching httpx.Client.send and
+# httpx.AsyncClient.send therefore covers all of them in one place.
+#
+# - record: requests go to the API as usual; request/response pairs are stored
+#   in a compact SQLite cassette (zlib-compressed bodies).
+# - replay: responses are served from the cassette without network access,
+#   optionally with injected latency, so full orchestration traces can be
+#   re-run offline to measure our own (non-LLM) overhead.
+#
+# Identical requests (e.g. repeated AutoGen turns) are stored in sequence and
+# replayed in the same order.
+
+class CassetteMiss(OpenAIError, RuntimeError):
+    """
+    Raised in replay mode when a request has no recorded response.
+
+    It is raised from inside the SDK's HTTP call, where any other exception
+    would be retried and then wrapped in APIConnectionError; the SDK passes
+    OpenAIErrors through unchanged, so callers see the miss immediately.
+    """
+
+# Headers that no longer apply once the body is stored decoded
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+def _canonical_body(content: bytes) -> bytes:
+    """JSON bodies are re-serialized with sorted keys so key order doesn't change the hash."""
+    try:
+        return json.dumps(json.loads(content), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        return content
+
+def request_key(request: httpx.Request) -> str:
+    digest = hashlib.sha256()
+    digest.update(request.method.encode("utf-8"))
+    digest.update(request.url.path.encode("utf-8"))
+    digest.update(_canonical_body(request.content))
+    return digest.hexdigest()
+
+class CassetteStore:
+    """SQLite-backed store of recorded interactions."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS interactions (
+                key TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                method TEXT,
+                url TEXT,
+                request_body BLOB,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                elapsed REAL,
+                recorded_at REAL,
+                PRIMARY KEY (key, seq)
+            )
+            """
+        )
+        self.conn.commit()
+        # Replay position per key (per process)
+        self.positions = {}
+
+    def save(self, key: str, request: httpx.Request, response: httpx.Response, elapsed: float):
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS}
+        with self.lock:
+            seq = self.conn.execute("SELECT COUNT(*) FROM interactions WHERE key = ?", (key,)).fetchone()[0]
+            self.conn.execute(
+                "INSERT INTO interactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, seq, request.method, str(request.url.copy_with(query=None)),
+                    zlib.compress(request.content), response.status_code, json.dumps(headers),
+                    zlib.compress(response.content), elapsed, time.time(),
+                ),
+            )
+            self.conn.commit()
+
+    def load(self, key: str):
+        """Next recorded (status, headers, body, elapsed) for key, cycling through repeats."""
+        with self.lock:
+            count = self.conn.execute("SELECT COUNT(*) FROM interactions WHERE key = ?", (key,)).fetchone()[0]
+            if not count:
+                return None
+            seq = self.positions.get(key, 0) % count
+            self.positions[key] = seq + 1
+            row = self.conn.execute(
+                "SELECT status, headers, body, elapsed FROM interactions WHERE key = ? AND seq = ?", (key, seq)
+            ).fetchone()
+        return row[0], json.loads(row[1]), zlib.decompress(row[2]), row[3]
+
+    def summary(self) -> dict:
+        with self.lock:
+            total, keys, size = self.conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT key), COALESCE(SUM(LENGTH(body) + LENGTH(request_body)), 0) FROM interactions"
+            ).fetchone()
+        return {"path": self.path, "interactions": total, "unique_requests": keys, "compressed_bytes": size}
+
+class Cassette:
+    """Decides which requests are intercepted and performs record/replay."""
+
+    def __init__(self, mode: str, store: CassetteStore, hosts: set, latency_ms: float = 0.0,
+                 latency_scale: float = 0.0, on_miss: str = "error"):
+        self.mode = mode
+        self.store = store
+        self.hosts = hosts
+        self.latency_ms = latency_ms
+        self.latency_scale = latency_scale
+        self.on_miss = on_miss
+
+    def intercepts(self, request: httpx.Request) -> bool:
+        return request.url.host in self.hosts
+
+    def replay_delay(self, recorded_elapsed: float) -> float:
+        return self.latency_ms / 1000.0 + self.latency_scale * (recorded_elapsed or 0.0)
+
+    def build_response(self, request: httpx.Request, status: int, headers: dict, body: bytes) -> httpx.Response:
+        return httpx.Response(status, headers=headers, content=body, request=request)
+
+    def miss(self, request: httpx.Request, key: str):
+        if self.on_miss == "passthrough":
+            return None
+        raise CassetteMiss(f"No recorded response for {request.method} {request.url.path} (key {key[:12]})")
+
+_cassette = None
+_original_send = httpx.Client.send
+_original_async_send = httpx.AsyncClient.send
+
+def _send(self, request, **kwargs):
+    cassette = _cassette
+    if cassette is None or not cassette.intercepts(request):
+        return _original_send(self, request, **kwargs)
+
+    key = request_key(request)
+    if cassette.mode == "replay":
+        recorded = cassette.store.load(key)
+        if recorded is not None:
+            status, headers, body, elapsed = recorded
+            time.sleep(cassette.replay_delay(elapsed))
+            return cassette.build_response(request, status, headers, body)
+        cassette.miss(request, key)
+
+    start = time.perf_counter()
+    response = _original_send(self, request, **kwargs)
+    # Read the full body (including streamed responses) so it can be stored;
+    # the SDK can still iterate it afterwards.
+    response.read()
+    cassette.store.save(key, request, response, time.perf_counter() - start)
+    return response
+
+async def _async_send(self, request, **kwargs):
+    cassette = _cassette
+    if cassette is None or not cassette.intercepts(request):
+        return await _original_async_send(self, request, **kwargs)
+
+    key = request_key(request)
+    if cassette.mode == "replay":
+        recorded = cassette.store.load(key)
+        if recorded is not None:
+            import asyncio
+            status, headers, body, elapsed = recorded
+            await asyncio.sleep(cassette.replay_delay(elapsed))
+            return cassette.build_response(request, status, headers, body)
+        cassette.miss(request, key)
+
+    start = time.perf_counter()
+    response = await _original_async_send(self, request, **kwargs)
+    await response.aread()
+    cassette.store.save(key, request, response, time.perf_counter() - start)
+    return response
+
+def install_cassette(mode: str, path: str, hosts: set = None, latency_ms: float = 0.0,
+                     latency_scale: float = 0.0, on_miss: str = "error") -> Cassette:
+    """Patch httpx so that requests to `hosts` are recorded or replayed."""
+    global _cassette
+    if mode not in ("record", "replay"):
+        raise ValueError(f"Unknown cassette mode: {mode}")
+    _cassette = Cassette(mode, CassetteStore(path), hosts or set(), latency_ms, latency_scale, on_miss)
+    httpx.Client.send = _send
+    httpx.AsyncClient.send = _async_send
+    print(f"LLM cassette active: {mode} ({path})")
+    return _cassette
+
+def uninstall_cassette():
+    """Restore the original httpx transport methods."""
+    global _cassette
+    _cassette = None
+    httpx.Client.send = _original_send
+    httpx.AsyncClient.send = _original_async_send
+
+def install_from_config():
+    """Install the cassette if LLM_CASSETTE_MODE is set (idempotent)."""
+    if _cassette is not None or Config.LLM_CASSETTE_MODE in ("", "off"):
+        return _cassette
+    hosts = set(Config.LLM_CASSETTE_HOSTS)
+    if Config.OPENAI_BASE_URL:
+        hosts.add(urlparse(Config.OPENAI_BASE_URL).hostname)
+    return install_cassette(
+        Config.LLM_CASSETTE_MODE,
+        Config.LLM_CASSETTE_PATH,
+        hosts=hosts,
+        latency_ms=Config.LLM_CASSETTE_LATENCY_MS,
+        latency_scale=Config.LLM_CASSETTE_LATENCY_SCALE,
+        on_miss=Config.LLM_CASSETTE_ON_MISS,
+    )
+
+if __name__ == "__main__":
+    print(json.dumps(CassetteStore(Config.LLM_CASSETTE_PATH).summary(), indent=2))
@@ -0,0 +1,142 @@
+import json
+import mmap
+import os
+from collections.abc import Mapping
+from typing import List
+import numpy as np
+from llama_index.core import Settings
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.storage.docstore.utils import doc_to_json, json_to_doc
+
+# Memory-mapped, read-only form of a published index version.
+#
+# Every app worker that deserializes docstore.json and the FAISS file holds
+# its own copy of all nodes and vectors. Alongside those files, each build
+# also writes:
+#
+#   vectors.f32  N x dimension float32 rows, no header
+#   nodes.bin    the serialized nodes, back to back (UTF-8 JSON)
+#   nodes.idx    N + 1 int64 byte offsets into nodes.bin
+#   mmap.json    count, dimension and the node id of each row
+#
+# Processes open these with mmap, so all workers on a host share one copy in
+# the page cache; a node is only decoded when a query returns it. Both
+# embedding backends produce unit-length vectors, so scores are dot products
+# (cosine similarity, higher is better).
+
+VECTORS_FILE = "vectors.f32"
+NODES_FILE = "nodes.bin"
+OFFSETS_FILE = "nodes.idx"
+MMAP_META_FILE = "mmap.json"
+
+# Rows scored per matrix product, so a search never materializes all scores at once
+_SEARCH_BLOCK_ROWS = 65536
+
+def has_mmap_index(persist_dir: str) -> bool:
+    return os.path.exists(os.path.join(persist_dir, MMAP_META_FILE))
+
+def export_mmap_index(index, persist_dir: str):
+    """Write the mmap files for a FAISS-backed VectorStoreIndex into persist_dir."""
+    faiss_index = index.vector_store._faiss_index
+    rows = sorted(index.index_struct.nodes_dict.items(), key=lambda item: int(item[0]))
+    node_ids = [node_id for _, node_id in rows]
+    vectors = faiss_index.reconstruct_n(0, faiss_index.ntotal).astype(np.float32, copy=False)
+    vectors = vectors[[int(row) for row, _ in rows]]
+    vectors.tofile(os.path.join(persist_dir, VECTORS_FILE))
+
+    offsets = [0]
+    with open(os.path.join(persist_dir, NODES_FILE), "wb") as f:
+        for node_id in node_ids:
+            record = json.dumps(doc_to_json(index.docstore.get_node(node_id))).encode("utf-8")
+            f.write(record)
+            offsets.append(offsets[-1] + len(record))
+    np.asarray(offsets, dtype=np.int64).tofile(os.path.join(persist_dir, OFFSETS_FILE))
+
+    with open(os.path.join(persist_dir, MMAP_META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"count": len(node_ids), "dimension": int(vectors.shape[1]), "node_ids": node_ids}, f)
+
+class MmapDocstore(Mapping):
+    """Read-only node_id -> node mapping over nodes.bin; nodes are decoded on access."""
+
+    def __init__(self, persist_dir: str, node_ids: list):
+        self.node_ids = node_ids
+        self.rows = {node_id: row for row, node_id in enumerate(node_ids)}
+        self.offsets = np.memmap(os.path.join(persist_dir, OFFSETS_FILE), dtype=np.int64, mode="r")
+        with open(os.path.join(persist_dir, NODES_FILE), "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def docs(self):
+        # Same access pattern as a LlamaIndex docstore's .docs, without loading every node
+        return self
+
+    def node_at(self, row: int):
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return json_to_doc(json.loads(self._data[start:end].decode("utf-8")))
+
+    def get_node(self, node_id: str):
+        return self.node_at(self.rows[node_id])
+
+    def __getitem__(self, node_id: str):
+        return self.get_node(node_id)
+
+    def __iter__(self):
+        return iter(self.node_ids)
+
+    def __len__(self):
+        return len(self.node_ids)
+
+class MmapIndex:
+    """
+    Read-only index over the mmap files of one index version.
+
+    Offers the parts of the VectorStoreIndex interface the app uses
+    (docstore, as_retriever, as_query_engine).
+    """
+
+    def __init__(self, persist_dir: str):
+        with open(os.path.join(persist_dir, MMAP_META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.persist_dir = persist_dir
+        self.dimension = meta["dimension"]
+        self.docstore = MmapDocstore(persist_dir, meta["node_ids"])
+        self.vectors = np.memmap(
+            os.path.join(persist_dir, VECTORS_FILE), dtype=np.float32, mode="r",
+            shape=(meta["count"], meta["dimension"]),
+        )
+
+    def search(self, query_vector, top_k: int):
+        """Top-k (row, score) pairs by dot product, best first."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, len(self.vectors), _SEARCH_BLOCK_ROWS):
+            scores = np.concatenate([best_scores, self.vectors[start:start + _SEARCH_BLOCK_ROWS] @ query])
+            rows = np.concatenate([best_rows, np.arange(start, min(start + _SEARCH_BLOCK_ROWS, len(self.vectors)))])
+            keep = np.argsort(-scores, kind="stable")[:top_k]
+            best_rows, best_scores = rows[keep], scores[keep]
+        return list(zip(best_rows.tolist(), best_scores.tolist()))
+
+    def as_retriever(self, similarity_top_k: int = 2, **kwargs) -> "MmapRetriever":
+        return MmapRetriever(self, similarity_top_k=similarity_top_k, **kwargs)
+
+    def as_query_engine(self, similarity_top_k: int = 2, **kwargs):
+        from llama_index.core.query_engine import RetrieverQueryEngine
+        return RetrieverQueryEngine.from_args(self.as_retriever(similarity_top_k=similarity_top_k), **kwargs)
+
+class MmapRetriever(BaseRetriever):
+    """Vector retriever over an MmapIndex, embedding queries with the configured embed model."""
+
+    def __init__(self, index: MmapIndex, similarity_top_k: int = 2, embed_model=None, **kwargs):
+        super().__init__(**kwargs)
+        self.index = index
+        self.similarity_top_k = similarity_top_k
+        self.embed_model = embed_model or Settings.embed_model
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        query_vector = query_bundle.embedding or self.embed_model.get_query_embedding(query_bundle.query_str)
+        return [
+            NodeWithScore(node=self.index.docstore.node_at(row), score=score)
+            for row, score in self.index.search(query_vector, self.similarity_top_k)
+        ]
@@ -0,0 +1,308 @@
+import json
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import text
+from llama_index.core.query_engine import NLSQLTableQueryEngine
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+from telecom_assistant.utils.database import get_database
+
+# NL-to-SQL template cache for the knowledge engine's SQL branch.
+#
+# Questions about coverage, devices and technical specs repeat with only the
+# entity changing ("is the iPhone 12 compatible" / "is the Galaxy S21
+# compatible"). Known entities are extracted from the question as slots using
+# the values actually stored in the reference tables, leaving a template such
+# as "is the {device_model} compatible". The first time a template is seen the
+# LLM writes the SQL as usual; the entity literals in that SQL are then
+# replaced by bind parameters, the parameterized statement is validated once
+# (it must be a single SELECT that reproduces the original result), and it is
+# stored. Later questions with the same template skip the text-to-SQL call and
+# run the cached statement with the new slot values. Response synthesis is
+# unchanged.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sql_template_cache (
+    template TEXT PRIMARY KEY,
+    sql_text TEXT NOT NULL,
+    slots TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT,
+    last_used_at TEXT
+)
+"""
+
+# (slot type, SQL returning its known values)
+_VOCABULARY_SOURCES = [
+    ("device_make", "SELECT DISTINCT device_make FROM device_compatibility"),
+    ("device_model", "SELECT DISTINCT device_model FROM device_compatibility"),
+    ("city", "SELECT DISTINCT city FROM coverage_areas"),
+    ("state", "SELECT DISTINCT state FROM coverage_areas"),
+    ("technology", "SELECT DISTINCT technology FROM coverage_areas"),
+    ("technology", "SELECT DISTINCT technology FROM technical_specs"),
+    ("technology", "SELECT DISTINCT network_technology FROM device_compatibility"),
+    ("frequency_band", "SELECT DISTINCT frequency_band FROM technical_specs"),
+]
+
+_vocabulary = None
+_vocabulary_lock = threading.Lock()
+
+def get_vocabulary() -> List[Tuple[str, str]]:
+    """Known (slot_type, value) pairs, longest values first so '4G LTE' wins over '4G'."""
+    global _vocabulary
+    if _vocabulary is None:
+        with _vocabulary_lock:
+            if _vocabulary is None:
+                pairs = set()
+                with get_database()._engine.connect() as conn:
+                    for slot_type, sql in _VOCABULARY_SOURCES:
+                        for (value,) in conn.execute(text(sql)).fetchall():
+                            if value and value.upper() != "N/A":
+                                pairs.add((slot_type, value))
+                _vocabulary = sorted(pairs, key=lambda pair: len(pair[1]), reverse=True)
+    return _vocabulary
+
+def extract_template(question: str) -> Tuple[str, List[Dict[str, str]]]:
+    """
+    Replace known entities in a question with typed placeholders.
+
+    Returns:
+        tuple: (template, slots) where slots is a list of
+        {"name", "type", "value"} in order of appearance.
+    """
+    found = []
+    taken = []
+    for slot_type, value in get_vocabulary():
+        # Two-letter state codes only match in upper case ("IN" vs "in")
+        flags = 0 if slot_type == "state" else re.IGNORECASE
+        for match in re.finditer(rf"(?<![\w]){re.escape(value)}(?![\w])", question, flags):
+            span = match.span()
+            if any(start < span[1] and span[0] < end for start, end in taken):
+                continue
+            taken.append(span)
+            found.append((span, slot_type, value))
+    found.sort()
+
+    slots, parts, cursor, counts = [], [], 0, {}
+    for (start, end), slot_type, value in found:
+        counts[slot_type] = counts.get(slot_type, 0) + 1
+        name = slot_type if counts[slot_type] == 1 else f"{slot_type}_{counts[slot_type]}"
+        parts.append(question[cursor:start])
+        parts.append(f"{{{name}}}")
+        slots.append({"name": name, "type": slot_type, "value": value})
+        cursor = end
+    parts.append(question[cursor:])
+
+    template = "".join(parts).lower()
+    template = re.sub(r"[^\w{}]+", " ", template).strip()
+    return template, slots
+
+def _apply_transform(value: str, transform: str) -> str:
+    if transform == "lower":
+        return value.lower()
+    if transform == "upper":
+        return value.upper()
+    return value
+
+def parameterize_sql(sql: str, slots: List[Dict[str, str]]):
+    """
+    Replace each slot's literal in `sql` with a bind parameter.
+
+    Returns:
+        tuple: (parameterized_sql, slot_specs) or (None, None) if some slot
+        value doesn't appear as a literal, in which case the statement can't
+        safely be reused for other values.
+    """
+    specs = []
+    for slot in slots:
+        value = slot["value"]
+        replaced = False
+
+        def replace(match):
+            nonlocal replaced, transform
+            literal = match.group(1)
+            prefix, core, suffix = "", literal, ""
+            if core.startswith("%"):
+                prefix, core = "%", core[1:]
+            if core.endswith("%"):
+                suffix, core = "%", core[:-1]
+            if core.lower() != value.lower():
+                return match.group(0)
+            replaced = True
+            if core == value:
+                transform = "none"
+            elif core == value.lower():
+                transform = "lower"
+            elif core == value.upper():
+                transform = "upper"
+            else:
+                transform = "none"
+            bind = f":{slot['name']}"
+            if prefix:
+                bind = f"'{prefix}' || {bind}"
+            if suffix:
+                bind = f"{bind} || '{suffix}'"
+            return bind
+
+        transform = "none"
+        sql = re.sub(r"'((?:[^']|'')*)'", replace, sql)
+        if not replaced:
+            return None, None
+        specs.append({"name": slot["name"], "type": slot["type"], "transform": transform})
+    return sql, specs
+
+def _is_single_select(sql: str) -> bool:
+    statement = sql.strip().rstrip(";").strip()
+    return statement.lower().startswith(("select", "with")) and ";" not in statement
+
+class SQLTemplateCache:
+    """Persistent template -> parameterized SQL mapping, mirrored in memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = None
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "rejected": 0}
+
+    def _load(self):
+        if self._entries is None:
+            with get_database()._engine.begin() as conn:
+                conn.execute(text(_SCHEMA))
+                rows = conn.execute(text("SELECT template, sql_text, slots FROM sql_template_cache")).fetchall()
+            self._entries = {row[0]: {"sql": row[1], "slots": json.loads(row[2])} for row in rows}
+
+    def get(self, template: str):
+        with self._lock:
+            self._load()
+            return self._entries.get(template)
+
+    def put(self, template: str, sql: str, slots: list):
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            self._load()
+            with get_database()._engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "INSERT OR REPLACE INTO sql_template_cache (template, sql_text, slots, hits, created_at, last_used_at) "
+                        "VALUES (:template, :sql, :slots, 0, :now, :now)"
+                    ),
+                    {"template": template, "sql": sql, "slots": json.dumps(slots), "now": now},
+                )
+            self._entries[template] = {"sql": sql, "slots": slots}
+            self.stats["stored"] += 1
+
+    def record_hit(self, template: str):
+        with self._lock:
+            self.stats["hits"] += 1
+        with get_database()._engine.begin() as conn:
+            conn.execute(
+                text("UPDATE sql_template_cache SET hits = hits + 1, last_used_at = :now WHERE template = :template"),
+                {"template": template, "now": datetime.now(timezone.utc).isoformat()},
+            )
+
+    def clear(self):
+        with self._lock:
+            with get_database()._engine.begin() as conn:
+                conn.execute(text(_SCHEMA))
+                conn.execute(text("DELETE FROM sql_template_cache"))
+            self._entries = {}
+
+_template_cache = SQLTemplateCache()
+
+def get_sql_template_cache() -> SQLTemplateCache:
+    return _template_cache
+
+class TemplateCachedSQLRetriever:
+    """Wraps an NLSQLRetriever, serving repeat question templates from cached SQL."""
+
+    def __init__(self, retriever, cache: SQLTemplateCache = None):
+        self._retriever = retriever
+        self._cache = cache or get_sql_template_cache()
+
+    def __getattr__(self, name):
+        # Prompt access and anything else goes to the wrapped retriever
+        return getattr(self._retriever, name)
+
+    def _run_select(self, sql: str, params: dict):
+        """Execute a SELECT with bound parameters; rows are truncated like SQLDatabase.run_sql."""
+        sql_database = self._retriever._sql_database
+        with sql_database.engine.connect() as conn:
+            cursor = conn.execute(text(sql), params)
+            rows = [
+                tuple(sql_database.truncate_word(column, length=sql_database._max_string_length) for column in row)
+                for row in cursor.fetchall()
+            ]
+            return rows, list(cursor.keys())
+
+    def _nodes(self, sql: str, rows: list, col_keys: list) -> List[NodeWithScore]:
+        # Same node shape as SQLRetriever with return_raw=True
+        return [NodeWithScore(node=TextNode(
+            text=str(rows),
+            metadata={"sql_query": sql, "result": rows, "col_keys": col_keys},
+            excluded_embed_metadata_keys=["sql_query", "result", "col_keys"],
+            excluded_llm_metadata_keys=["sql_query", "result", "col_keys"],
+        ))]
+
+    def _from_cache(self, template: str, slots: list):
+        entry = self._cache.get(template)
+        if entry is None:
+            return None
+        values = {slot["name"]: slot["value"] for slot in slots}
+        params = {spec["name"]: _apply_transform(values[spec["name"]], spec["transform"]) for spec in entry["slots"]}
+        try:
+            rows, col_keys = self._run_select(entry["sql"], params)
+        except Exception as e:
+            print(f"Cached SQL for '{template}' failed ({e}); regenerating.")
+            return None
+        self._cache.record_hit(template)
+        print(f"--- SQL template cache hit: {template} ---")
+        return self._nodes(entry["sql"], rows, col_keys), {
+            "sql_query": entry["sql"], "sql_params": params, "result": rows, "col_keys": col_keys,
+            "template_cache": "hit",
+        }
+
+    def _store(self, template: str, slots: list, metadata: dict):
+        sql = metadata.get("sql_query")
+        if not sql or "result" not in metadata or not _is_single_select(sql):
+            return
+        param_sql, specs = parameterize_sql(sql.strip().rstrip(";"), slots)
+        if param_sql is None:
+            self._cache.stats["rejected"] += 1
+            return
+        params = {spec["name"]: _apply_transform(slot["value"], spec["transform"]) for spec, slot in zip(specs, slots)}
+        try:
+            rows, _ = self._run_select(param_sql, params)
+        except Exception as e:
+            print(f"Parameterized SQL failed validation: {e}")
+            self._cache.stats["rejected"] += 1
+            return
+        # The parameterized statement must reproduce the LLM statement's result
+        if [tuple(row) for row in rows] != [tuple(row) for row in metadata["result"]]:
+            self._cache.stats["rejected"] += 1
+            return
+        self._cache.put(template, param_sql, specs)
+
+    def retrieve_with_metadata(self, str_or_query_bundle) -> Tuple[List[NodeWithScore], Dict[str, Any]]:
+        query_bundle = QueryBundle(str_or_query_bundle) if isinstance(str_or_query_bundle, str) else str_or_query_bundle
+        template, slots = extract_template(query_bundle.query_str)
+        cached = self._from_cache(template, slots)
+        if cached is not None:
+            return cached
+
+        self._cache.stats["misses"] += 1
+        nodes, metadata = self._retriever.retrieve_with_metadata(query_bundle)
+        try:
+            self._store(template, slots, metadata)
+        except Exception as e:
+            print(f"Error caching SQL template: {e}")
+        return nodes, metadata
+
+    async def aretrieve_with_metadata(self, str_or_query_bundle):
+        return self.retrieve_with_metadata(str_or_query_bundle)
+
+class TemplateCachedNLSQLTableQueryEngine(NLSQLTableQueryEngine):
+    """NLSQLTableQueryEngine whose text-to-SQL step goes through the template cache."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sql_retriever = TemplateCachedSQLRetriever(self._sql_retriever)
@@ -0,0 +1,72 @@
+import threading
+from typing import Dict, List, Sequence
+import numpy as np
+from llama_index.core.base.base_selector import BaseSelector, SelectorResult, SingleSelection
+from llama_index.core.schema import QueryBundle
+from llama_index.core.tools.types import ToolMetadata
+from telecom_assistant.config.config import Config
+from telecom_assistant.utils.embeddings import HashingEmbedding
+
+# Similarity-based routing for RouterQueryEngine.
+#
+# Each tool gets a profile: its description plus a few example queries,
+# embedded once with the local hashing embedding (no API call) and cached.
+# A query is routed to the tool whose closest profile vector is most similar.
+# Only when the two best routes are within `min_margin` of each other does
+# the selector fall back to the LLM selector.
+
+class SimilaritySelector(BaseSelector):
+    """Pick a tool by similarity to cached description/example profiles."""
+
+    def __init__(self, examples: Dict[str, List[str]] = None, min_margin: float = None,
+                 fallback: BaseSelector = None):
+        self.examples = examples or {}
+        self.min_margin = Config.SELECTOR_MIN_MARGIN if min_margin is None else min_margin
+        self.fallback = fallback
+        self.embedder = HashingEmbedding(dimension=Config.LOCAL_EMBEDDING_DIM)
+        self._profiles = {}
+        self._lock = threading.Lock()
+        self.stats = {"similarity": 0, "fallback": 0}
+
+    def _get_prompts(self):
+        return {}
+
+    def _update_prompts(self, prompts):
+        pass
+
+    def _profile(self, choice: ToolMetadata) -> np.ndarray:
+        """Profile vectors for a tool (cached per name and description)."""
+        key = (choice.name, choice.description)
+        with self._lock:
+            if key not in self._profiles:
+                texts = [choice.description] + self.examples.get(choice.name, [])
+                self._profiles[key] = self.embedder.embed_batch(texts)
+            return self._profiles[key]
+
+    def scores(self, choices: Sequence[ToolMetadata], query: str) -> List[float]:
+        """Best cosine similarity between the query and each tool's profile."""
+        query_vector = self.embedder.embed_batch([query])[0]
+        return [float(np.max(self._profile(choice) @ query_vector)) for choice in choices]
+
+    def _select(self, choices: Sequence[ToolMetadata], query: QueryBundle) -> SelectorResult:
+        if len(choices) == 1:
+            return SelectorResult(selections=[SingleSelection(index=0, reason="Only one tool available.")])
+
+        scores = self.scores(choices, query.query_str)
+        ranked = sorted(range(len(choices)), key=lambda i: scores[i], reverse=True)
+        best, second = ranked[0], ranked[1]
+        margin = scores[best] - scores[second]
+
+        if margin < self.min_margin and self.fallback is not None:
+            self.stats["fallback"] += 1
+            print(f"--- Tool selector: margin {margin:.2f} too small, asking the LLM ---")
+            return self.fallback.select(choices, query)
+
+        self.stats["similarity"] += 1
+        print(f"--- Tool selector: {choices[best].name} (similarity {scores[best]:.2f}, margin {margin:.2f}) ---")
+        return SelectorResult(selections=[SingleSelection(
+            index=best, reason=f"Most similar tool profile (score {scores[best]:.2f}, margin {margin:.2f}).",
+        )])
+
+    async def _aselect(self, choices: Sequence[ToolMetadata], query: QueryBundle) -> SelectorResult:
+        return self._select(choices, query)